@@ -1,5 +1,6 @@
 # app/api/deps.py
-from typing import Generator, Optional
+import time
+from typing import Any, Dict, Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -8,12 +9,47 @@ from jose import jwt, JWTError
 from app.models import User, TokenData
 from app.core import security
 from app.core.config import settings
+from app.core.cache import TTLCache
 
 # --- UPDATE THIS LINE ---
 # Point tokenUrl to the actual endpoint path including router prefix
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 # --- END OF UPDATE ---
 
+# --- Authentication caches ---
+# Decoded token subjects, kept until the token's own expiry
+token_claims_cache: TTLCache[str] = TTLCache(settings.AUTH_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# User documents by subject (email), stored and served as copies. Invalidated explicitly on writes in
+# this worker only; other workers see changes (deactivation, password) once the TTL expires
+user_cache: TTLCache[User] = TTLCache(settings.AUTH_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(email: str) -> None:
+    """Drops a cached user. Call after any write to that user's document."""
+    user_cache.pop(email)
+
+
+def auth_cache_stats() -> Dict[str, Any]:
+    return {"token_claims": token_claims_cache.stats(), "users": user_cache.stats()}
+
+
+def _decode_token_subject(token: str) -> Optional[str]:
+    """Returns the token's subject, decoding and verifying the JWT only on a cache miss."""
+    email = token_claims_cache.get(token)
+    if email is not None:
+        return email
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+    email = payload.get("sub")
+    if email is None:
+        return None
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_claims_cache.set(token, email, ttl_seconds=ttl)
+    return email
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Optional[User]:
     """
     Dependency to get the current user from the token.
@@ -25,19 +61,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Optional[User
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: Optional[str] = payload.get("sub")
+        email: Optional[str] = _decode_token_subject(token)
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
 
+    # Each request gets its own copy, so a handler mutating it can't leak into other requests
+    cached = user_cache.get(token_data.email)
+    if cached is not None:
+        return cached.model_copy(deep=True)
     user = await User.find_one(User.email == token_data.email)
     if user is None:
         raise credentials_exception
+    user_cache.set(token_data.email, user.model_copy(deep=True))
     return user
 
 async def get_current_active_user(
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Any
+from pymongo.errors import DuplicateKeyError
 
 # Import models, schemas
 from app.models import User, Token # User is Beanie Document, Token is Pydantic schema
@@ -9,9 +10,16 @@ from app.schemas.user import UserCreate, UserPublic # User schemas
 # Import security module helpers
 from app.core import security as security_helpers
 from app.core.config import settings
+from app.api.deps import invalidate_user
 
 router = APIRouter()
 
+hashing_busy_exception = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Authentication is busy, please retry shortly.",
+    headers={"Retry-After": "1"},
+)
+
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
 async def register_new_user(
     *,
@@ -27,24 +35,29 @@ async def register_new_user(
             detail="User with this email already exists",
         )
 
-    hashed_password = security_helpers.get_password_hash(user_in.password)
+    try:
+        hashed_password = await security_helpers.get_password_hash_async(user_in.password)
+    except security_helpers.PasswordHashingBusy:
+        raise hashing_busy_exception
     user_doc = User(
         email=user_in.email,
         hashed_password=hashed_password,
         full_name=user_in.full_name,
         is_active=True
     )
-    await user_doc.insert()
-
-    created_user = await User.find_one(User.email == user_in.email)
-
-    if not created_user:
-         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve user after creation.")
+    try:
+        await user_doc.insert()
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same email
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists",
+        )
+    invalidate_user(user_doc.email) # Drop any stale entry for a re-registered email
 
-    # --- MODIFIED LINE ---
-    # Try dumping the model with mode='json' to force ObjectId -> str conversion
-    return created_user.model_dump(mode='json')
-    # --- END OF MODIFICATION ---
+    # insert() fills in the id, so the document can be returned without re-reading it.
+    # Dump with mode='json' to force ObjectId -> str conversion
+    return user_doc.model_dump(mode='json')
 
 
 @router.post("/token", response_model=Token)
@@ -62,13 +75,27 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not security_helpers.verify_password(form_data.password, user.hashed_password):
+    try:
+        valid, new_hash = await security_helpers.verify_and_update_password_async(
+            form_data.password, user.hashed_password
+        )
+    except security_helpers.PasswordHashingBusy:
+        raise hashing_busy_exception
+    if not valid:
          raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if new_hash:
+        # Cost factor changed since this hash was made; store the upgraded hash
+        await User.get_motor_collection().update_one(
+            {"_id": user.id, "hashed_password": user.hashed_password},
+            {"$set": {"hashed_password": new_hash}},
+        )
+        invalidate_user(user.email)
+
     access_token = security_helpers.create_access_token(
         subject=user.email
     )
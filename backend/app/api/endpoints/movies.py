@@ -0,0 +1,29 @@
+# app/api/endpoints/movies.py
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from app.core.config import settings
+from app.core.metrics import stage
+from app.models import SimilarMoviesResponse
+from app.services.movie_cards import movie_card_cache
+from app.services.similar_movies import similar_movie_index
+
+router = APIRouter()
+
+
+@router.get("/{movie_id}/similar", response_model=SimilarMoviesResponse)
+async def get_similar_movies(
+    movie_id: int,
+    limit: int = Query(settings.RECOMMENDATION_PAGE_SIZE, ge=1, le=settings.SIMILAR_MOVIES_MAX_LIMIT),
+) -> Any:
+    """
+    "More like this": the movies whose description embeddings are closest to this one,
+    precomputed by scripts/build_similar_movies.py. Served from memory plus the card cache.
+    """
+    similar_ids = similar_movie_index.similar(movie_id, limit)
+    if similar_ids is None:
+        raise HTTPException(status_code=404, detail=f"No similar movies found for movie {movie_id}.")
+    with stage("serialize"):
+        body = await movie_card_cache.render_list(similar_ids)
+    return Response(content=body, media_type="application/json")
@@ -1,57 +1,167 @@
 # app/api/endpoints/recommendations.py
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Any, List # Import List
-from sentence_transformers import SentenceTransformer
+import logging
 
-from app.models import RecommendationResponse, UserPreferences, Movie # Import Movie
-from app.crud import get_ai_recommendations_from_db
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, List, Optional, Sequence # Import List
+
+from app.models import RecommendationResponse, UserPreferences, User
+from app.crud import get_ai_recommendations_from_db, get_cached_recommendations, recommendation_flights
+from app.api.deps import get_current_active_user, invalidate_user
+from app.services.encoder_runtime import encoder_runtime
+from app.services.catalog_index import catalog_index
+from app.services.catalog_version import catalog_version_tracker
+from app.services.filter_index import catalog_filter_index
+from app.services.vector_index import catalog_vector_index
+from app.services.movie_cards import movie_card_cache
+from app.services.query_embeddings import query_embedding_cache
+from app.services.ranked_sessions import CursorError, ranked_result_sessions
+from app.services.result_cache import recommendation_result_cache
+from app.services.taste_vectors import refresh_taste_vector, taste_vector, taste_vector_stale
 from app.core.config import settings
-import torch
-
-# --- Load Model ---
-try:
-    print(f"Loading sentence transformer model ({settings.SENTENCE_MODEL_NAME}) for recommendations endpoint...")
-    device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    st_model_instance_reco = SentenceTransformer(settings.SENTENCE_MODEL_NAME, device=device)
-    print("Recommendation sentence transformer model loaded successfully.")
-except Exception as e:
-    print(f"ERROR: Failed to load Sentence Transformer model for recommendations: {e}")
-    st_model_instance_reco = None
+from app.core.metrics import FILL_RATE, note_request_detail, stage
+
+logger = logging.getLogger(__name__)
 
 # --- API Router ---
 router = APIRouter()
 
+PageLimit = Query(settings.RECOMMENDATION_PAGE_SIZE, ge=1, le=settings.RECOMMENDATION_MAX_PAGE_SIZE)
+
+
+async def refresh_user_taste_vector(user: User) -> None:
+    """Background task: persists a rebuilt taste sum and drops the cached user still holding the stale one."""
+    try:
+        await refresh_taste_vector(user)
+        invalidate_user(user.email)
+    except Exception:
+        logger.warning("Failed to rebuild the taste vector for %s", user.email, exc_info=True)
+
+
+async def render_page(
+    ranked_ids: Sequence[int],
+    offset: int,
+    limit: int,
+    owner: Optional[str],
+    stream: bool,
+    session_id: Optional[str] = None,
+) -> Response:
+    """
+    Renders one page of a ranked list. Cards are spliced in as pre-encoded JSON
+    fragments (no embedding, no re-validation), so the body is returned as-is
+    rather than through response_model serialization. With `stream`, the page is
+    sent as NDJSON: one `{"movie": ...}` line per card, then `{"next_cursor": ...}`.
+    """
+    page_ids, next_cursor = ranked_result_sessions.page(ranked_ids, offset, limit, owner, session_id)
+    fill_rate = len(page_ids) / limit
+    if offset == 0:
+        FILL_RATE.observe(fill_rate)
+    note_request_detail("Fill-Rate", f"{fill_rate:.2f}")
+    if stream:
+        return StreamingResponse(
+            movie_card_cache.stream_ndjson(page_ids, trailer={"next_cursor": next_cursor}),
+            media_type="application/x-ndjson",
+        )
+    with stage("serialize"):
+        body = await movie_card_cache.render_list(page_ids, extra={"next_cursor": next_cursor})
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/recommendations", response_model=RecommendationResponse)
 async def get_recommendations_endpoint(
     *,
-    preferences: UserPreferences
+    preferences: Optional[UserPreferences] = None,
+    limit: int = PageLimit,
+    cursor: Optional[str] = None,
+    stream: bool = False,
 ) -> Any:
     """
     Endpoint to get movie recommendations using Sentence Embeddings.
+    The first call ranks the whole candidate set once; pass the returned
+    `next_cursor` back as `cursor` (the body may then be omitted) for further pages.
     """
-    if st_model_instance_reco is None:
+    try:
+        if cursor is not None:
+            session_id, ranked_ids, offset = ranked_result_sessions.resume(cursor, owner=None)
+            return await render_page(ranked_ids, offset, limit, None, stream, session_id)
+    except CursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    if preferences is None:
+        raise HTTPException(status_code=422, detail="Preferences are required unless a cursor is given.")
+    if not encoder_runtime.ready:
          raise HTTPException(status_code=503, detail="Recommendation model is not available.")
 
     try:
-        # This list contains Movie Beanie Document instances
-        recommended_movies_list: List[Movie] = await get_ai_recommendations_from_db(
+        recommended_ids: List[int] = await get_cached_recommendations(
             preferences,
-            st_model_instance_reco
+            encoder_runtime.encoder
         )
+        return await render_page(recommended_ids, 0, limit, None, stream)
 
-        # --- MODIFIED SECTION ---
-        # Convert each Movie Document in the list to a JSON-serializable dict
-        # This ensures ObjectId('...') becomes "..." for the 'id' field
-        movies_for_response = [
-            movie.model_dump(mode='json') for movie in recommended_movies_list
-        ]
+    except Exception as e:
+        logger.exception("Error during recommendation generation in endpoint: %s", type(e).__name__)
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred while generating recommendations.")
 
-        # Return the RecommendationResponse containing the list of dictionaries
-        return RecommendationResponse(movies=movies_for_response)
-        # --- END OF MODIFICATION ---
+
+@router.post("/recommendations/personalized", response_model=RecommendationResponse)
+async def get_personalized_recommendations_endpoint(
+    *,
+    preferences: Optional[UserPreferences] = None,
+    limit: int = PageLimit,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Recommendations for the signed-in user: the questionnaire query is blended with
+    their taste vector (mean embedding of their favorites), favorites seed the CF
+    blend, and movies already in their favorites are excluded.
+    Paginated like /recommendations; cursors only work for the user they were issued to.
+    """
+    try:
+        if cursor is not None:
+            session_id, ranked_ids, offset = ranked_result_sessions.resume(cursor, owner=current_user.email)
+            return await render_page(ranked_ids, offset, limit, current_user.email, stream, session_id)
+    except CursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    if preferences is None:
+        raise HTTPException(status_code=422, detail="Preferences are required unless a cursor is given.")
+    if not encoder_runtime.ready:
+         raise HTTPException(status_code=503, detail="Recommendation model is not available.")
+
+    try:
+        favorites = set(current_user.favorite_movie_ids)
+        if taste_vector_stale(current_user):
+            # Rebuilt from favorites for this request; persisted once after the response
+            background_tasks.add_task(refresh_user_taste_vector, current_user)
+        recommended_ids: List[int] = await get_ai_recommendations_from_db(
+            preferences,
+            encoder_runtime.encoder,
+            seed_movie_ids=current_user.favorite_movie_ids,
+            taste_vector=taste_vector(current_user),
+            exclude_movie_ids=favorites,
+        )
+        return await render_page(recommended_ids, 0, limit, current_user.email, stream)
 
     except Exception as e:
-        print(f"Error during recommendation generation in endpoint: {type(e).__name__} - {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred while generating recommendations.")
\ No newline at end of file
+        logger.exception("Error during personalized recommendation generation for %s: %s", current_user.email, type(e).__name__)
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred while generating recommendations.")
+
+
+@router.get("/recommendations/stats", include_in_schema=False)
+async def get_recommendation_cache_stats() -> Any:
+    """Hit rates and memory use of the recommendation caches, request coalescing, and the catalog versions caches are tied to."""
+    return {
+        "result_cache": recommendation_result_cache.stats(),
+        "single_flight": recommendation_flights.stats(),
+        "ranked_sessions": ranked_result_sessions.stats(),
+        "query_embeddings": query_embedding_cache.stats(),
+        "movie_cards": movie_card_cache.stats(),
+        "encoder": encoder_runtime.encoder.stats() if encoder_runtime.encoder is not None else None,
+        "filter_index": catalog_filter_index.stats(),
+        "vector_index": catalog_vector_index.stats(),
+        "catalog": {"data_version": catalog_version_tracker.version, "snapshot_version": catalog_index.version},
+    }
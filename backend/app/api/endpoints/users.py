@@ -1,14 +1,18 @@
 # app/api/endpoints/users.py
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from typing import Any, List
 
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, invalidate_user
 from app.models import User, Movie
 from app.schemas.user import UserPublic
-from beanie.operators import AddToSet, Pull
+from app.services.taste_vectors import add_favorite, remove_favorite
 # Import DocumentNotFound potentially if needed for get
 from beanie.exceptions import DocumentNotFound
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/me", response_model=UserPublic)
@@ -26,7 +30,8 @@ async def add_movie_to_favorites(
 ):
     """
     Add a movie (by its integer movie_id) to the current user's favorites.
-    Uses $addToSet to avoid duplicates. Returns 204 No Content on success.
+    Duplicates are ignored; the user's taste vector is updated in the same write.
+    Returns 204 No Content on success.
     """
     # Check if movie exists
     movie_exists = await Movie.find_one(Movie.movie_id == movie_id)
@@ -39,18 +44,12 @@ async def add_movie_to_favorites(
     # --- MODIFIED UPDATE LOGIC ---
     # Find user by ID and apply update operator directly
     try:
-        update_result = await User.find_one(User.id == current_user.id).update(
-            AddToSet({User.favorite_movie_ids: movie_id})
-        )
-        # Check if document was found and potentially modified
-        # Note: find_one().update() might not return modified_count directly
-        # We might need find_one + save or use Motor directly for detailed results.
-        # For simplicity, assume success if no exception.
-        # Re-fetch to confirm if needed, but let's rely on exception handling first.
+        await add_favorite(current_user, movie_id)
+        invalidate_user(current_user.email)
 
     except Exception as e:
         # Log the error for debugging
-        print(f"Error adding favorite {movie_id} for user {current_user.email}: {e}")
+        logger.exception("Error adding favorite %s for user %s", movie_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not add favorite movie."
@@ -67,18 +66,16 @@ async def remove_movie_from_favorites(
 ):
     """
     Remove a movie (by its integer movie_id) from the current user's favorites.
-    Uses $pull. Returns 204 No Content on success.
+    The user's taste vector is updated in the same write. Returns 204 No Content on success.
     """
      # --- MODIFIED UPDATE LOGIC ---
      # Find user by ID and apply update operator directly
     try:
-        update_result = await User.find_one(User.id == current_user.id).update(
-            Pull({User.favorite_movie_ids: movie_id})
-        )
-        # Add checks if needed based on update_result if the method returns useful info
+        await remove_favorite(current_user, movie_id)
+        invalidate_user(current_user.email)
     except Exception as e:
         # Log the error for debugging
-        print(f"Error removing favorite {movie_id} for user {current_user.email}: {e}")
+        logger.exception("Error removing favorite %s for user %s", movie_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not remove favorite movie."
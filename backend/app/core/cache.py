@@ -0,0 +1,116 @@
+# app/core/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Small in-process LRU cache with hit/miss counters.
+    Not thread-safe; meant to be used from the event loop.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(0, maxsize)
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable) -> Optional[V]:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self.maxsize == 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            evicted_key, _ = self._data.popitem(last=False)
+            self._on_evict(evicted_key)
+            self.evictions += 1
+
+    def _on_evict(self, key: Hashable) -> None:
+        """Hook for subclasses that keep per-key bookkeeping."""
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def values(self):
+        return self._data.values()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TTLCache(LRUCache[V]):
+    """
+    LRU cache whose entries also expire after a time-to-live.
+    Each entry can override the default TTL (e.g. to match a token's own expiry).
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        super().__init__(maxsize)
+        self.ttl_seconds = ttl_seconds
+        self._expires: Dict[Hashable, float] = {}
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        return super().get(key)
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        super().set(key, value)
+        if key in self._data:
+            self._expires[key] = time.monotonic() + ttl
+
+    def _on_evict(self, key: Hashable) -> None:
+        self._expires.pop(key, None)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        self._expires.pop(key, None)
+        return super().pop(key)
+
+    def clear(self) -> None:
+        super().clear()
+        self._expires.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["expirations"] = self.expirations
+        return stats
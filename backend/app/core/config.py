@@ -11,6 +11,13 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "default_secret_replace_me_in_prod" # Default if not in .env
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    AUTH_CACHE_SIZE: int = 10000 # Max cached token claims / users
+    USER_CACHE_TTL_SECONDS: int = 60 # How long a cached user may be served without re-reading Mongo; also bounds how long other workers honor a deactivated user or old password
+
+    # --- Password Hashing ---
+    BCRYPT_ROUNDS: int = 12 # Cost factor; existing hashes are upgraded on next login when this changes
+    PASSWORD_HASH_WORKERS: int = 2 # Threads dedicated to bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 32 # Hash requests queued or running before /register and /token return 503
 
     # --- Database ---
     MONGODB_CONNECTION_STRING: str = "mongodb://localhost:27017"
@@ -18,6 +25,48 @@ class Settings(BaseSettings):
 
     # --- AI Model Settings ---
     SENTENCE_MODEL_NAME: str = 'all-MiniLM-L6-v2'
+    ENCODER_BACKEND: str = 'torch' # Query encoder: torch | onnx | onnx-int8
+    ONNX_MODEL_DIR: str = 'data/onnx' # Written by scripts/export_onnx_encoder.py
+    EMBEDDING_STORAGE: str = 'list' # How description_embedding is written: list (array of doubles) | binary (packed float32); reads accept both
+    EMBEDDING_CACHE_PATH: str = 'data/embedding_cache.sqlite' # On-disk vectors keyed by content hash
+    EMBEDDING_SNAPSHOT_DIR: str = 'data/embedding_snapshot' # Memory-mapped catalog matrix written by generate_embeddings.py
+    EMBEDDING_SNAPSHOT_POLL_SECONDS: float = 30.0 # How often workers check for a newer snapshot (0 disables)
+    VECTOR_INDEX_BACKEND: str = 'exact' # Similarity search over the catalog: exact | hnsw (pip install hnswlib)
+    HNSW_M: int = 16 # Graph degree; higher = better recall, more memory
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_SEARCH: int = 64 # Search beam width (raised to k when k is larger)
+    HNSW_EXACT_FRACTION: float = 0.05 # Filters keeping less than this share of the catalog are scored exactly
+    ENCODER_MAX_BATCH_SIZE: int = 32 # Max query texts coalesced into one encode call
+    ENCODER_MAX_WAIT_MS: float = 5.0 # Max time a query waits for its batch to fill
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096 # Max cached query vectors (~1.5 KB each)
+    QUERY_EMBEDDING_WARMUP: bool = True # Pre-encode questionnaire queries at startup
+    QUERY_EMBEDDING_WARMUP_MAX_GENRES: int = 2 # Largest genre combination to pre-encode
+    MOVIE_CARD_CACHE_SIZE: int = 20000 # Pre-encoded movie card JSON fragments
+    RESULT_CACHE_SIZE: int = 5000 # Ranked movie_id lists keyed by canonical preferences
+    RESULT_CACHE_TTL_SECONDS: int = 600 # Upper bound on how long a ranked list is reused
+    CATALOG_VERSION_POLL_SECONDS: float = 10.0 # How often workers check the catalog data version (0 disables)
+    CANDIDATE_FILTER_BACKEND: str = 'memory' # Candidate selection: memory (in-process filter index) | mongo
+    RECOMMENDATION_PAGE_SIZE: int = 12 # Default `limit` of a recommendations page
+    RECOMMENDATION_MAX_PAGE_SIZE: int = 60
+    RANKED_SESSION_CACHE_SIZE: int = 10000 # Ranked lists kept behind pagination cursors
+    RANKED_SESSION_TTL_SECONDS: int = 1800 # Idle time before a cursor expires
+
+    # --- Collaborative Filtering ---
+    CF_NEIGHBORS_PATH: str = 'data/item_neighbors.npz' # Built by scripts/build_item_neighbors.py
+    CF_BLEND_WEIGHT: float = 0.3 # Share of the final score taken from CF (0 disables blending)
+    CF_PSEUDO_SEEDS: int = 5 # Top embedding matches used as CF seeds when no seeds are given
+
+    # --- Similar Movies ---
+    SIMILAR_MOVIES_PATH: str = 'data/similar_movies.npz' # Built by scripts/build_similar_movies.py
+    SIMILAR_MOVIES_MAX_LIMIT: int = 30
+
+    # --- Personalization ---
+    TASTE_BLEND_WEIGHT: float = 0.5 # Share of the query vector taken from the user's taste vector
+
+    # --- Logging ---
+    LOG_LEVEL: str = "INFO" # Per-request pipeline details are logged at DEBUG
+    LOG_RATE_LIMIT_PER_SECOND: float = 5.0 # Per message template, after the burst (0 disables)
+    LOG_RATE_LIMIT_BURST: int = 20
 
     # --- External API Keys ---
     TMDB_API_KEY: str = "YOUR_TMDB_API_KEY_DEFAULT" # Default if not in .env
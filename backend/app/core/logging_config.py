@@ -0,0 +1,54 @@
+# app/core/logging_config.py
+import logging
+import sys
+import time
+from typing import Dict, Tuple
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per (logger, level, message template). A hot-path message logged on
+    every request is let through `burst` times, then at most `rate` times per second;
+    the next record that passes reports how many were dropped in between.
+    Templates are the unformatted `msg`, so callers should pass values as logging args.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets: Dict[Tuple[str, int, str], list] = {} # key -> [tokens, last refill, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1
+        if bucket[2]:
+            record.msg = f"{record.msg} [{bucket[2]} similar messages suppressed]"
+            bucket[2] = 0
+        return True
+
+
+def configure_logging(level: str, rate_per_second: float, burst: int) -> None:
+    """Installs one rate-limited stderr handler on the `app` logger tree (uvicorn keeps its own)."""
+    logger = logging.getLogger("app")
+    logger.setLevel(level.upper())
+    if any(isinstance(f, RateLimitFilter) for handler in logger.handlers for f in handler.filters):
+        return # Already configured (e.g. app module imported twice under --reload)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(RateLimitFilter(rate_per_second, burst))
+    logger.addHandler(handler)
+    logger.propagate = False
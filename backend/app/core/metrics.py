@@ -0,0 +1,139 @@
+# app/core/metrics.py
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond stages up to slow cold requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text exposition format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> ([count per bucket, +Inf last], sum)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Histograms plus gauge callbacks, rendered together for /metrics.
+    Callbacks return {label value: {field: number}} and are read at scrape time,
+    so cache and encoder stats don't need to be pushed anywhere.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: List[Histogram] = []
+        self._gauges: List[Tuple[str, str, str, Callable[[], Dict[str, Dict[str, Any]]]]] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def gauge_callback(self, prefix: str, documentation: str, label: str, collect: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+        self._gauges.append((prefix, documentation, label, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for prefix, documentation, label, collect in self._gauges:
+            by_field: Dict[str, List[str]] = {}
+            for label_value, fields in collect().items():
+                for field, value in (fields or {}).items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    by_field.setdefault(field, []).append(f"{prefix}_{field}{_format_labels((label,), (label_value,))} {value}")
+            for field, samples in sorted(by_field.items()):
+                lines.append(f"# HELP {prefix}_{field} {documentation} ({field})")
+                lines.append(f"# TYPE {prefix}_{field} gauge")
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    "flickai_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"),
+)
+STAGE_SECONDS = registry.histogram(
+    "flickai_recommendation_stage_duration_seconds", "Time spent in each stage of the recommendation pipeline.", ("stage",),
+)
+CANDIDATE_COUNT = registry.histogram(
+    "flickai_recommendation_candidates", "Candidates fetched and scored per pipeline run (both tiers).",
+    buckets=(0, 12, 25, 50, 100, 200, 300, 400, 500),
+)
+FILL_RATE = registry.histogram(
+    "flickai_recommendation_fill_rate", "Share of the requested first page that could be filled.",
+    buckets=(0.0, 0.25, 0.5, 0.75, 0.99, 1.0),
+)
+
+# Stage durations of the request being handled, for its Server-Timing header
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+# Per-request facts returned as X-<name> response headers
+request_details: ContextVar[Optional[Dict[str, str]]] = ContextVar("request_details", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Times a pipeline stage into STAGE_SECONDS and the current request's Server-Timing entries."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def note_request_detail(name: str, value: Any) -> None:
+    """Attaches `X-<name>: value` to the current response (no-op outside a request)."""
+    details = request_details.get()
+    if details is not None:
+        details[name] = str(value)
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
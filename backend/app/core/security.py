@@ -1,6 +1,8 @@
 # app/core/security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Any
+from typing import Optional, Any, Tuple
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -8,7 +10,17 @@ from passlib.context import CryptContext
 from .config import settings # Import settings from config.py
 
 # Password Hashing Context (using bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with a different cost than BCRYPT_ROUNDS are flagged for rehash on next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the event loop
+# without competing with the default executor used elsewhere.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_pending_hashes = 0
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when more hashing work is queued than PASSWORD_HASH_MAX_PENDING allows."""
 
 ALGORITHM = settings.ALGORITHM
 
@@ -32,6 +44,28 @@ def get_password_hash(password: str) -> str:
     """Hashes a plain password."""
     return pwd_context.hash(password)
 
+async def _run_hashing(fn, *args):
+    """Runs a bcrypt call on the hashing pool, rejecting work beyond the admission limit."""
+    global _pending_hashes
+    if _pending_hashes >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHashingBusy()
+    _pending_hashes += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _pending_hashes -= 1
+
+async def get_password_hash_async(password: str) -> str:
+    """Hashes a plain password without blocking the event loop."""
+    return await _run_hashing(pwd_context.hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password without blocking the event loop.
+    Returns (valid, new_hash); new_hash is set when the stored hash uses an outdated cost.
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
 # Function to decode token (will be used in dependency)
 def decode_token(token: str) -> Optional[str]:
      """Decodes JWT token to get the subject (e.g., email)."""
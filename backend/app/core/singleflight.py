@@ -0,0 +1,47 @@
+# app/core/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as its own task; callers arriving
+    while it runs await that same task instead of repeating the work. The task is
+    shielded, so a caller that disconnects (is cancelled) doesn't abort the
+    computation for everyone else waiting on it.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[Hashable, "asyncio.Task[T]"] = {}
+        self.executions = 0
+        self.collapsed = 0
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._in_flight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception() # Mark retrieved even if every waiter went away
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.executions + self.collapsed
+        return {
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._in_flight),
+            "collapse_rate": round(self.collapsed / calls, 4) if calls else 0.0,
+        }
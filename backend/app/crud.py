@@ -1,115 +1,231 @@
 # app/crud.py
 import asyncio
-from typing import List, Dict, Any, Tuple, Optional
+import logging
+from typing import List, Dict, Any, Tuple, Optional, Set, TYPE_CHECKING
+from pydantic import BaseModel
 from .models import Movie, UserPreferences
+from .core.config import settings
+from .core.metrics import CANDIDATE_COUNT, note_request_detail, stage
+from .core.singleflight import SingleFlight
+from .services.catalog_index import catalog_index, normalize
+from .services.cf_index import item_neighbor_index
+from .services.filter_index import ANY_DURATION, PREFERENCE_FLAG_FIELDS, catalog_filter_index
+from .services.vector_index import catalog_vector_index
+from .services.query_embeddings import query_embedding_cache, query_text_for
+from .services.result_cache import preferences_cache_key, recommendation_result_cache
 from beanie.odm.operators.find.comparison import In
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from beanie.odm.queries.find import FindMany
 import numpy as np
 
-# get_ai_recommendations_from_db function:
-async def get_ai_recommendations_from_db(
-    preferences: UserPreferences,
-    st_model: SentenceTransformer
-) -> List[Movie]:
+if TYPE_CHECKING:
+    from .services.encoder import BatchingEncoder
+
+logger = logging.getLogger(__name__)
+
+# Max number of candidates pulled from MongoDB before ranking
+CANDIDATE_LIMIT = 500
+
+# Concurrent identical cache misses share one pipeline run
+recommendation_flights: SingleFlight[List[int]] = SingleFlight()
+
+
+class CandidateMovie(BaseModel):
+    """Projection used for candidate selection: no embedding, no display fields."""
+    movie_id: int
+    rating: Optional[float] = None
+    similarity: Optional[float] = None # Set when a vector index search already scored the candidate
+
+    class Settings:
+        # Stored fields only; `similarity` is computed, never read from MongoDB
+        projection = {"movie_id": 1, "rating": 1}
+
+
+def build_candidate_query(preferences: UserPreferences, backfill: bool = False) -> FindMany[Movie]:
     """
-    Generates movie recommendations based on user preferences,
-    using MongoDB for initial filtering and Sentence Embeddings for semantic ranking.
+    Builds the MongoDB candidate filter for a questionnaire submission.
+    Requested preference flags are part of the filter (any of them may match), so
+    the candidate limit applies to flagged movies only. With `backfill`, the flags
+    are negated instead: the second tier used when too few flagged movies match.
+    Shared with scripts/explain_queries.py so the planner is checked on the real query shape.
     """
-    print(f"Generating recommendations using embeddings for: {preferences.model_dump()}")
-
-    # --- Step 1: Initial Filtering using MongoDB ---
-    query_conditions = []
+    query_conditions: List[Any] = []
 
     if preferences.language:
          query_conditions.append(Movie.language == preferences.language)
-    if preferences.duration != 999:
+    if preferences.duration != ANY_DURATION:
          query_conditions.append(Movie.duration <= preferences.duration)
     if preferences.genres:
         query_conditions.append(In(Movie.genres, preferences.genres))
 
-    # Build the final query
+    flag_conditions = [{PREFERENCE_FLAG_FIELDS[flag]: True} for flag in dict.fromkeys(preferences.preferences)]
+    if flag_conditions:
+        query_conditions.append({"$nor" if backfill else "$or": flag_conditions})
+
     if query_conditions:
-        final_query = Movie.find(*query_conditions)
-    else:
-         final_query = Movie.find_all()
-
-    # --- REMOVED .project({...}) call ---
-    # Beanie fetches all fields defined in the Movie model by default now.
-
-    # Execute query to get candidate movies
-    candidate_movies = await final_query.limit(500).to_list() # Limit applied directly
-    print(f"Found {len(candidate_movies)} candidate movies after initial DB filtering (using genres only).")
-
-    if not candidate_movies:
-        print("No movies found matching the specified genres.")
-        return []
-
-    # --- Step 2: Filter candidates with embeddings ---
-    movies_with_embeddings = [m for m in candidate_movies if m.description_embedding]
-    if not movies_with_embeddings:
-        print("WARNING: No candidate movies have embeddings. Re-run 'scripts/generate_embeddings.py' on the new dataset.")
-        print("Returning list sorted by rating as fallback.")
-        # Fallback: sort original candidates by rating (descending)
-        candidate_movies.sort(key=lambda m: m.rating or 0, reverse=True)
-        # Apply post-filtering based on preferences flags
-        final_list = []
-        if preferences.preferences:
-            temp_filtered_list = []
-            for movie in candidate_movies: # Use original candidates if no embeddings
-                match = False
-                if 'trending' in preferences.preferences and movie.isTrending: match = True
-                if not match and 'classic' in preferences.preferences and movie.isClassic: match = True
-                if not match and 'hidden_gems' in preferences.preferences and movie.isHiddenGem: match = True
-                if match: temp_filtered_list.append(movie)
-            final_list = temp_filtered_list
-        else:
-            final_list = candidate_movies
-        return final_list[:12] # Return top 10 based on rating
-
-    # --- Step 3: Generate Query Embedding ---
-    query_text = " ".join(preferences.genres).lower()
-    query_text_with_mood = f"{preferences.mood} feeling movie in genres: {query_text}"
-    print(f"Generating embedding for query: '{query_text_with_mood}'")
-    query_embedding = st_model.encode(query_text_with_mood, convert_to_numpy=True)
-
-    # --- Step 4: Calculate Similarities ---
-    movie_embeddings = np.array([m.description_embedding for m in movies_with_embeddings])
-    if movie_embeddings.size == 0:
-        print("Warning: Extracted movie embeddings array is empty.")
-        ranked_movies_by_ai = movies_with_embeddings
-        similarities = None
-    else :
-        try:
-            similarities = cosine_similarity(query_embedding.reshape(1, -1), movie_embeddings)[0]
-        except Exception as e:
-            print(f"Error during cosine similarity calculation: {e}")
-            ranked_movies_by_ai = movies_with_embeddings
-            similarities = None
-
-    # --- Step 5: Rank Movies ---
-    if similarities is not None:
-        scored_movies = []
-        for i, movie in enumerate(movies_with_embeddings):
-            scored_movies.append({'movie': movie, 'score': similarities[i]})
-        scored_movies.sort(key=lambda x: x['score'], reverse=True)
-        ranked_movies_by_ai = [item['movie'] for item in scored_movies]
-        print(f"Ranked {len(ranked_movies_by_ai)} movies using embedding similarity.")
-    # If similarities calculation failed, ranked_movies_by_ai has pre-ranked list from step 4 fallback
-
-    # --- Step 6: Post-Filtering (Classic, Trending, etc.) ---
-    final_recommended_movies = []
-    if preferences.preferences:
-        temp_filtered_list = []
-        for movie in ranked_movies_by_ai: # Apply to the potentially ranked list
-            match = False
-            if 'trending' in preferences.preferences and movie.isTrending: match = True
-            if not match and 'classic' in preferences.preferences and movie.isClassic: match = True
-            if not match and 'hidden_gems' in preferences.preferences and movie.isHiddenGem: match = True
-            if match: temp_filtered_list.append(movie)
-        final_recommended_movies = temp_filtered_list
-        print(f"Applied post-AI preference flags, {len(final_recommended_movies)} movies remain.")
-    else:
-        final_recommended_movies = ranked_movies_by_ai
-
-    return final_recommended_movies[:12]
\ No newline at end of file
+        return Movie.find(*query_conditions)
+    return Movie.find_all()
+
+
+def blend_cf_scores(
+    scored_ids: np.ndarray,
+    similarities: np.ndarray,
+    seed_movie_ids: Optional[List[int]],
+) -> np.ndarray:
+    """
+    Blends item-item CF affinity into the embedding similarities.
+    Without explicit seeds, the top embedding matches act as seeds (pseudo-relevance feedback).
+    """
+    weight = settings.CF_BLEND_WEIGHT
+    if weight <= 0 or not item_neighbor_index.size:
+        return similarities
+    if not seed_movie_ids:
+        top = np.argsort(-similarities, kind="stable")[:settings.CF_PSEUDO_SEEDS]
+        seed_movie_ids = scored_ids[top].tolist()
+    cf_scores = item_neighbor_index.score(seed_movie_ids, scored_ids)
+    peak = cf_scores.max() if cf_scores.size else 0
+    if peak <= 0:
+        return similarities
+    return (1 - weight) * similarities + weight * (cf_scores / peak)
+
+
+async def fetch_candidates(
+    preferences: UserPreferences,
+    backfill: bool,
+    limit: int,
+    query_embedding: Optional[np.ndarray] = None,
+) -> List[CandidateMovie]:
+    """
+    Candidate selection: from the in-memory filter index when enabled and loaded,
+    otherwise from MongoDB. Either way only movie_id and rating are returned;
+    embeddings come from the in-memory catalog index.
+    With the filter index and a query embedding, the candidates are the `limit`
+    matches nearest to the query (a filtered vector index search) rather than the
+    first `limit` matches, and carry the similarity the search computed.
+    """
+    if settings.CANDIDATE_FILTER_BACKEND == "memory" and catalog_filter_index.loaded:
+        if query_embedding is not None and catalog_vector_index.size:
+            matching_ids, _ = catalog_filter_index.candidates(preferences, backfill, limit=None)
+            with stage("vector_search"):
+                movie_ids, similarities = catalog_vector_index.search(query_embedding, limit, matching_ids)
+            if movie_ids.size:
+                return [
+                    CandidateMovie.model_construct(movie_id=int(movie_id), rating=None, similarity=float(similarity))
+                    for movie_id, similarity in zip(movie_ids, similarities)
+                ]
+        movie_ids, ratings = catalog_filter_index.candidates(preferences, backfill, limit)
+        return [
+            CandidateMovie.model_construct(movie_id=int(movie_id), rating=None if np.isnan(rating) else float(rating))
+            for movie_id, rating in zip(movie_ids, ratings)
+        ]
+    return await build_candidate_query(preferences, backfill).project(CandidateMovie).limit(limit).to_list()
+
+
+# get_ai_recommendations_from_db function:
+async def get_ai_recommendations_from_db(
+    preferences: UserPreferences,
+    encoder: "BatchingEncoder",
+    seed_movie_ids: Optional[List[int]] = None,
+    taste_vector: Optional[np.ndarray] = None,
+    exclude_movie_ids: Optional[Set[int]] = None,
+) -> List[int]:
+    """
+    Generates movie recommendations based on user preferences,
+    using the in-memory filter index or MongoDB for initial filtering (preference
+    flags included), the vector index to pick the nearest matches, the resident
+    catalog index for semantic ranking and item-item collaborative filtering
+    (seeded by `seed_movie_ids`) for blending.
+    If fewer than a page of flagged movies match, unflagged matches are ranked
+    and appended after them as a second tier.
+    For signed-in users, `taste_vector` is blended into the query and `exclude_movie_ids`
+    (their favorites) are dropped from the results.
+    Returns every ranked movie_id (at most CANDIDATE_LIMIT); pages are sliced and
+    cards rendered by the caller.
+    """
+    logger.debug("Generating recommendations for: %s", preferences.model_dump())
+    query_embedding: Optional[np.ndarray] = None
+    if catalog_index.size:
+        with stage("encode"):
+            query_embedding = await query_embedding_cache.encode(encoder, query_text_for(preferences))
+        if taste_vector is not None:
+            weight = settings.TASTE_BLEND_WEIGHT
+            query_embedding = (1 - weight) * normalize(query_embedding) + weight * normalize(taste_vector)
+
+    async def rank(candidate_movies: List[CandidateMovie]) -> List[int]:
+        if exclude_movie_ids:
+            candidate_movies = [m for m in candidate_movies if m.movie_id not in exclude_movie_ids]
+        if not candidate_movies:
+            return []
+
+        # --- Step 2: Score candidates against the catalog index ---
+        scored_ids, similarities = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if all(m.similarity is not None for m in candidate_movies):
+            # Already scored by the vector index search
+            scored_ids = np.fromiter((m.movie_id for m in candidate_movies), dtype=np.int64, count=len(candidate_movies))
+            similarities = np.fromiter((m.similarity for m in candidate_movies), dtype=np.float32, count=len(candidate_movies))
+        elif query_embedding is not None:
+            with stage("similarity"):
+                scored_ids, similarities = catalog_index.score(query_embedding, [m.movie_id for m in candidate_movies])
+
+        if scored_ids.size == 0:
+            logger.warning(
+                "No candidate movies have embeddings; returning them by rating. "
+                "Re-run 'scripts/generate_embeddings.py' on the new dataset."
+            )
+            # Fallback: sort original candidates by rating (descending)
+            candidate_movies = sorted(candidate_movies, key=lambda m: m.rating or 0, reverse=True)
+            return [m.movie_id for m in candidate_movies]
+
+        # --- Step 3: Rank Movies ---
+        with stage("rank"):
+            similarities = blend_cf_scores(scored_ids, similarities, seed_movie_ids)
+            order = np.argsort(-similarities, kind="stable")
+            return [int(movie_id) for movie_id in scored_ids[order]]
+
+    # --- Step 1: Initial Filtering using MongoDB ---
+    with stage("db_filter"):
+        candidate_movies = await fetch_candidates(preferences, backfill=False, limit=CANDIDATE_LIMIT, query_embedding=query_embedding)
+    logger.debug("Found %d candidate movies after initial DB filtering.", len(candidate_movies))
+    ranked_ids = await rank(candidate_movies)
+    candidate_count = len(candidate_movies)
+
+    # --- Step 4: Backfill with unflagged matches when flagged ones can't fill a page ---
+    backfilled = 0
+    remaining = CANDIDATE_LIMIT - candidate_count
+    if preferences.preferences and len(ranked_ids) < settings.RECOMMENDATION_PAGE_SIZE and remaining > 0:
+        with stage("backfill"):
+            backfill_movies = await fetch_candidates(preferences, backfill=True, limit=remaining, query_embedding=query_embedding)
+        backfill_ids = await rank(backfill_movies)
+        candidate_count += len(backfill_movies)
+        backfilled = len(backfill_ids)
+        ranked_ids += backfill_ids
+        logger.debug("Backfilled %d unflagged movies after %d flagged results.", backfilled, len(ranked_ids) - backfilled)
+
+    if not ranked_ids:
+        logger.debug("No movies found matching the specified filters.")
+    CANDIDATE_COUNT.observe(candidate_count)
+    note_request_detail("Candidate-Count", candidate_count)
+    note_request_detail("Backfill-Count", backfilled)
+    return ranked_ids
+
+
+async def get_cached_recommendations(preferences: UserPreferences, encoder: "BatchingEncoder") -> List[int]:
+    """
+    Anonymous recommendations through the result cache. Identical questionnaire
+    submissions (after canonicalization) reuse the ranked list until it expires or
+    the catalog changes; only misses run the full pipeline, and concurrent identical
+    misses run it once between them.
+    """
+    key = preferences_cache_key(preferences)
+    cached = recommendation_result_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = recommendation_result_cache.generation
+
+    async def compute() -> List[int]:
+        ranked_ids = await get_ai_recommendations_from_db(preferences, encoder)
+        recommendation_result_cache.set(key, ranked_ids, generation)
+        return ranked_ids
+
+    # Keyed by generation too, so requests arriving after an invalidation don't join a stale run
+    ranked_ids = await recommendation_flights.run((generation, key), compute)
+    return list(ranked_ids)
@@ -1,9 +1,10 @@
 # app/models.py
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Union
 from beanie import Document
 from pydantic_settings import BaseSettings
 import pymongo # <-- Import pymongo
+from app.schemas.movie import MovieCard
 
 # --- Movie Document ---
 class Movie(Document):
@@ -21,10 +22,40 @@ class Movie(Document):
     isClassic: Optional[bool] = False
     isHiddenGem: Optional[bool] = False
     isTrending: Optional[bool] = False
-    description_embedding: Optional[List[float]] = None
+    description_embedding: Optional[Union[List[float], bytes]] = None # List, or packed float32 (EMBEDDING_STORAGE=binary); read with decode_embedding
+    embedding_hash: Optional[str] = None # sha256 of (model name, embedded text)
 
     class Settings:
         name = "movies"
+        indexes = [
+            pymongo.IndexModel([("movie_id", pymongo.ASCENDING)], unique=True, name="movie_id_unique"),
+            # Questionnaire filter: language equality, genres $in (multikey), duration range
+            pymongo.IndexModel(
+                [("language", pymongo.ASCENDING), ("genres", pymongo.ASCENDING), ("duration", pymongo.ASCENDING)],
+                name="language_genres_duration",
+            ),
+            pymongo.IndexModel(
+                [("genres", pymongo.ASCENDING), ("duration", pymongo.ASCENDING)],
+                name="genres_duration",
+            ),
+            # Preference flags are sparse booleans, so each gets a partial index
+            # over the same filter keys containing only the flagged movies.
+            pymongo.IndexModel(
+                [("language", pymongo.ASCENDING), ("genres", pymongo.ASCENDING), ("duration", pymongo.ASCENDING)],
+                name="trending_language_genres_duration",
+                partialFilterExpression={"isTrending": True},
+            ),
+            pymongo.IndexModel(
+                [("language", pymongo.ASCENDING), ("genres", pymongo.ASCENDING), ("duration", pymongo.ASCENDING)],
+                name="classic_language_genres_duration",
+                partialFilterExpression={"isClassic": True},
+            ),
+            pymongo.IndexModel(
+                [("language", pymongo.ASCENDING), ("genres", pymongo.ASCENDING), ("duration", pymongo.ASCENDING)],
+                name="hidden_gem_language_genres_duration",
+                partialFilterExpression={"isHiddenGem": True},
+            ),
+        ]
 
 
 # --- User Document ---
@@ -34,6 +65,10 @@ class User(Document):
     hashed_password: str
     is_active: bool = True
     favorite_movie_ids: List[int] = Field(default_factory=list)
+    # Running sum/count of favorite embeddings, updated incrementally on add/remove
+    taste_vector_sum: Optional[List[float]] = None
+    taste_vector_count: int = 0
+    taste_vector_version: Optional[str] = None # Catalog index version the sum was built from
 
     class Settings:
         name = "users"
@@ -57,7 +92,11 @@ class UserPreferences(BaseModel):
     preferences: List[Literal['trending', 'classic', 'hidden_gems']]
 
 class RecommendationResponse(BaseModel):
-    movies: List[Movie]
+    movies: List[MovieCard]
+    next_cursor: Optional[str] = None # Pass back as `cursor` for the next page; null on the last page
+
+class SimilarMoviesResponse(BaseModel):
+    movies: List[MovieCard]
 
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,24 @@
+# app/schemas/movie.py
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from beanie import PydanticObjectId
+
+# Public movie card returned by the API (never includes the embedding vector)
+class MovieCard(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: Optional[PydanticObjectId] = Field(default=None, alias="_id") # Serialized as string
+    movie_id: int
+    title: str
+    year: Optional[int] = None
+    posterUrl: Optional[str] = None
+    backdropUrl: Optional[str] = None
+    rating: Optional[float] = None
+    duration: Optional[int] = None
+    genres: List[str] = []
+    description: Optional[str] = None
+    language: Optional[str] = None
+    streamingOn: Optional[List[str]] = None
+    isClassic: Optional[bool] = False
+    isHiddenGem: Optional[bool] = False
+    isTrending: Optional[bool] = False
@@ -0,0 +1,147 @@
+# app/services/catalog_index.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models import Movie
+from app.services.catalog_version import read_catalog_version
+from app.services.embedding_codec import decode_embedding
+from app.services.embedding_snapshot import current_version, open_snapshot
+
+
+class CatalogIndex:
+    """
+    Resident copy of every movie's description embedding.
+
+    Embeddings are held as one contiguous, L2-normalized float32 matrix whose rows
+    are sorted by movie_id, so ranking a candidate set is a binary search plus a
+    single matrix-vector product instead of fetching and decoding embedding lists
+    from MongoDB on every request.
+
+    When loaded from a snapshot (see app/services/embedding_snapshot.py) the matrix
+    and ids are read-only memory maps shared by every worker process on the host.
+    """
+
+    def __init__(self) -> None:
+        self.matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.movie_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.loaded: bool = False
+        self.source: Optional[str] = None # "snapshot" or "mongo"
+        self.version: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return int(self.matrix.shape[0])
+
+    @property
+    def dimension(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    async def load(self) -> None:
+        """
+        (Re)loads all embeddings from MongoDB (either storage format). Only movie_id and the vector are fetched.
+        The version is derived from the catalog data version, which every embedding run bumps.
+        """
+        collection = Movie.get_motor_collection()
+        data_version = await read_catalog_version(collection.database)
+        cursor = collection.find(
+            {"description_embedding": {"$ne": None}},
+            {"_id": 0, "movie_id": 1, "description_embedding": 1},
+        )
+        ids: List[int] = []
+        vectors: List[np.ndarray] = []
+        async for doc in cursor:
+            embedding = decode_embedding(doc.get("description_embedding"))
+            if embedding is None:
+                continue
+            ids.append(int(doc["movie_id"]))
+            vectors.append(embedding)
+        self.build(ids, vectors)
+        self.source = "mongo"
+        self.version = f"mongo-{data_version}"
+
+    def load_snapshot(self, root: str) -> bool:
+        """Maps the snapshot CURRENT points at. Returns False (leaving the index untouched) if there is none."""
+        version = current_version(root)
+        if version is None:
+            return False
+        if version == self.version:
+            return True
+        snapshot = open_snapshot(root, version)
+        if snapshot is None:
+            return False
+        movie_ids, matrix, _ = snapshot
+        self._set(movie_ids, matrix)
+        self.source = "snapshot"
+        self.version = version
+        return True
+
+    def build(self, ids: Sequence[int], vectors: Iterable[Sequence[float]]) -> None:
+        """Builds the normalized, movie_id-sorted matrix from parallel id/vector sequences."""
+        if not len(ids):
+            self._set(np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32))
+            return
+
+        movie_ids = np.asarray(ids, dtype=np.int64)
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+        order = np.argsort(movie_ids, kind="stable")
+        self._set(np.ascontiguousarray(movie_ids[order]), np.ascontiguousarray(matrix[order]))
+
+    def _set(self, movie_ids: np.ndarray, matrix: np.ndarray) -> None:
+        self.movie_ids, self.matrix = movie_ids, matrix
+        self.loaded = True
+
+    def row_for(self, movie_id: int) -> Optional[int]:
+        rows, _ = self.rows_for([movie_id])
+        return int(rows[0]) if rows.size else None
+
+    def rows_for(self, movie_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (rows, movie_ids) for the given ids that have an embedding, in input order."""
+        return lookup_rows(self.movie_ids, movie_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "size": self.size,
+            "source": self.source,
+            "version": self.version,
+            "memory_mapped": isinstance(self.matrix, np.memmap),
+        }
+
+    def score(self, query_embedding: np.ndarray, movie_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cosine similarity between the query and each given movie that has an embedding.
+        Returns (movie_ids, scores); movies without an embedding are dropped.
+        """
+        rows, found = self.rows_for(movie_ids)
+        if rows.size == 0:
+            return found, np.empty(0, dtype=np.float32)
+        query = normalize(query_embedding)
+        return found, self.matrix[rows] @ query
+
+
+def lookup_rows(sorted_ids: np.ndarray, movie_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Binary-searches `movie_ids` in `sorted_ids`; returns (rows, movie_ids) of those present, in input order."""
+    wanted = movie_ids if isinstance(movie_ids, np.ndarray) else np.fromiter(movie_ids, dtype=np.int64)
+    wanted = wanted.astype(np.int64, copy=False)
+    if wanted.size == 0 or sorted_ids.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    rows = np.searchsorted(sorted_ids, wanted)
+    rows[rows >= sorted_ids.size] = 0
+    hit = sorted_ids[rows] == wanted
+    return rows[hit], wanted[hit]
+
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    """Returns the vector as a unit-length float32 array."""
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+# Process-wide instance, loaded in main.py at startup.
+catalog_index = CatalogIndex()
@@ -0,0 +1,45 @@
+# app/services/catalog_version.py
+from typing import Any, Optional
+
+from pymongo import ReturnDocument
+
+# Single counter document: {"_id": "catalog", "version": <int>}
+META_COLLECTION = "meta"
+CATALOG_VERSION_ID = "catalog"
+
+
+async def bump_catalog_version(database: Any) -> int:
+    """
+    Increments the catalog data version. Called by every job that changes movie data
+    (import, enrichment, embeddings) so serving workers drop results computed from the old data.
+    """
+    doc = await database[META_COLLECTION].find_one_and_update(
+        {"_id": CATALOG_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return int(doc["version"])
+
+
+async def read_catalog_version(database: Any) -> int:
+    doc = await database[META_COLLECTION].find_one({"_id": CATALOG_VERSION_ID}, {"version": 1})
+    return int(doc["version"]) if doc else 0
+
+
+class CatalogVersionTracker:
+    """Remembers the last catalog data version this process has seen."""
+
+    def __init__(self) -> None:
+        self.version: Optional[int] = None
+
+    async def refresh(self, database: Any) -> bool:
+        """Re-reads the version. Returns True if it changed since the previous read (not on the first)."""
+        version = await read_catalog_version(database)
+        changed = self.version is not None and version != self.version
+        self.version = version
+        return changed
+
+
+# Process-wide instance, refreshed from the lifespan in main.py.
+catalog_version_tracker = CatalogVersionTracker()
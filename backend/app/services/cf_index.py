@@ -0,0 +1,69 @@
+# app/services/cf_index.py
+import os
+from typing import Iterable
+
+import numpy as np
+
+
+class ItemNeighborIndex:
+    """
+    Serving side of the item-item collaborative filtering model built by
+    scripts/build_item_neighbors.py: top-K neighbor lists per movie.
+    """
+
+    def __init__(self) -> None:
+        self.movie_ids: np.ndarray = np.empty(0, dtype=np.int64) # Sorted, as written by np.unique
+        self.neighbors: np.ndarray = np.empty((0, 0), dtype=np.int32)
+        self.scores: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.loaded: bool = False
+
+    @property
+    def size(self) -> int:
+        return int(self.movie_ids.shape[0])
+
+    def load(self, path: str) -> bool:
+        """Loads neighbors from an .npz file. Returns False (and stays empty) if the file is missing."""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            self.movie_ids = data["movie_ids"].astype(np.int64)
+            self.neighbors = data["neighbors"].astype(np.int32)
+            self.scores = data["scores"].astype(np.float32)
+        self.loaded = True
+        return True
+
+    def _rows(self, movie_ids: np.ndarray) -> np.ndarray:
+        """Row index per movie_id, or -1 when the movie has no CF data."""
+        if not self.size:
+            return np.full(len(movie_ids), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.movie_ids, movie_ids), self.size - 1)
+        return np.where(self.movie_ids[positions] == movie_ids, positions, -1)
+
+    def score(self, seed_movie_ids: Iterable[int], candidate_movie_ids: np.ndarray) -> np.ndarray:
+        """
+        CF affinity of each candidate to the seed movies: the mean item-item similarity
+        over seeds that list the candidate as a neighbor. Candidates without data score 0.
+        """
+        candidates = np.asarray(candidate_movie_ids, dtype=np.int64)
+        result = np.zeros(len(candidates), dtype=np.float32)
+        if not self.size or not len(candidates):
+            return result
+
+        seed_rows = self._rows(np.asarray(list(seed_movie_ids), dtype=np.int64))
+        seed_rows = seed_rows[seed_rows >= 0]
+        if not len(seed_rows):
+            return result
+
+        neighbor_rows = self.neighbors[seed_rows].ravel()
+        neighbor_scores = self.scores[seed_rows].ravel()
+        valid = neighbor_rows >= 0
+        totals = np.bincount(neighbor_rows[valid], weights=neighbor_scores[valid], minlength=self.size)
+
+        candidate_rows = self._rows(candidates)
+        has_data = candidate_rows >= 0
+        result[has_data] = totals[candidate_rows[has_data]] / len(seed_rows)
+        return result
+
+
+# Process-wide instance, loaded in main.py at startup when the neighbor file exists.
+item_neighbor_index = ItemNeighborIndex()
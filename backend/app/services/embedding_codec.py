@@ -0,0 +1,40 @@
+# app/services/embedding_codec.py
+from typing import Any, List, Optional, Sequence, Union
+
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype, VECTOR_SUBTYPE
+
+from app.core.config import settings
+
+EMBEDDING_STORAGE_FORMATS = ("list", "binary")
+# BSON vector header: dtype byte + padding byte, then little-endian float32 values
+VECTOR_HEADER_BYTES = 2
+
+
+def encode_embedding(vector: Union[np.ndarray, Sequence[float]], storage: Optional[str] = None) -> Union[List[float], Binary]:
+    """
+    Converts a vector to its stored form for EMBEDDING_STORAGE: a BSON array of doubles
+    ("list", the original format) or a packed float32 BSON vector ("binary", subtype 9),
+    which is 4 bytes per value instead of 9 and decodes without per-element objects.
+    """
+    storage = storage or settings.EMBEDDING_STORAGE
+    if storage == "list":
+        return np.asarray(vector, dtype=np.float32).tolist()
+    if storage == "binary":
+        return Binary(BinaryVectorDtype.FLOAT32.value + b"\x00" + np.asarray(vector, dtype="<f4").tobytes(), VECTOR_SUBTYPE)
+    raise ValueError(f"Unknown EMBEDDING_STORAGE '{storage}'; expected one of {', '.join(EMBEDDING_STORAGE_FORMATS)}.")
+
+
+def decode_embedding(value: Any) -> Optional[np.ndarray]:
+    """
+    Reads a stored embedding in either format as a float32 array; None if absent or empty.
+    Binary vectors are wrapped with np.frombuffer (read-only, no copy).
+    """
+    if value is None:
+        return None
+    if isinstance(value, bytes): # bson Binary subclasses bytes
+        offset = VECTOR_HEADER_BYTES if getattr(value, "subtype", None) == VECTOR_SUBTYPE else 0
+        vector = np.frombuffer(value, dtype="<f4", offset=offset)
+    else:
+        vector = np.asarray(value, dtype=np.float32)
+    return vector if vector.size else None
@@ -0,0 +1,126 @@
+# app/services/embedding_snapshot.py
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+CURRENT_FILE = "CURRENT"
+MATRIX_FILE = "matrix.npy"
+IDS_FILE = "movie_ids.npy"
+META_FILE = "meta.json"
+SNAPSHOT_FORMAT = 1
+
+
+def write_snapshot(
+    root: str,
+    movie_ids: np.ndarray,
+    matrix: np.ndarray,
+    model_name: str,
+    keep: int = 2,
+    write_extras: Optional[Callable[[str, np.ndarray, np.ndarray], None]] = None,
+) -> str:
+    """
+    Writes a new snapshot version under `root` and points CURRENT at it.
+
+    Layout: root/<version>/{matrix.npy, movie_ids.npy, meta.json} plus root/CURRENT
+    holding the active version name. Rows are L2-normalized float32 sorted by
+    movie_id, so readers can memory-map them as-is and look ids up with a binary
+    search. The version directory is fully written before it is renamed into
+    place, and CURRENT is swapped with os.replace, so a reader sees either the old
+    snapshot or the new one, never a partial write. `write_extras(directory, movie_ids,
+    matrix)` may add files derived from the rows (an ANN index) before publishing.
+    Returns the version name, a digest of the rows.
+    """
+    movie_ids = np.asarray(movie_ids, dtype=np.int64)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    order = np.argsort(movie_ids, kind="stable")
+    movie_ids = np.ascontiguousarray(movie_ids[order])
+    matrix = np.ascontiguousarray(matrix[order]) if len(order) else np.empty((0, 0), dtype=np.float32)
+    if len(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+    # Named by content alone, so republishing identical rows is never a new version for workers to switch to
+    version = hashlib.sha256(movie_ids.tobytes() + matrix.tobytes()).hexdigest()[:16]
+    os.makedirs(root, exist_ok=True)
+    existing = os.path.join(root, version)
+    if os.path.isdir(existing):
+        # Same content published before: mark it newest for pruning and make sure CURRENT points at it
+        os.utime(existing)
+        _point_current(root, version)
+        return version
+    staging = os.path.join(root, f".staging-{version}-{os.getpid()}")
+    os.makedirs(staging)
+    np.save(os.path.join(staging, MATRIX_FILE), matrix)
+    np.save(os.path.join(staging, IDS_FILE), movie_ids)
+    if write_extras is not None:
+        write_extras(staging, movie_ids, matrix)
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "model": model_name,
+        "count": int(movie_ids.shape[0]),
+        "dimension": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(staging, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    os.rename(staging, os.path.join(root, version))
+    _point_current(root, version)
+    _prune(root, keep=max(1, keep), current=version)
+    return version
+
+
+def _point_current(root: str, version: str) -> None:
+    pointer = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(pointer, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+
+def _prune(root: str, keep: int, current: str) -> None:
+    """Removes all but the newest `keep` versions. Workers still mapping an old one keep their pages until they switch."""
+    versions = sorted(
+        (name for name in os.listdir(root)
+         if not name.startswith(".") and os.path.isdir(os.path.join(root, name))),
+        key=lambda name: os.path.getmtime(os.path.join(root, name)),
+    )
+    for name in versions[:-keep]:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def current_version(root: str) -> Optional[str]:
+    """The version CURRENT points at, or None when no snapshot has been written."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_snapshot(root: str, version: Optional[str] = None) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+    """
+    Opens a snapshot read-only as (movie_ids, matrix, meta). The matrix is a memory map,
+    so every worker on a host shares the same page-cache copy. Returns None if absent.
+    """
+    version = version or current_version(root)
+    if version is None:
+        return None
+    directory = os.path.join(root, version)
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        movie_ids = np.load(os.path.join(directory, IDS_FILE), mmap_mode="r")
+        matrix = np.load(os.path.join(directory, MATRIX_FILE), mmap_mode="r")
+    except FileNotFoundError:
+        # Pruned between reading CURRENT and opening it; the caller retries on its next poll
+        return None
+    return movie_ids, matrix, meta
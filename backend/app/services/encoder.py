@@ -0,0 +1,110 @@
+# app/services/encoder.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class BatchingEncoder:
+    """
+    Micro-batching front end for a sentence encoder.
+
+    Concurrent `encode()` calls are queued and coalesced into a single batched
+    `model.encode` call (up to `max_batch_size` texts, waiting at most `max_wait_ms`
+    for a batch to fill), which runs on a dedicated worker thread so the event loop
+    keeps serving requests during inference.
+    """
+
+    def __init__(self, model: Any, max_batch_size: int = 32, max_wait_ms: float = 5.0) -> None:
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        # One thread: batching, not parallel calls, is what buys throughput, and the
+        # model's own intra-op threads already use the available cores.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encoder")
+        self.requests = 0
+        self.batches = 0
+        self.encoded_texts = 0
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Encodes one text, sharing a model call with whatever else is queued."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.requests += 1
+        await self._queue.put((text, future))
+        return await future
+
+    async def encode_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Encodes a prepared batch (e.g. cache warm-up) as one model call on the encoder
+        thread, so it never runs concurrently with the micro-batches.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_batch, texts)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True), dtype=np.float32)
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                # Still drain anything already queued without waiting
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            pending = [(text, future) for text, future in batch if not future.cancelled()]
+            if not pending:
+                continue
+            unique_texts = list(dict.fromkeys(text for text, _ in pending))
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self._encode_batch, unique_texts)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.encoded_texts += len(unique_texts)
+            by_text = dict(zip(unique_texts, embeddings))
+            for text, future in pending:
+                if not future.done():
+                    future.set_result(by_text[text])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "encoded_texts": self.encoded_texts,
+            "mean_batch_size": round(self.encoded_texts / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
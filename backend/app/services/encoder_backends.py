@@ -0,0 +1,82 @@
+# app/services/encoder_backends.py
+import os
+from typing import List, Union
+
+import numpy as np
+
+from app.core.config import settings
+
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_MODEL_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+
+
+class TorchEncoder:
+    """The original sentence-transformers path (PyTorch, fp32)."""
+
+    def __init__(self, model_name: str) -> None:
+        import torch
+        from sentence_transformers import SentenceTransformer
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime path for a sentence-transformers model exported by scripts/export_onnx_encoder.py.
+    Reproduces the Transformer -> mean Pooling -> Normalize pipeline of all-MiniLM-L6-v2 without torch.
+    """
+
+    def __init__(self, model_dir: str, model_file: str, max_seq_length: int = 256) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} not found; run scripts/export_onnx_encoder.py first.")
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+        self.max_seq_length = max_seq_length
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(
+            [self._encode_batch(batch[start:start + batch_size]) for start in range(0, len(batch), batch_size)]
+        )
+        return embeddings[0] if single else embeddings
+
+
+def load_query_encoder(backend: str = None):
+    """Builds the query encoder selected by ENCODER_BACKEND. Every backend exposes `encode(texts, batch_size=...)`."""
+    backend = backend or settings.ENCODER_BACKEND
+    if backend == "torch":
+        return TorchEncoder(settings.SENTENCE_MODEL_NAME)
+    if backend in ONNX_MODEL_FILES:
+        return OnnxEncoder(settings.ONNX_MODEL_DIR, ONNX_MODEL_FILES[backend])
+    raise ValueError(f"Unknown ENCODER_BACKEND '{backend}'; expected one of {', '.join(ENCODER_BACKENDS)}.")
@@ -0,0 +1,96 @@
+# app/services/encoder_runtime.py
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.encoder import BatchingEncoder
+from app.services.encoder_backends import load_query_encoder
+from app.services.query_embeddings import warm_up_query_embeddings
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_TEXT = "happy feeling movie in genres: action comedy"
+
+
+class EncoderRuntime:
+    """
+    Owns the query encoder's lifecycle: loading, warm-up and shutdown.
+
+    Nothing is loaded at import time; `start()` is awaited from the app lifespan.
+    The model load and warm-up encodes run in worker threads so the event loop
+    keeps answering /healthz while a worker comes up; warm-up batches go through
+    the batching encoder's thread, so they never overlap live inference. `ready` only turns true once a
+    real inference has gone through the batching encoder (spawning its worker
+    thread and the backend's intra-op pools) and the query cache is warmed;
+    recommendation endpoints only serve once it is.
+    """
+
+    def __init__(self) -> None:
+        self.model: Optional[Any] = None
+        self.encoder: Optional[BatchingEncoder] = None
+        self.error: Optional[str] = None
+        self.warmed: bool = False
+        self.load_seconds: Optional[float] = None
+        self.warm_up_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.encoder is not None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded and self.warmed
+
+    async def start(self) -> None:
+        """Loads the configured backend and warms it. Failures are recorded in `error` rather than raised."""
+        if self.loaded:
+            return
+        logger.info("Loading sentence encoder (%s, backend=%s)...", settings.SENTENCE_MODEL_NAME, settings.ENCODER_BACKEND)
+        started = time.perf_counter()
+        try:
+            self.model = await asyncio.to_thread(load_query_encoder)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.error("Failed to load sentence encoder: %s", self.error)
+            return
+        self.load_seconds = time.perf_counter() - started
+        self.encoder = BatchingEncoder(self.model, settings.ENCODER_MAX_BATCH_SIZE, settings.ENCODER_MAX_WAIT_MS)
+        self.encoder.start()
+        logger.info("Sentence encoder loaded in %.1fs.", self.load_seconds)
+
+        started = time.perf_counter()
+        try:
+            await self.encoder.encode(WARM_UP_TEXT)
+        except Exception as e:
+            self.error = f"warm-up failed: {type(e).__name__}: {e}"
+            logger.error("Sentence encoder %s", self.error)
+            return
+        if settings.QUERY_EMBEDDING_WARMUP:
+            try:
+                warmed = await warm_up_query_embeddings(self.encoder)
+                logger.info("Query embedding cache warmed with %d questionnaire queries.", warmed)
+            except Exception:
+                # The encoder works; queries just miss the cache until they are first seen
+                logger.warning("Query embedding cache warm-up failed", exc_info=True)
+        self.warm_up_seconds = time.perf_counter() - started
+        self.warmed = True
+
+    async def stop(self) -> None:
+        if self.encoder is not None:
+            await self.encoder.stop()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "backend": settings.ENCODER_BACKEND,
+            "loaded": self.loaded,
+            "warmed": self.warmed,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warm_up_seconds": self.warm_up_seconds,
+        }
+
+
+# Process-wide instance, started from the lifespan in main.py.
+encoder_runtime = EncoderRuntime()
@@ -0,0 +1,144 @@
+# app/services/filter_index.py
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.models import Movie, UserPreferences
+
+# Questionnaire preference flag -> Movie field
+PREFERENCE_FLAG_FIELDS = {"trending": "isTrending", "classic": "isClassic", "hidden_gems": "isHiddenGem"}
+
+# Questionnaire "any length" duration
+ANY_DURATION = 999
+
+FILTER_FIELDS = {"_id": 0, "movie_id": 1, "rating": 1, "duration": 1, "genres": 1, "language": 1,
+                 **{field: 1 for field in PREFERENCE_FLAG_FIELDS.values()}}
+
+
+class CatalogFilterIndex:
+    """
+    In-memory version of the questionnaire candidate filter.
+
+    Rows are movies sorted by movie_id. Genres (multi-valued) and preference flags
+    are one boolean mask per value; language is a small-int code per row (one
+    comparison instead of a mask per language); durations are kept sorted with
+    their rows, so a "max duration" cut is a binary search. A submission then
+    becomes a few vectorized AND/OR operations and the result matches what
+    `build_candidate_query` selects in MongoDB.
+    """
+
+    def __init__(self) -> None:
+        self.movie_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.ratings: np.ndarray = np.empty(0, dtype=np.float32) # NaN when unrated
+        self.genre_masks: Dict[str, np.ndarray] = {}
+        self.flag_masks: Dict[str, np.ndarray] = {} # keyed by Movie field
+        self.language_codes: np.ndarray = np.empty(0, dtype=np.int32) # -1 when unknown
+        self.languages: Dict[str, int] = {}
+        self.duration_rows: np.ndarray = np.empty(0, dtype=np.int64) # rows with a duration, by duration
+        self.sorted_durations: np.ndarray = np.empty(0, dtype=np.float64)
+        self.loaded: bool = False
+        self.build_seconds: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return int(self.movie_ids.size)
+
+    async def load(self) -> None:
+        """(Re)builds the index from MongoDB. Only the filterable fields are fetched."""
+        cursor = Movie.get_motor_collection().find({}, FILTER_FIELDS)
+        self.build([doc async for doc in cursor])
+
+    def build(self, docs: Iterable[Mapping[str, Any]]) -> None:
+        """Builds every mask from raw movie documents (dicts with the FILTER_FIELDS keys)."""
+        started = time.perf_counter()
+        docs = sorted(docs, key=lambda doc: doc["movie_id"])
+        n = len(docs)
+        movie_ids = np.fromiter((doc["movie_id"] for doc in docs), dtype=np.int64, count=n)
+        ratings = np.fromiter(
+            (np.nan if doc.get("rating") is None else doc["rating"] for doc in docs), dtype=np.float32, count=n,
+        )
+        durations = np.fromiter(
+            (np.nan if doc.get("duration") is None else doc["duration"] for doc in docs), dtype=np.float64, count=n,
+        )
+
+        genre_rows: Dict[str, List[int]] = {}
+        languages: Dict[str, int] = {}
+        language_codes = np.full(n, -1, dtype=np.int32)
+        for row, doc in enumerate(docs):
+            for genre in doc.get("genres") or ():
+                genre_rows.setdefault(genre, []).append(row)
+            language = doc.get("language")
+            if language is not None:
+                language_codes[row] = languages.setdefault(language, len(languages))
+        genre_masks = {}
+        for genre, rows in genre_rows.items():
+            mask = np.zeros(n, dtype=bool)
+            mask[rows] = True
+            genre_masks[genre] = mask
+        flag_masks = {
+            field: np.fromiter((doc.get(field) is True for doc in docs), dtype=bool, count=n)
+            for field in PREFERENCE_FLAG_FIELDS.values()
+        }
+
+        with_duration = np.flatnonzero(~np.isnan(durations))
+        duration_rows = with_duration[np.argsort(durations[with_duration], kind="stable")]
+
+        self.movie_ids, self.ratings = movie_ids, ratings
+        self.genre_masks, self.flag_masks = genre_masks, flag_masks
+        self.language_codes, self.languages = language_codes, languages
+        self.duration_rows, self.sorted_durations = duration_rows, durations[duration_rows]
+        self.loaded = True
+        self.build_seconds = time.perf_counter() - started
+
+    def mask_for(self, preferences: UserPreferences, backfill: bool = False) -> np.ndarray:
+        """Boolean row mask equivalent to `build_candidate_query(preferences, backfill)`."""
+        n = self.size
+        mask = np.ones(n, dtype=bool)
+        if preferences.language:
+            code = self.languages.get(preferences.language)
+            if code is None:
+                return np.zeros(n, dtype=bool)
+            mask &= self.language_codes == code
+        if preferences.duration != ANY_DURATION:
+            cut = int(np.searchsorted(self.sorted_durations, preferences.duration, side="right"))
+            within = np.zeros(n, dtype=bool)
+            within[self.duration_rows[:cut]] = True
+            mask &= within
+        if preferences.genres:
+            any_genre = np.zeros(n, dtype=bool)
+            for genre in set(preferences.genres):
+                genre_mask = self.genre_masks.get(genre)
+                if genre_mask is not None:
+                    any_genre |= genre_mask
+            mask &= any_genre
+        if preferences.preferences:
+            flagged = np.zeros(n, dtype=bool)
+            for flag in set(preferences.preferences):
+                flagged |= self.flag_masks[PREFERENCE_FLAG_FIELDS[flag]]
+            mask &= ~flagged if backfill else flagged
+        return mask
+
+    def candidates(self, preferences: UserPreferences, backfill: bool, limit: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (movie_ids, ratings) of up to `limit` (None: all) matching movies, by movie_id."""
+        rows = np.flatnonzero(self.mask_for(preferences, backfill))[:limit]
+        return self.movie_ids[rows], self.ratings[rows]
+
+    def memory_bytes(self) -> int:
+        arrays = [self.movie_ids, self.ratings, self.language_codes, self.duration_rows, self.sorted_durations]
+        arrays += list(self.genre_masks.values()) + list(self.flag_masks.values())
+        return sum(array.nbytes for array in arrays)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "size": self.size,
+            "genres": len(self.genre_masks),
+            "languages": len(self.languages),
+            "memory_bytes": self.memory_bytes(),
+            "build_seconds": self.build_seconds,
+        }
+
+
+# Process-wide instance, loaded in main.py at startup and rebuilt when the catalog data version changes.
+catalog_filter_index = CatalogFilterIndex()
@@ -0,0 +1,73 @@
+# app/services/movie_cards.py
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from beanie.odm.operators.find.comparison import In
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models import Movie
+from app.schemas.movie import MovieCard
+
+
+class MovieCardCache:
+    """
+    Cache of pre-encoded MovieCard JSON fragments keyed by movie_id.
+
+    Cards are fetched with a projection (no embedding), serialized once, and
+    spliced into response bodies as raw bytes, so a recommendation response
+    never re-validates or re-serializes documents.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: LRUCache[bytes] = LRUCache(maxsize)
+
+    async def fragments(self, movie_ids: List[int]) -> List[bytes]:
+        """Returns JSON fragments for the given ids in order; unknown ids are skipped."""
+        found: Dict[int, bytes] = {}
+        missing: List[int] = []
+        for movie_id in movie_ids:
+            fragment = self._cache.get(movie_id)
+            if fragment is None:
+                missing.append(movie_id)
+            else:
+                found[movie_id] = fragment
+
+        if missing:
+            cards = await Movie.find(In(Movie.movie_id, missing)).project(MovieCard).to_list()
+            for card in cards:
+                fragment = card.model_dump_json().encode()
+                self._cache.set(card.movie_id, fragment)
+                found[card.movie_id] = fragment
+
+        return [found[movie_id] for movie_id in movie_ids if movie_id in found]
+
+    async def render_list(self, movie_ids: List[int], key: str = "movies", extra: Optional[Dict[str, Any]] = None) -> bytes:
+        """Renders `{"<key>": [card, ...], **extra}` as a JSON body."""
+        body = b'{"' + key.encode() + b'":[' + b",".join(await self.fragments(movie_ids)) + b"]"
+        for name, value in (extra or {}).items():
+            body += b"," + json.dumps(name).encode() + b":" + json.dumps(value).encode()
+        return body + b"}"
+
+    async def stream_ndjson(
+        self, movie_ids: List[int], trailer: Optional[Dict[str, Any]] = None, chunk_size: int = 4,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields `{"movie": card}` lines in rank order, fetching cards a few at a time so
+        the first ones go out before the rest are loaded, then one `trailer` line.
+        """
+        for start in range(0, len(movie_ids), chunk_size):
+            for fragment in await self.fragments(movie_ids[start:start + chunk_size]):
+                yield b'{"movie":' + fragment + b"}\n"
+        if trailer is not None:
+            yield json.dumps(trailer).encode() + b"\n"
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# Process-wide instance.
+movie_card_cache = MovieCardCache(settings.MOVIE_CARD_CACHE_SIZE)
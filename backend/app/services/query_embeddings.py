@@ -0,0 +1,95 @@
+# app/services/query_embeddings.py
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, TYPE_CHECKING
+
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models import UserPreferences
+
+if TYPE_CHECKING:
+    from app.services.encoder import BatchingEncoder
+
+# --- Questionnaire vocabulary ---
+# Mirrors `moods` and `genres` in flickai/src/data/mockData.ts, which feed QuestionnaireForm.
+QUESTIONNAIRE_MOODS = ["happy", "sad", "excited", "relaxed", "romantic", "bored"]
+QUESTIONNAIRE_GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary",
+    "Drama", "Fantasy", "Historical", "Horror", "Mystery", "Romance",
+    "Science Fiction", "Thriller", "Western", "Family",
+]
+
+
+def build_query_text(mood: str, genres: Iterable[str]) -> str:
+    """
+    Builds the text that is embedded for a questionnaire submission.
+    Genres are lower-cased, de-duplicated and sorted so that the same selection
+    made in a different click order maps to the same cache entry.
+    """
+    genre_text = " ".join(sorted({genre.lower() for genre in genres}))
+    return f"{mood} feeling movie in genres: {genre_text}"
+
+
+def query_text_for(preferences: UserPreferences) -> str:
+    return build_query_text(preferences.mood, preferences.genres)
+
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings keyed by query text.
+    Bounded by entry count; each entry is a single float32 vector.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: LRUCache[np.ndarray] = LRUCache(maxsize)
+
+    async def encode(self, encoder: "BatchingEncoder", text: str) -> np.ndarray:
+        """Returns the cached embedding for `text`, going through the batching encoder only on a miss."""
+        embedding = self._cache.get(text)
+        if embedding is None:
+            embedding = await encoder.encode(text)
+            self._cache.set(text, embedding)
+        return embedding
+
+    async def warm_up(self, encoder: "BatchingEncoder", texts: List[str], batch_size: int = 64) -> int:
+        """
+        Pre-encodes the given texts in batches. Returns the number of new entries.
+        Batches run on the encoder's own thread, one at a time like live batches;
+        the cache itself is only written from the event loop.
+        """
+        missing = [text for text in dict.fromkeys(texts) if text not in self._cache]
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            embeddings = await encoder.encode_many(batch)
+            for text, embedding in zip(batch, embeddings):
+                self._cache.set(text, np.asarray(embedding, dtype=np.float32))
+        return len(missing)
+
+    def memory_bytes(self) -> int:
+        return sum(vector.nbytes for vector in self._cache.values())
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["memory_bytes"] = self.memory_bytes()
+        return stats
+
+
+def questionnaire_query_texts(max_genres: int) -> List[str]:
+    """Every mood x genre-combination query (up to `max_genres` genres) the questionnaire can send."""
+    texts = []
+    for mood in QUESTIONNAIRE_MOODS:
+        for size in range(1, max_genres + 1):
+            for genres in combinations(QUESTIONNAIRE_GENRES, size):
+                texts.append(build_query_text(mood, genres))
+    return texts
+
+
+async def warm_up_query_embeddings(encoder: "BatchingEncoder") -> int:
+    """Pre-encodes the questionnaire vocabulary into the process-wide cache."""
+    texts = questionnaire_query_texts(settings.QUERY_EMBEDDING_WARMUP_MAX_GENRES)
+    return await query_embedding_cache.warm_up(encoder, texts)
+
+
+# Process-wide instance.
+query_embedding_cache = QueryEmbeddingCache(settings.QUERY_EMBEDDING_CACHE_SIZE)
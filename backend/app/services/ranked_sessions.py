@@ -0,0 +1,92 @@
+# app/services/ranked_sessions.py
+import base64
+import binascii
+import secrets
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class CursorError(Exception):
+    """Raised for a malformed cursor (400) or one whose ranked list has expired (410)."""
+
+    def __init__(self, detail: str, status_code: int = 400) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def encode_cursor(session_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{session_id}.{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        session_id, offset = raw.rsplit(".", 1)
+        offset_value = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError("Invalid cursor.")
+    if offset_value < 0 or not session_id:
+        raise CursorError("Invalid cursor.")
+    return session_id, offset_value
+
+
+class RankedResultSessions:
+    """
+    Server-side store of full ranked result lists behind opaque cursors.
+
+    The first page of a recommendation request ranks everything once; if more
+    results remain, the ranked ids are kept here under a random session id and
+    later pages just slice them. A session is bound to the user who created it
+    (None for anonymous requests) and expires after a TTL of inactivity.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self._sessions: TTLCache[Tuple[Optional[str], np.ndarray]] = TTLCache(maxsize, ttl_seconds)
+
+    def start(self, ranked_ids: Sequence[int], owner: Optional[str]) -> str:
+        session_id = secrets.token_urlsafe(12)
+        self._sessions.set(session_id, (owner, np.asarray(ranked_ids, dtype=np.int64)))
+        return session_id
+
+    def resume(self, cursor: str, owner: Optional[str]) -> Tuple[str, np.ndarray, int]:
+        """Returns (session_id, ranked_ids, offset) for a cursor issued to `owner`."""
+        session_id, offset = decode_cursor(cursor)
+        session = self._sessions.get(session_id)
+        if session is None or session[0] != owner:
+            raise CursorError("Cursor has expired; request recommendations again.", status_code=410)
+        ranked_ids = session[1]
+        # Re-set to slide the expiry while the user keeps scrolling
+        self._sessions.set(session_id, session)
+        return session_id, ranked_ids, offset
+
+    def page(
+        self,
+        ranked_ids: Sequence[int],
+        offset: int,
+        limit: int,
+        owner: Optional[str],
+        session_id: Optional[str] = None,
+    ) -> Tuple[List[int], Optional[str]]:
+        """Slices one page and returns (page_ids, next_cursor); a session is only created when more pages remain."""
+        page_ids = [int(movie_id) for movie_id in ranked_ids[offset:offset + limit]]
+        if offset + limit >= len(ranked_ids):
+            return page_ids, None
+        session_id = session_id or self.start(ranked_ids, owner)
+        return page_ids, encode_cursor(session_id, offset + limit)
+
+    def memory_bytes(self) -> int:
+        return sum(ranked.nbytes for _, ranked in self._sessions.values())
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._sessions.stats()
+        stats["memory_bytes"] = self.memory_bytes()
+        return stats
+
+
+# Process-wide instance.
+ranked_result_sessions = RankedResultSessions(settings.RANKED_SESSION_CACHE_SIZE, settings.RANKED_SESSION_TTL_SECONDS)
@@ -0,0 +1,68 @@
+# app/services/result_cache.py
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import UserPreferences
+
+
+def preferences_cache_key(preferences: UserPreferences) -> Tuple[Hashable, ...]:
+    """
+    Canonical key for a questionnaire submission.
+    Only fields that change the ranking are included (watchingWith and ageRange
+    are not used by the pipeline), and genres and preference flags are de-duplicated
+    and sorted so the same selection in another click order shares an entry.
+    Genres keep their case because the Mongo filter on them is case-sensitive.
+    """
+    return (
+        preferences.mood,
+        tuple(sorted(set(preferences.genres))),
+        preferences.language,
+        preferences.duration,
+        tuple(sorted(set(preferences.preferences))),
+    )
+
+
+class RecommendationResultCache:
+    """
+    TTL + LRU cache of ranked movie_id lists for anonymous recommendations.
+
+    Entries are dropped wholesale by `invalidate()` when the catalog data version
+    or the embedding snapshot changes. A `generation` counter guards against a
+    request that started before an invalidation storing its now-stale result after it.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self._cache: TTLCache[np.ndarray] = TTLCache(maxsize, ttl_seconds)
+        self.generation = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[List[int]]:
+        ranked = self._cache.get(key)
+        return ranked.tolist() if ranked is not None else None
+
+    def set(self, key: Hashable, ranked_ids: List[int], generation: int) -> None:
+        """Stores a result computed while `generation` was current; dropped if an invalidation happened since."""
+        if generation != self.generation:
+            return
+        self._cache.set(key, np.asarray(ranked_ids, dtype=np.int64))
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self.invalidations += 1
+        self._cache.clear()
+
+    def memory_bytes(self) -> int:
+        return sum(ranked.nbytes for ranked in self._cache.values())
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["memory_bytes"] = self.memory_bytes()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+# Process-wide instance.
+recommendation_result_cache = RecommendationResultCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL_SECONDS)
@@ -0,0 +1,52 @@
+# app/services/similar_movies.py
+import os
+from typing import List, Optional
+
+import numpy as np
+
+
+class SimilarMovieIndex:
+    """
+    Serving side of scripts/build_similar_movies.py: the precomputed top-K embedding
+    neighbors of every movie ("more like this"). A lookup is a binary search over the
+    sorted movie ids plus a row slice; no model or database call is involved.
+    """
+
+    def __init__(self) -> None:
+        self.movie_ids: np.ndarray = np.empty(0, dtype=np.int64) # Sorted
+        self.neighbors: np.ndarray = np.empty((0, 0), dtype=np.int32) # Rows into movie_ids, -1 = empty slot
+        self.loaded: bool = False
+        self.mtime: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return int(self.movie_ids.shape[0])
+
+    def load(self, path: str) -> bool:
+        """Loads (or reloads, if the file changed) the neighbor file. Returns False if it is missing."""
+        try:
+            mtime = os.path.getmtime(path)
+        except FileNotFoundError:
+            return False
+        if mtime == self.mtime:
+            return True
+        with np.load(path) as data:
+            movie_ids = data["movie_ids"].astype(np.int64)
+            neighbors = data["neighbors"].astype(np.int32)
+        self.movie_ids, self.neighbors = movie_ids, neighbors
+        self.loaded, self.mtime = True, mtime
+        return True
+
+    def similar(self, movie_id: int, limit: int) -> Optional[List[int]]:
+        """Up to `limit` most similar movie ids, best first; None if the movie has no neighbor list."""
+        if not self.size:
+            return None
+        row = int(np.searchsorted(self.movie_ids, movie_id))
+        if row >= self.size or self.movie_ids[row] != movie_id:
+            return None
+        rows = self.neighbors[row, :limit]
+        return self.movie_ids[rows[rows >= 0]].tolist()
+
+
+# Process-wide instance, loaded in main.py at startup and reloaded when the job rewrites the file.
+similar_movie_index = SimilarMovieIndex()
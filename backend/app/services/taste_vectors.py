@@ -0,0 +1,131 @@
+# app/services/taste_vectors.py
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from pymongo import ReturnDocument
+
+from app.core.singleflight import SingleFlight
+from app.models import User
+from app.services.catalog_index import catalog_index
+
+# Concurrent stale reads for one user rebuild their running sum once
+taste_vector_rebuilds: SingleFlight[None] = SingleFlight()
+
+
+def rebuild_taste_vector(movie_ids: Iterable[int]) -> Tuple[np.ndarray, int]:
+    """Full recompute of (sum, count) from favorites; used only to (re)initialize the running sum."""
+    rows, found = catalog_index.rows_for(movie_ids)
+    if rows.size == 0:
+        return np.zeros(catalog_index.dimension, dtype=np.float32), 0
+    return catalog_index.matrix[rows].sum(axis=0), int(found.size)
+
+
+async def _sync_taste_vector(user_id, version: str) -> None:
+    """
+    Rebuilds the running sum from the stored favorites unless it was built against the
+    catalog index `version`. Embeddings differ between versions, so increments are only
+    ever applied to a sum tagged with the version their vectors came from.
+    """
+    collection = User.get_motor_collection()
+    doc = await collection.find_one({"_id": user_id}, {"favorite_movie_ids": 1, "taste_vector_version": 1})
+    if doc is None or doc.get("taste_vector_version") == version or catalog_index.version != version:
+        return
+    favorites = doc.get("favorite_movie_ids", [])
+    vector, count = rebuild_taste_vector(favorites)
+    await collection.update_one(
+        # Skipped if a concurrent request changed the favorites or rebuilt the sum meanwhile
+        {"_id": user_id, "favorite_movie_ids": favorites, "taste_vector_version": doc.get("taste_vector_version")},
+        {"$set": {"taste_vector_sum": vector.tolist(), "taste_vector_count": count, "taste_vector_version": version}},
+    )
+
+
+def _inc_vector(vector: np.ndarray, sign: int) -> dict:
+    return {f"taste_vector_sum.{i}": sign * float(value) for i, value in enumerate(vector)}
+
+
+def _favorite_vector(movie_id: int) -> Tuple[Optional[str], Optional[np.ndarray]]:
+    """(catalog version, the movie's embedding or None), read together so they can't straddle a snapshot switch."""
+    row = catalog_index.row_for(movie_id)
+    return catalog_index.version, (np.array(catalog_index.matrix[row]) if row is not None else None)
+
+
+async def add_favorite(user: User, movie_id: int) -> bool:
+    """
+    Adds a favorite and folds its embedding into the user's running taste sum in one atomic update.
+    The filter only matches if the movie isn't already a favorite, so repeats don't double-count.
+    Returns True if the favorite was added.
+    """
+    collection = User.get_motor_collection()
+    version, vector = _favorite_vector(movie_id)
+    if version is not None:
+        await _sync_taste_vector(user.id, version)
+        update = {"$push": {"favorite_movie_ids": movie_id}}
+        if vector is not None:
+            update["$inc"] = {**_inc_vector(vector, 1), "taste_vector_count": 1}
+        result = await collection.update_one(
+            {"_id": user.id, "favorite_movie_ids": {"$ne": movie_id}, "taste_vector_version": version}, update,
+        )
+        if result.modified_count == 1:
+            return True
+
+    # Catalog not loaded, or the sum is tagged with another version: add the favorite and
+    # untag the sum so the next favorite change (or read) rebuilds it
+    result = await collection.update_one(
+        {"_id": user.id, "favorite_movie_ids": {"$ne": movie_id}},
+        {"$push": {"favorite_movie_ids": movie_id}, "$set": {"taste_vector_version": None}},
+    )
+    return result.modified_count == 1
+
+
+async def remove_favorite(user: User, movie_id: int) -> bool:
+    """Removes a favorite and subtracts its embedding from the running taste sum. Returns True if removed."""
+    collection = User.get_motor_collection()
+    version, vector = _favorite_vector(movie_id)
+    if version is not None:
+        await _sync_taste_vector(user.id, version)
+        update = {"$pull": {"favorite_movie_ids": movie_id}}
+        if vector is not None:
+            update["$inc"] = {**_inc_vector(vector, -1), "taste_vector_count": -1}
+        doc = await collection.find_one_and_update(
+            {"_id": user.id, "favorite_movie_ids": movie_id, "taste_vector_version": version}, update,
+            projection={"taste_vector_count": 1}, return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            if vector is not None and doc.get("taste_vector_count", 0) <= 0:
+                # Last contributing favorite gone: reset so float drift doesn't linger in an "empty" vector
+                await collection.update_one(
+                    {"_id": user.id, "taste_vector_count": {"$lte": 0}, "taste_vector_version": version},
+                    {"$set": {"taste_vector_sum": [0.0] * vector.shape[0], "taste_vector_count": 0}},
+                )
+            return True
+
+    result = await collection.update_one(
+        {"_id": user.id, "favorite_movie_ids": movie_id},
+        {"$pull": {"favorite_movie_ids": movie_id}, "$set": {"taste_vector_version": None}},
+    )
+    return result.modified_count == 1
+
+
+def taste_vector_stale(user: User) -> bool:
+    """True if the user's stored running sum was built against other embeddings (or never built)."""
+    return catalog_index.version is not None and user.taste_vector_version != catalog_index.version
+
+
+async def refresh_taste_vector(user: User) -> None:
+    """Rebuilds and persists a stale running sum, so the user's later reads are O(1) again."""
+    version = catalog_index.version
+    if version is None:
+        return
+    await taste_vector_rebuilds.run((user.id, version), lambda: _sync_taste_vector(user.id, version))
+
+
+def taste_vector(user: User) -> Optional[np.ndarray]:
+    """The user's mean favorite embedding, or None if they have no favorites with embeddings."""
+    if user.taste_vector_version is None or user.taste_vector_version != catalog_index.version:
+        # Built against other embeddings (or not yet): fall back to a one-off recompute;
+        # callers schedule refresh_taste_vector so this only happens until it is persisted
+        vector, count = rebuild_taste_vector(user.favorite_movie_ids)
+        return vector / count if count else None
+    if user.taste_vector_count <= 0 or not user.taste_vector_sum:
+        return None
+    return np.asarray(user.taste_vector_sum, dtype=np.float32) / user.taste_vector_count
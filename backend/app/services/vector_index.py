@@ -0,0 +1,208 @@
+# app/services/vector_index.py
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.catalog_index import CatalogIndex, lookup_rows, normalize
+
+VECTOR_INDEX_BACKENDS = ("exact", "hnsw")
+HNSW_INDEX_FILE = "hnsw.bin"
+HNSW_META_FILE = "hnsw.json"
+
+
+def top_k(movie_ids: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The `k` highest-scoring (movie_ids, scores), best first."""
+    if scores.size > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        movie_ids, scores = movie_ids[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return movie_ids[order], scores[order]
+
+
+class ExactVectorIndex:
+    """Brute-force cosine search: one matrix-vector product over the (allowed) rows. Nothing to persist."""
+
+    name = "exact"
+
+    def __init__(self, movie_ids: np.ndarray, matrix: np.ndarray) -> None:
+        # Captured arrays, not the CatalogIndex, so a snapshot switch can't mix rows from two versions
+        self.movie_ids, self.matrix = movie_ids, matrix
+
+    @property
+    def size(self) -> int:
+        return int(self.movie_ids.size)
+
+    def search(self, query: np.ndarray, k: int, allowed_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-`k` (movie_ids, cosine scores) for the query, restricted to `allowed_ids` when given."""
+        query = normalize(query)
+        if allowed_ids is None:
+            return top_k(self.movie_ids, self.matrix @ query, k)
+        rows, found = lookup_rows(self.movie_ids, allowed_ids)
+        if rows.size == 0:
+            return found, np.empty(0, dtype=np.float32)
+        return top_k(found, self.matrix[rows] @ query, k)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "size": self.size}
+
+
+class HnswVectorIndex(ExactVectorIndex):
+    """
+    Approximate search over an hnswlib HNSW graph (inner product on the normalized rows,
+    i.e. cosine). Graph labels are catalog row numbers.
+
+    Filtered search walks the graph with an allow-list of rows. When the filter keeps
+    only a small share of the catalog, a filtered graph walk has to visit many rejected
+    nodes, so below `exact_fraction` the allowed rows are scored exactly instead (the
+    set is small enough for that to be the faster path anyway). The same exact scoring
+    is the fallback when a filtered walk can't reach `k` allowed nodes.
+    """
+
+    name = "hnsw"
+
+    def __init__(self, movie_ids: np.ndarray, matrix: np.ndarray, graph: Any, ef_search: int, exact_fraction: float) -> None:
+        super().__init__(movie_ids, matrix)
+        self.graph = graph
+        self.ef_search = ef_search
+        self.exact_fraction = exact_fraction
+
+    @classmethod
+    def build(cls, movie_ids: np.ndarray, matrix: np.ndarray, m: int, ef_construction: int, ef_search: int,
+              exact_fraction: float) -> "HnswVectorIndex":
+        import hnswlib
+        graph = hnswlib.Index(space="ip", dim=int(matrix.shape[1]))
+        graph.init_index(max_elements=max(1, int(matrix.shape[0])), M=m, ef_construction=ef_construction)
+        if matrix.shape[0]:
+            graph.add_items(np.asarray(matrix, dtype=np.float32), np.arange(matrix.shape[0]))
+        return cls(movie_ids, matrix, graph, ef_search, exact_fraction)
+
+    @classmethod
+    def load(cls, directory: str, movie_ids: np.ndarray, matrix: np.ndarray, ef_search: int,
+             exact_fraction: float) -> Optional["HnswVectorIndex"]:
+        """Loads a graph saved next to a snapshot, or returns None if there is none for these rows."""
+        import hnswlib
+        try:
+            with open(os.path.join(directory, HNSW_META_FILE)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        if meta.get("count") != int(movie_ids.size):
+            return None
+        graph = hnswlib.Index(space="ip", dim=int(matrix.shape[1]))
+        graph.load_index(os.path.join(directory, HNSW_INDEX_FILE), max_elements=max(1, int(movie_ids.size)))
+        return cls(movie_ids, matrix, graph, ef_search, exact_fraction)
+
+    def save(self, directory: str) -> None:
+        self.graph.save_index(os.path.join(directory, HNSW_INDEX_FILE))
+        meta = {"count": self.size, "M": self.graph.M, "ef_construction": self.graph.ef_construction}
+        with open(os.path.join(directory, HNSW_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def search(self, query: np.ndarray, k: int, allowed_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize(query)
+        allowed_rows = None
+        if allowed_ids is not None:
+            allowed_rows, found = lookup_rows(self.movie_ids, allowed_ids)
+            if allowed_rows.size <= max(k, self.exact_fraction * self.size):
+                if allowed_rows.size == 0:
+                    return found, np.empty(0, dtype=np.float32)
+                return top_k(found, self.matrix[allowed_rows] @ query, k)
+        k = min(k, self.size if allowed_rows is None else int(allowed_rows.size))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self.graph.set_ef(max(self.ef_search, k))
+        if allowed_rows is None:
+            labels, distances = self.graph.knn_query(query, k=k)
+        else:
+            allowed = np.zeros(self.size, dtype=bool)
+            allowed[allowed_rows] = True
+            try:
+                # The filter is a Python callback, which hnswlib only supports single-threaded
+                labels, distances = self.graph.knn_query(query, k=k, num_threads=1, filter=lambda row: allowed[row])
+            except RuntimeError:
+                # The filtered walk reached fewer than k allowed nodes (sparse, fragmented filter)
+                return top_k(found, self.matrix[allowed_rows] @ query, k)
+        # "ip" distance is 1 - inner product
+        return self.movie_ids[labels[0].astype(np.int64)], (1 - distances[0]).astype(np.float32)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "M": self.graph.M, "ef_search": self.ef_search, "exact_fraction": self.exact_fraction}
+
+
+def build_vector_index(backend: str, movie_ids: np.ndarray, matrix: np.ndarray) -> ExactVectorIndex:
+    """Builds the VECTOR_INDEX_BACKEND index over normalized, movie_id-sorted rows."""
+    if backend == "exact":
+        return ExactVectorIndex(movie_ids, matrix)
+    if backend == "hnsw":
+        return HnswVectorIndex.build(movie_ids, matrix, settings.HNSW_M, settings.HNSW_EF_CONSTRUCTION,
+                                     settings.HNSW_EF_SEARCH, settings.HNSW_EXACT_FRACTION)
+    raise ValueError(f"Unknown VECTOR_INDEX_BACKEND '{backend}'; expected one of {', '.join(VECTOR_INDEX_BACKENDS)}.")
+
+
+def write_vector_index(directory: str, movie_ids: np.ndarray, matrix: np.ndarray) -> None:
+    """Snapshot extra: persists the configured ANN index next to the matrix it was built from."""
+    if settings.VECTOR_INDEX_BACKEND == "hnsw" and len(movie_ids):
+        build_vector_index("hnsw", movie_ids, matrix).save(directory)
+
+
+class CatalogVectorIndex:
+    """
+    The similarity-search index over the catalog index's current rows.
+
+    Rebuilt (or, for a snapshot with a persisted graph, loaded) whenever the
+    catalog index changes. If the configured backend can't be used — hnswlib not
+    installed, say — it falls back to exact search and records why.
+    """
+
+    def __init__(self) -> None:
+        self.index: Optional[ExactVectorIndex] = None
+        self.version: Optional[str] = None
+        self.source: Optional[str] = None # "exact", "built" or "snapshot"
+        self.error: Optional[str] = None
+        self.build_seconds: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return self.index.size if self.index is not None else 0
+
+    def load(self, catalog: CatalogIndex, backend: str, snapshot_root: str) -> None:
+        """Points the index at the catalog's current rows. Blocking; run it in a thread."""
+        movie_ids, matrix, version = catalog.movie_ids, catalog.matrix, catalog.version
+        started = time.perf_counter()
+        index, source, error = None, backend, None
+        if backend == "hnsw" and catalog.size:
+            try:
+                if catalog.source == "snapshot" and version is not None:
+                    index = HnswVectorIndex.load(os.path.join(snapshot_root, version), movie_ids, matrix,
+                                                 settings.HNSW_EF_SEARCH, settings.HNSW_EXACT_FRACTION)
+                    source = "snapshot"
+                if index is None:
+                    index, source = build_vector_index("hnsw", movie_ids, matrix), "built"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        if index is None:
+            index, source = build_vector_index("exact", movie_ids, matrix), "exact"
+        self.index, self.version, self.source, self.error = index, version, source, error
+        self.build_seconds = time.perf_counter() - started
+
+    def search(self, query: np.ndarray, k: int, allowed_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if self.index is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return self.index.search(query, k, allowed_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **(self.index.stats() if self.index is not None else {"backend": None, "size": 0}),
+            "source": self.source,
+            "version": self.version,
+            "error": self.error,
+            "build_seconds": self.build_seconds,
+        }
+
+
+# Process-wide instance, loaded in main.py after the catalog index.
+catalog_vector_index = CatalogVectorIndex()
@@ -1,25 +1,162 @@
 # app/main.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
-# SentenceTransformer is loaded in endpoints/recommendations.py now
-# from sentence_transformers import SentenceTransformer
-# import torch
+# The sentence encoder is loaded from the lifespan (app/services/encoder_runtime.py), not at import time
 
 from app.models import Movie, User # Import models needed for init_beanie
 from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.core.metrics import REQUEST_SECONDS, registry, request_details, request_timings, server_timing_header
+from app.api.deps import auth_cache_stats
+from app.crud import recommendation_flights
+from app.services.catalog_index import catalog_index
+from app.services.cf_index import item_neighbor_index
+from app.services.similar_movies import similar_movie_index
+from app.services.catalog_version import catalog_version_tracker
+from app.services.filter_index import catalog_filter_index
+from app.services.vector_index import catalog_vector_index
+from app.services.encoder_runtime import encoder_runtime
+from app.services.movie_cards import movie_card_cache
+from app.services.query_embeddings import query_embedding_cache
+from app.services.ranked_sessions import ranked_result_sessions
+from app.services.result_cache import recommendation_result_cache
 
 # Import API Routers
 from app.api.endpoints import auth as auth_router
 from app.api.endpoints import users as users_router
 from app.api.endpoints import recommendations as recommendations_router # <-- IMPORT NEW ROUTER
+from app.api.endpoints import movies as movies_router
+
+configure_logging(settings.LOG_LEVEL, settings.LOG_RATE_LIMIT_PER_SECOND, settings.LOG_RATE_LIMIT_BURST)
+logger = logging.getLogger("app.main")
+
+async def load_serving_state():
+    """Loads the catalog index, CF neighbors and the sentence encoder; /readyz turns green when this is done."""
+    if catalog_index.load_snapshot(settings.EMBEDDING_SNAPSHOT_DIR):
+        logger.info("Catalog index mapped from snapshot %s: %d embeddings (dim=%d).",
+                    catalog_index.version, catalog_index.size, catalog_index.dimension)
+    else:
+        await catalog_index.load()
+        logger.info("No embedding snapshot at '%s'; catalog index loaded from MongoDB: %d embeddings (dim=%d).",
+                    settings.EMBEDDING_SNAPSHOT_DIR, catalog_index.size, catalog_index.dimension)
+    await load_vector_index()
+    if settings.CANDIDATE_FILTER_BACKEND == "memory":
+        await load_filter_index()
+    if item_neighbor_index.load(settings.CF_NEIGHBORS_PATH):
+        logger.info("Item-item CF neighbors loaded for %d movies.", item_neighbor_index.size)
+    else:
+        logger.info("No CF neighbors at '%s'; ranking uses embeddings only.", settings.CF_NEIGHBORS_PATH)
+    if similar_movie_index.load(settings.SIMILAR_MOVIES_PATH):
+        logger.info("Similar-movie neighbors loaded for %d movies.", similar_movie_index.size)
+    else:
+        logger.info("No similar-movie neighbors at '%s'; /movies/{movie_id}/similar returns 404.", settings.SIMILAR_MOVIES_PATH)
+    await encoder_runtime.start()
+    if encoder_runtime.ready:
+        logger.info("Application is ready to serve recommendations.")
+
+async def load_vector_index():
+    """(Re)points the vector index at the catalog index's rows; an HNSW graph is loaded from the snapshot or built."""
+    await asyncio.to_thread(catalog_vector_index.load, catalog_index, settings.VECTOR_INDEX_BACKEND, settings.EMBEDDING_SNAPSHOT_DIR)
+    if catalog_vector_index.error:
+        logger.warning("Vector index backend '%s' unavailable (%s); using exact search.",
+                       settings.VECTOR_INDEX_BACKEND, catalog_vector_index.error)
+    else:
+        logger.info("Vector index ready: %s over %d embeddings (%s, %.2fs).", settings.VECTOR_INDEX_BACKEND,
+                    catalog_vector_index.size, catalog_vector_index.source, catalog_vector_index.build_seconds)
+
+async def load_filter_index():
+    """Builds the in-memory candidate filter; on failure candidates keep coming from MongoDB."""
+    try:
+        await catalog_filter_index.load()
+        logger.info("Candidate filter index built for %d movies in %.2fs (%.1f MB).", catalog_filter_index.size,
+                    catalog_filter_index.build_seconds, catalog_filter_index.memory_bytes() / 1e6)
+    except Exception:
+        logger.warning("Failed to build the candidate filter index; filtering in MongoDB", exc_info=True)
+
+def invalidate_catalog_caches():
+    """Drops everything derived from movie data: ranked result lists and rendered movie cards."""
+    recommendation_result_cache.invalidate()
+    movie_card_cache.clear()
+
+async def watch_embedding_snapshot():
+    """
+    Switches the catalog index to a newer snapshot when generate_embeddings.py publishes one,
+    and reloads similar-movie neighbors when build_similar_movies.py rewrites them.
+    """
+    while True:
+        await asyncio.sleep(settings.EMBEDDING_SNAPSHOT_POLL_SECONDS)
+        previous = catalog_index.version
+        try:
+            if catalog_index.load_snapshot(settings.EMBEDDING_SNAPSHOT_DIR) and catalog_index.version != previous:
+                await load_vector_index()
+                invalidate_catalog_caches()
+                logger.info("Catalog index switched to snapshot %s (%d embeddings).", catalog_index.version, catalog_index.size)
+        except Exception:
+            logger.warning("Failed to switch embedding snapshot", exc_info=True)
+        try:
+            previous_mtime = similar_movie_index.mtime
+            if similar_movie_index.load(settings.SIMILAR_MOVIES_PATH) and similar_movie_index.mtime != previous_mtime:
+                logger.info("Similar-movie neighbors reloaded for %d movies.", similar_movie_index.size)
+        except Exception:
+            logger.warning("Failed to reload similar-movie neighbors", exc_info=True)
+
+async def watch_catalog_version(database):
+    """
+    Invalidates cached results when an import, enrichment or embedding run bumps the catalog data version.
+    A catalog index loaded from MongoDB (no snapshot) is reloaded too, along with its vector index.
+    """
+    while True:
+        try:
+            if await catalog_version_tracker.refresh(database):
+                if catalog_index.source == "mongo":
+                    await catalog_index.load()
+                    await load_vector_index()
+                    logger.info("Catalog index reloaded from MongoDB: %d embeddings.", catalog_index.size)
+                if settings.CANDIDATE_FILTER_BACKEND == "memory" and catalog_filter_index.loaded:
+                    await load_filter_index()
+                invalidate_catalog_caches()
+                logger.info("Catalog data version is now %s; result and card caches cleared.", catalog_version_tracker.version)
+        except Exception:
+            logger.warning("Failed to read catalog data version", exc_info=True)
+        await asyncio.sleep(settings.CATALOG_VERSION_POLL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize Beanie, then load serving state in the background so /healthz answers immediately."""
+    logger.info("Starting up application...")
+    client = AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
+    db = client[settings.DATABASE_NAME]
+    await init_beanie(database=db, document_models=[Movie, User])
+    logger.info("Beanie initialized with database '%s'.", settings.DATABASE_NAME)
+    loader = asyncio.create_task(load_serving_state())
+    app.state.serving_loader = loader
+    background = [loader]
+    if settings.EMBEDDING_SNAPSHOT_POLL_SECONDS > 0:
+        background.append(asyncio.create_task(watch_embedding_snapshot()))
+    if settings.CATALOG_VERSION_POLL_SECONDS > 0:
+        background.append(asyncio.create_task(watch_catalog_version(db)))
+    logger.info("Application startup complete; loading models in the background.")
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await encoder_runtime.stop()
+    client.close()
 
 # FastAPI App Initialization
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="0.5.0", # Version bump
-    description="API for FlickAI movie recommendations with authentication and recommendations endpoint."
+    description="API for FlickAI movie recommendations with authentication and recommendations endpoint.",
+    lifespan=lifespan,
 )
 
 # CORS Middleware (remains same)
@@ -30,26 +167,91 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read per-request pipeline details
+    expose_headers=["Server-Timing", "X-Candidate-Count", "X-Backfill-Count", "X-Fill-Rate"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize Beanie and connect to MongoDB."""
-    print("Starting up application...")
-    client = AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
-    db = client[settings.DATABASE_NAME]
-    await init_beanie(database=db, document_models=[Movie, User])
-    print(f"Beanie initialized with database '{settings.DATABASE_NAME}'.")
-    print("Application startup complete.")
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    """
+    Observes request latency per route and reports pipeline stage timings in a Server-Timing header,
+    plus any details noted by the pipeline (candidate count, fill rate) as X-* headers.
+    """
+    timings, details = {}, {}
+    token = request_timings.set(timings)
+    details_token = request_details.set(details)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_timings.reset(token)
+        request_details.reset(details_token)
+    elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=str(response.status_code),
+    )
+    response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    for name, value in details.items():
+        response.headers[f"X-{name}"] = value
+    return response
+
+# Cache and encoder stats, read at scrape time
+registry.gauge_callback("flickai_cache", "Recommendation and auth cache statistics", "cache", lambda: {
+    "recommendation_results": recommendation_result_cache.stats(),
+    "ranked_sessions": ranked_result_sessions.stats(),
+    "query_embeddings": query_embedding_cache.stats(),
+    "movie_cards": movie_card_cache.stats(),
+    **auth_cache_stats(),
+})
+registry.gauge_callback("flickai_single_flight", "Recommendation request coalescing", "pipeline", lambda: {
+    "recommendations": recommendation_flights.stats(),
+})
+registry.gauge_callback("flickai_encoder", "Batching query encoder", "backend", lambda: {
+    settings.ENCODER_BACKEND: encoder_runtime.encoder.stats() if encoder_runtime.encoder is not None else {},
+})
 
 # --- API Routers ---
 app.include_router(auth_router.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(users_router.router, prefix="/api/v1/users", tags=["Users"])
 # --- INCLUDE RECOMMENDATIONS ROUTER ---
 app.include_router(recommendations_router.router, prefix="/api/v1", tags=["Recommendations"])
+app.include_router(movies_router.router, prefix="/api/v1/movies", tags=["Movies"])
 # ---
 
 # --- Root Endpoint ---
 @app.get("/")
 async def read_root():
-    return {"message": f"Welcome to {settings.PROJECT_NAME}!"}
\ No newline at end of file
+    return {"message": f"Welcome to {settings.PROJECT_NAME}!"}
+
+# --- Health Endpoints ---
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and the event loop is responsive."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: the encoder is loaded and warmed and the catalog index is in memory."""
+    loader = getattr(app.state, "serving_loader", None)
+    if loader is not None and loader.done() and not loader.cancelled() and loader.exception() is not None:
+        error = f"{type(loader.exception()).__name__}: {loader.exception()}"
+    else:
+        error = encoder_runtime.error
+    checks = {
+        "encoder": encoder_runtime.status(),
+        "catalog_index": catalog_index.stats(),
+        "cf_neighbors": {"size": item_neighbor_index.size},
+        "similar_movies": {"size": similar_movie_index.size},
+    }
+    ready = encoder_runtime.ready and catalog_index.loaded
+    status = "ready" if ready else ("failed" if error else "starting")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": status, "error": error, "checks": checks},
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition: request and pipeline stage latency histograms, cache gauges."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
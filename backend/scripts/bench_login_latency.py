@@ -0,0 +1,85 @@
+# scripts/bench_login_latency.py
+"""
+Measures /recommendations latency while a burst of concurrent logins hits /token.
+
+Run against a live server (uvicorn main:app) with an existing account:
+
+    python scripts/bench_login_latency.py --email bench@example.com --password benchpass123
+
+Two phases are run back to back: recommendations alone (baseline), then recommendations
+while `--login-concurrency` clients log in continuously. If bcrypt blocked the event loop,
+the second phase's p99 would jump by roughly one hash time per queued login.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+SAMPLE_PREFERENCES = {
+    "mood": "happy", "watchingWith": "friends", "ageRange": "adult",
+    "genres": ["Action", "Comedy"], "language": "English", "duration": 150,
+    "preferences": [],
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def recommendation_loop(client: httpx.AsyncClient, stop_at: float, latencies: List[float]) -> None:
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        response = await client.post("/api/v1/recommendations", json=SAMPLE_PREFERENCES)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def login_loop(client: httpx.AsyncClient, stop_at: float, email: str, password: str, counts: dict) -> None:
+    while time.perf_counter() < stop_at:
+        response = await client.post("/api/v1/auth/token", data={"username": email, "password": password})
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+async def run_phase(base_url: str, seconds: float, reco_clients: int, login_clients: int, email: str, password: str) -> None:
+    latencies: List[float] = []
+    login_counts: dict = {}
+    limits = httpx.Limits(max_connections=reco_clients + login_clients + 4)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop_at = time.perf_counter() + seconds
+        tasks = [recommendation_loop(client, stop_at, latencies) for _ in range(reco_clients)]
+        tasks += [login_loop(client, stop_at, email, password, login_counts) for _ in range(login_clients)]
+        await asyncio.gather(*tasks)
+
+    label = "with login burst" if login_clients else "baseline"
+    print(f"\n{label}: {len(latencies)} recommendation requests over {seconds:.0f}s")
+    if latencies:
+        print(f"  p50 {statistics.median(latencies):.1f} ms | p95 {percentile(latencies, 95):.1f} ms | "
+              f"p99 {percentile(latencies, 99):.1f} ms | max {max(latencies):.1f} ms")
+    if login_clients:
+        total = sum(login_counts.values())
+        print(f"  logins: {total} ({total / seconds:.1f}/s), status codes: {login_counts}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark recommendation latency under concurrent logins.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--reco-concurrency", type=int, default=4)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    await run_phase(args.base_url, args.seconds, args.reco_concurrency, 0, args.email, args.password)
+    await run_phase(args.base_url, args.seconds, args.reco_concurrency, args.login_concurrency, args.email, args.password)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+# scripts/benchmark_filter_index.py
+"""
+Benchmarks recommendation candidate selection: the in-memory filter index
+(app/services/filter_index.py) against the MongoDB query from `build_candidate_query`.
+
+Synthetic movies are written to a scratch database (dropped afterwards unless --keep),
+with the same indexes as the real `movies` collection. For each catalog size both
+backends run `fetch_candidates` for a set of questionnaire submissions; match counts
+are cross-checked against `count_documents` so both paths select the same movies.
+
+    python scripts/benchmark_filter_index.py --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+from app.crud import CANDIDATE_LIMIT, build_candidate_query, fetch_candidates
+from app.models import Movie, UserPreferences
+from app.services.filter_index import PREFERENCE_FLAG_FIELDS, catalog_filter_index
+from app.services.query_embeddings import QUESTIONNAIRE_GENRES
+
+# --- Configuration ---
+BENCH_DATABASE_NAME = f"{settings.DATABASE_NAME}_filter_bench"
+INSERT_BATCH_SIZE = 10000
+LANGUAGES = ["English"] * 12 + ["Hindi", "Tamil", "French", "Spanish", "Japanese", "Korean", "German", "Italian"]
+# Share of movies carrying each preference flag
+FLAG_RATES = {"isTrending": 0.02, "isClassic": 0.05, "isHiddenGem": 0.03}
+
+SAMPLE_PREFERENCES = [
+    dict(genres=["Action"], language="English", duration=120, preferences=[]),
+    dict(genres=["Comedy", "Romance", "Drama"], language="English", duration=999, preferences=[]),
+    dict(genres=["Horror"], language="", duration=90, preferences=[]),
+    dict(genres=["Drama"], language="English", duration=150, preferences=["trending"]),
+    dict(genres=["Western", "Crime"], language="Tamil", duration=120, preferences=["classic", "hidden_gems"]),
+]
+
+
+def synthetic_movies(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Movies with 1-3 genres, a skewed language mix, some missing durations/ratings and sparse flags."""
+    rng = np.random.default_rng(seed)
+    genre_counts = rng.integers(1, 4, size=count)
+    genre_picks = rng.integers(0, len(QUESTIONNAIRE_GENRES), size=(count, 3))
+    languages = rng.integers(0, len(LANGUAGES), size=count)
+    durations = rng.integers(70, 200, size=count)
+    has_duration = rng.random(count) > 0.05
+    ratings = np.round(rng.uniform(1, 10, size=count), 1)
+    has_rating = rng.random(count) > 0.1
+    flags = {field: rng.random(count) < rate for field, rate in FLAG_RATES.items()}
+
+    movies = []
+    for i in range(count):
+        movies.append({
+            "movie_id": i + 1,
+            "title": f"Synthetic movie {i + 1}",
+            "genres": sorted({QUESTIONNAIRE_GENRES[g] for g in genre_picks[i, :genre_counts[i]]}),
+            "language": LANGUAGES[languages[i]],
+            "duration": int(durations[i]) if has_duration[i] else None,
+            "rating": float(ratings[i]) if has_rating[i] else None,
+            **{field: bool(values[i]) for field, values in flags.items()},
+        })
+    return movies
+
+
+async def time_backend(backend: str, preferences: UserPreferences, backfill: bool, repeats: int) -> float:
+    """Median milliseconds of `fetch_candidates` with the given backend."""
+    settings.CANDIDATE_FILTER_BACKEND = backend
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await fetch_candidates(preferences, backfill=backfill, limit=CANDIDATE_LIMIT)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def benchmark_size(db, count: int, repeats: int) -> bool:
+    collection = db["movies"]
+    await collection.delete_many({})
+    movies = synthetic_movies(count)
+    started = time.perf_counter()
+    for start in range(0, count, INSERT_BATCH_SIZE):
+        await collection.insert_many(movies[start:start + INSERT_BATCH_SIZE], ordered=False)
+    print(f"\n=== {count:,} movies (inserted in {time.perf_counter() - started:.1f}s) ===")
+
+    started = time.perf_counter()
+    await catalog_filter_index.load()
+    stats = catalog_filter_index.stats()
+    print(f"Filter index: loaded in {time.perf_counter() - started:.2f}s (build {stats['build_seconds']:.2f}s), "
+          f"{stats['memory_bytes'] / 1e6:.1f} MB")
+
+    ok = True
+    print(f"{'query':<70} {'matches':>9} {'mongo ms':>9} {'memory ms':>10} {'speedup':>8}")
+    for sample in SAMPLE_PREFERENCES:
+        preferences = UserPreferences(mood="happy", watchingWith="alone", ageRange="all", **sample)
+        for backfill in ([False, True] if preferences.preferences else [False]):
+            matches = int(catalog_filter_index.mask_for(preferences, backfill).sum())
+            expected = await collection.count_documents(build_candidate_query(preferences, backfill).get_filter_query())
+            mongo_ms = await time_backend("mongo", preferences, backfill, repeats)
+            memory_ms = await time_backend("memory", preferences, backfill, repeats)
+            label = f"{'backfill ' if backfill else ''}{sample['genres']} {sample['language'] or '*'} " \
+                    f"<={sample['duration']} {sample['preferences']}"
+            print(f"{label:<70} {matches:>9} {mongo_ms:>9.2f} {memory_ms:>10.2f} {mongo_ms / memory_ms:>7.1f}x")
+            if matches != expected:
+                print(f"  MISMATCH: MongoDB matches {expected} movies")
+                ok = False
+    return ok
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark in-memory vs MongoDB candidate filtering.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per query and backend")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database")
+    args = parser.parse_args()
+
+    print(f"Connecting to MongoDB: {settings.MONGODB_CONNECTION_STRING}, scratch database: {BENCH_DATABASE_NAME}")
+    client = AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
+    db = client[BENCH_DATABASE_NAME]
+    await init_beanie(database=db, document_models=[Movie]) # Same indexes as the real collection
+    assert set(FLAG_RATES) == set(PREFERENCE_FLAG_FIELDS.values())
+
+    ok = True
+    try:
+        for count in args.sizes:
+            ok &= await benchmark_size(db, count, args.repeats)
+    finally:
+        if not args.keep:
+            await client.drop_database(BENCH_DATABASE_NAME)
+        client.close()
+
+    print("\nBoth backends select the same movies." if ok else "\nCandidate counts differ between backends.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,129 @@
+# scripts/benchmark_vector_index.py
+"""
+Recall@12 versus latency of the HNSW vector index against exact search, on the
+stored `description_embedding` vectors (the current snapshot, or MongoDB if none).
+
+Queries are the normalized mean of two random catalog embeddings ("between" two
+movies, like a questionnaire query usually is). Each ef_search value is run
+unfiltered and with random allow-lists keeping a share of the catalog, the way a
+genre/language filter does; below HNSW_EXACT_FRACTION the index scores the allowed
+rows exactly, so those rows show recall 1.0 by construction.
+
+    pip install hnswlib
+    python scripts/benchmark_vector_index.py --queries 500 --ef 16 32 64 128 256
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+from app.models import Movie
+from app.services.catalog_index import CatalogIndex
+from app.services.vector_index import HNSW_INDEX_FILE, ExactVectorIndex, HnswVectorIndex
+
+K = 12
+EMBEDDING_SNAPSHOT_DIR = os.path.join(project_root, settings.EMBEDDING_SNAPSHOT_DIR)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def load_catalog() -> CatalogIndex:
+    catalog = CatalogIndex()
+    if catalog.load_snapshot(EMBEDDING_SNAPSHOT_DIR):
+        print(f"Using embedding snapshot {catalog.version}")
+        return catalog
+    print(f"No snapshot; loading embeddings from MongoDB: {settings.MONGODB_CONNECTION_STRING}, Database: {settings.DATABASE_NAME}")
+    client = AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
+    await init_beanie(database=client[settings.DATABASE_NAME], document_models=[Movie])
+    await catalog.load()
+    client.close()
+    return catalog
+
+
+def run(index: ExactVectorIndex, queries: np.ndarray, allowed: List[Optional[np.ndarray]]):
+    """Returns (results, latencies in ms)."""
+    results, latencies = [], []
+    for query, allowed_ids in zip(queries, allowed):
+        started = time.perf_counter()
+        found, _ = index.search(query, K, allowed_ids)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(found)
+    return results, latencies
+
+
+def report(label: str, results, latencies, truth) -> None:
+    recall = statistics.mean(
+        len(set(found.tolist()) & set(expected.tolist())) / max(1, min(K, len(expected)))
+        for found, expected in zip(results, truth)
+    )
+    print(f"{label:<28} recall@{K} {recall:6.3f} | p50 {statistics.median(latencies):7.3f} ms | "
+          f"p99 {percentile(latencies, 99):7.3f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HNSW recall and latency against exact search.")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256], help="ef_search values to sweep")
+    parser.add_argument("--selectivity", type=float, nargs="+", default=[1.0, 0.3, 0.1, 0.02],
+                        help="Share of the catalog a query's filter keeps (1.0 = unfiltered)")
+    parser.add_argument("--m", type=int, default=settings.HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=settings.HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog = await load_catalog()
+    if catalog.size < K:
+        print("Not enough embeddings to benchmark; run scripts/generate_embeddings.py first.")
+        return
+    print(f"{catalog.size} embeddings (dim={catalog.dimension})")
+
+    rng = np.random.default_rng(args.seed)
+    pairs = rng.integers(0, catalog.size, size=(args.queries, 2))
+    queries = np.asarray(catalog.matrix[pairs[:, 0]]) + np.asarray(catalog.matrix[pairs[:, 1]])
+    queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+    exact = ExactVectorIndex(catalog.movie_ids, catalog.matrix)
+    started = time.perf_counter()
+    hnsw = HnswVectorIndex.build(catalog.movie_ids, catalog.matrix, args.m, args.ef_construction,
+                                 settings.HNSW_EF_SEARCH, settings.HNSW_EXACT_FRACTION)
+    build_seconds = time.perf_counter() - started
+    with tempfile.TemporaryDirectory() as directory:
+        hnsw.save(directory)
+        index_mb = os.path.getsize(os.path.join(directory, HNSW_INDEX_FILE)) / 1e6
+    print(f"HNSW (M={args.m}, ef_construction={args.ef_construction}) built in {build_seconds:.2f}s, {index_mb:.1f} MB on disk")
+
+    for selectivity in args.selectivity:
+        if selectivity >= 1:
+            allowed: List[Optional[np.ndarray]] = [None] * args.queries
+        else:
+            allowed = [catalog.movie_ids[rng.random(catalog.size) < selectivity] for _ in range(args.queries)]
+        print(f"\n--- {'unfiltered' if selectivity >= 1 else f'filter keeps {selectivity:.0%} of the catalog'} ---")
+        truth, latencies = run(exact, queries, allowed)
+        report("exact", truth, latencies, truth)
+        for ef in args.ef:
+            hnsw.ef_search = ef
+            results, latencies = run(hnsw, queries, allowed)
+            report(f"hnsw ef_search={ef}", results, latencies, truth)
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+# scripts/build_item_neighbors.py
+import argparse
+import os
+import sys
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+
+# --- Configuration ---
+RATINGS_CSV_PATH = os.path.join(project_root, 'data', 'ml-latest-small', 'ratings.csv')
+OUTPUT_PATH = os.path.join(project_root, settings.CF_NEIGHBORS_PATH)
+TOP_K = 50 # Neighbors kept per item
+MIN_RATINGS = 5 # Items with fewer ratings are left out
+READ_CHUNK_ROWS = 2_000_000 # CSV rows per chunk
+BLOCK_ITEMS = 1024 # Items per similarity block (bounds the dense block to BLOCK_ITEMS x n_items float32)
+
+
+def read_ratings(csv_path: str, chunk_rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reads (userId, movieId, rating) in chunks into compact typed arrays; timestamps are never loaded."""
+    users, items, ratings = [], [], []
+    reader = pd.read_csv(
+        csv_path,
+        usecols=['userId', 'movieId', 'rating'],
+        dtype={'userId': np.int32, 'movieId': np.int32, 'rating': np.float32},
+        chunksize=chunk_rows,
+    )
+    for chunk in reader:
+        users.append(chunk['userId'].to_numpy())
+        items.append(chunk['movieId'].to_numpy())
+        ratings.append(chunk['rating'].to_numpy())
+        print(f"  read {sum(len(u) for u in users):,} ratings", end="\r")
+    print()
+    return np.concatenate(users), np.concatenate(items), np.concatenate(ratings)
+
+
+def build_item_matrix(users: np.ndarray, items: np.ndarray, ratings: np.ndarray, min_ratings: int) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Builds the sparse item x user matrix of mean-centered ratings (adjusted cosine),
+    with each item row L2-normalized. Returns (matrix, movie_ids per row).
+    """
+    user_ids, user_index = np.unique(users, return_inverse=True)
+    movie_ids, item_index = np.unique(items, return_inverse=True)
+
+    # Center on each user's mean so generous and harsh raters compare fairly
+    user_sums = np.bincount(user_index, weights=ratings, minlength=len(user_ids))
+    user_counts = np.bincount(user_index, minlength=len(user_ids))
+    centered = (ratings - (user_sums / np.maximum(user_counts, 1))[user_index]).astype(np.float32)
+
+    matrix = sp.csr_matrix((centered, (item_index, user_index)), shape=(len(movie_ids), len(user_ids)), dtype=np.float32)
+    matrix.eliminate_zeros()
+
+    keep = np.bincount(item_index, minlength=len(movie_ids)) >= min_ratings
+    matrix = matrix[keep]
+    movie_ids = movie_ids[keep]
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sp.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+    return matrix, movie_ids
+
+
+def top_k_neighbors(matrix: sp.csr_matrix, k: int, block_items: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Item-item cosine top-K via blocked sparse products: each block of rows is multiplied
+    against the whole matrix, so peak memory is one block_items x n_items dense slab.
+    Returns (neighbor row indices, scores), both shaped (n_items, k); missing slots are -1 / 0.
+    """
+    n_items = matrix.shape[0]
+    k = min(k, max(n_items - 1, 1))
+    neighbors = np.full((n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    transposed = matrix.T.tocsc()
+
+    for start in range(0, n_items, block_items):
+        stop = min(start + block_items, n_items)
+        block = (matrix[start:stop] @ transposed).toarray()
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf # No self-neighbors
+
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        valid = top_scores > 0 # Only positively correlated neighbors are useful for blending
+        neighbors[start:stop] = np.where(valid, top, -1)
+        scores[start:stop] = np.where(valid, top_scores, 0)
+        print(f"  scored {stop:,}/{n_items:,} items", end="\r")
+    print()
+    return neighbors, scores
+
+
+def build_item_neighbors(csv_path: str, output_path: str, k: int, min_ratings: int, chunk_rows: int, block_items: int) -> None:
+    started = time.perf_counter()
+    print(f"Reading ratings from: {csv_path}")
+    users, items, ratings = read_ratings(csv_path, chunk_rows)
+    print(f"Loaded {len(ratings):,} ratings in {time.perf_counter() - started:.1f}s.")
+
+    matrix, movie_ids = build_item_matrix(users, items, ratings, min_ratings)
+    del users, items, ratings
+    print(f"Item x user matrix: {matrix.shape[0]:,} items x {matrix.shape[1]:,} users, {matrix.nnz:,} non-zeros.")
+
+    neighbors, scores = top_k_neighbors(matrix, k, block_items)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = output_path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        movie_ids=movie_ids.astype(np.int64),
+        neighbors=neighbors,
+        scores=scores.astype(np.float16), # Similarities don't need more precision for blending
+    )
+    os.replace(tmp_path, output_path) # Serving processes never see a half-written file
+
+    print("\n------------------------------------")
+    print("Item-item neighbor build complete.")
+    print(f"Items: {len(movie_ids):,}, neighbors per item: {neighbors.shape[1]}, output: {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
+    print(f"Elapsed: {time.perf_counter() - started:.1f}s")
+    print("------------------------------------")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build top-K item-item collaborative filtering neighbors from ratings.csv.")
+    parser.add_argument("--ratings", default=RATINGS_CSV_PATH, help="Path to a MovieLens ratings.csv file.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Output .npz path.")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--min-ratings", type=int, default=MIN_RATINGS)
+    parser.add_argument("--chunk-rows", type=int, default=READ_CHUNK_ROWS)
+    parser.add_argument("--block-items", type=int, default=BLOCK_ITEMS)
+    args = parser.parse_args()
+
+    build_item_neighbors(args.ratings, args.output, args.top_k, args.min_ratings, args.chunk_rows, args.block_items)
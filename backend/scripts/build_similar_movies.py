@@ -0,0 +1,189 @@
+# scripts/build_similar_movies.py
+"""
+Precomputes "more like this" neighbors: the top-K most similar movies by description
+embedding for every movie, served by GET /api/v1/movies/{movie_id}/similar.
+
+Embeddings are read from the current snapshot (or MongoDB if there is none). Scores
+are computed in blocks of rows against the whole matrix, so peak memory is one
+block_rows x n_movies float32 slab. Runs are incremental: each row's vector digest
+is stored with its neighbors, and only movies whose embedding changed (or that lost
+a neighbor because it changed or was removed) are recomputed; the other rows only
+merge in their scores against the changed movies.
+
+    python scripts/build_similar_movies.py            # incremental
+    python scripts/build_similar_movies.py --full     # recompute every row
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+from app.models import Movie
+from app.services.catalog_index import CatalogIndex
+
+# --- Configuration ---
+OUTPUT_PATH = os.path.join(project_root, settings.SIMILAR_MOVIES_PATH)
+EMBEDDING_SNAPSHOT_DIR = os.path.join(project_root, settings.EMBEDDING_SNAPSHOT_DIR)
+TOP_K = 30 # Neighbors kept per movie
+BLOCK_ROWS = 512 # Rows per similarity block (bounds the dense block to BLOCK_ROWS x n_movies float32)
+
+
+async def load_embeddings() -> Tuple[np.ndarray, np.ndarray]:
+    """(movie_ids, normalized matrix), sorted by movie_id."""
+    catalog = CatalogIndex()
+    if catalog.load_snapshot(EMBEDDING_SNAPSHOT_DIR):
+        print(f"Using embedding snapshot {catalog.version}")
+    else:
+        print(f"No snapshot; loading embeddings from MongoDB: {settings.MONGODB_CONNECTION_STRING}, Database: {settings.DATABASE_NAME}")
+        client = AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
+        await init_beanie(database=client[settings.DATABASE_NAME], document_models=[Movie])
+        await catalog.load()
+        client.close()
+    return np.asarray(catalog.movie_ids), catalog.matrix
+
+
+def row_digests(matrix: np.ndarray) -> np.ndarray:
+    """A 64-bit digest of each row's vector, to detect changed embeddings on the next run."""
+    digests = np.empty(matrix.shape[0], dtype=np.uint64)
+    for row in range(matrix.shape[0]):
+        digest = hashlib.blake2b(np.ascontiguousarray(matrix[row]).tobytes(), digest_size=8).digest()
+        digests[row] = np.frombuffer(digest, dtype=np.uint64)[0]
+    return digests
+
+
+def top_k(columns: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, the k best (columns, scores) sorted best first. `columns` broadcasts against `scores`."""
+    columns = np.broadcast_to(columns, scores.shape)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        columns = np.take_along_axis(columns, keep, axis=1)
+        scores = np.take_along_axis(scores, keep, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    columns = np.take_along_axis(columns, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    return np.where(np.isfinite(scores), columns, -1), np.where(np.isfinite(scores), scores, 0)
+
+
+def recompute_rows(matrix: np.ndarray, rows: np.ndarray, neighbors: np.ndarray, scores: np.ndarray, k: int, block_rows: int) -> None:
+    """Full top-K for `rows` against every movie, written into neighbors/scores in place."""
+    all_columns = np.arange(matrix.shape[0])
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        block_scores = np.asarray(matrix[block]) @ np.asarray(matrix).T
+        block_scores[np.arange(len(block)), block] = -np.inf # No self-neighbors
+        neighbors[block], scores[block] = top_k(all_columns, block_scores, k)
+        print(f"  recomputed {min(start + block_rows, len(rows)):,}/{len(rows):,} rows", end="\r")
+    if len(rows):
+        print()
+
+
+def merge_changed(matrix: np.ndarray, rows: np.ndarray, changed: np.ndarray, neighbors: np.ndarray, scores: np.ndarray,
+                  k: int, block_rows: int) -> None:
+    """Merges scores against the `changed` movies into the existing lists of `rows`, in place."""
+    changed_matrix = np.asarray(matrix[changed]).T
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        fresh = np.asarray(matrix[block]) @ changed_matrix
+        existing = np.where(neighbors[block] >= 0, scores[block], -np.inf)
+        columns = np.concatenate([neighbors[block], np.broadcast_to(changed, fresh.shape)], axis=1)
+        neighbors[block], scores[block] = top_k(columns, np.concatenate([existing, fresh], axis=1), k)
+
+
+def load_previous(path: str, k: int) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if "digests" not in data or data["neighbors"].shape[1] != k:
+            return None
+        return {name: data[name] for name in ("movie_ids", "neighbors", "scores", "digests")}
+
+
+def build_similar_movies(movie_ids: np.ndarray, matrix: np.ndarray, output_path: str, k: int, block_rows: int, full: bool) -> None:
+    started = time.perf_counter()
+    n = len(movie_ids)
+    k = min(k, max(n - 1, 1))
+    digests = row_digests(matrix)
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+
+    previous = None if full else load_previous(output_path, k)
+    if previous is None:
+        recompute = np.arange(n)
+        print(f"Computing neighbors for all {n:,} movies (top {k}).")
+    else:
+        old_ids = previous["movie_ids"]
+        positions = np.minimum(np.searchsorted(old_ids, movie_ids), max(len(old_ids) - 1, 0))
+        present = old_ids[positions] == movie_ids if len(old_ids) else np.zeros(n, dtype=bool)
+        unchanged = present & (previous["digests"][positions] == digests)
+        changed = np.flatnonzero(~unchanged)
+
+        # Old neighbor rows -> new rows; -1 for movies that changed or are gone
+        old_to_new = np.full(len(old_ids), -1, dtype=np.int64)
+        old_to_new[positions[unchanged]] = np.flatnonzero(unchanged)
+        old_lists = previous["neighbors"][positions[unchanged]]
+        mapped = np.where(old_lists >= 0, old_to_new[np.maximum(old_lists, 0)], -1)
+        lost = ((old_lists >= 0) & (mapped < 0)).any(axis=1)
+
+        kept = np.flatnonzero(unchanged)[~lost]
+        neighbors[kept] = mapped[~lost]
+        scores[kept] = previous["scores"][positions[kept]]
+        recompute = np.union1d(changed, np.flatnonzero(unchanged)[lost])
+        removed = len(old_ids) - int(present.sum())
+        print(f"{n:,} movies: {len(changed):,} new or changed, {removed:,} removed, "
+              f"{len(recompute) - len(changed):,} lost a neighbor, {len(kept):,} kept.")
+        if not len(recompute) and not removed:
+            print("Neighbors are up to date.")
+            return
+        if len(changed) and len(kept):
+            merge_changed(matrix, kept, changed, neighbors, scores, k, block_rows)
+
+    recompute_rows(matrix, recompute, neighbors, scores, k, block_rows)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = output_path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        movie_ids=movie_ids.astype(np.int64),
+        neighbors=neighbors,
+        scores=scores.astype(np.float16),
+        digests=digests,
+    )
+    os.replace(tmp_path, output_path) # Serving processes never see a half-written file
+
+    print("\n------------------------------------")
+    print("Similar movies build complete.")
+    print(f"Movies: {n:,}, recomputed: {len(recompute):,}, neighbors per movie: {k}, "
+          f"output: {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
+    print(f"Elapsed: {time.perf_counter() - started:.1f}s")
+    print("------------------------------------")
+
+
+async def main(output_path: str, k: int, block_rows: int, full: bool) -> None:
+    movie_ids, matrix = await load_embeddings()
+    if len(movie_ids) < 2:
+        print("Not enough embeddings; run scripts/generate_embeddings.py first.")
+        return
+    build_similar_movies(movie_ids, matrix, output_path, k, block_rows, full)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute top-K embedding neighbors per movie.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Output .npz path.")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS)
+    parser.add_argument("--full", action="store_true", help="Recompute every row, ignoring the previous output.")
+    args = parser.parse_args()
+
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main(args.output, args.top_k, args.block_rows, args.full))
@@ -0,0 +1,173 @@
+# scripts/encoder_parity.py
+"""
+Compares the query encoder backends (torch, onnx, onnx-int8) on:
+
+- parity: cosine between each backend's embedding of a movie description and the fp32
+  `description_embedding` stored in Mongo by generate_embeddings.py
+- latency: p50/p99 of single-text encodes over the questionnaire query texts
+- memory: peak RSS of a process that loads the backend and runs the above
+
+Each backend runs in its own subprocess so RSS figures are not polluted by the others.
+
+    python scripts/encoder_parity.py --backends torch onnx onnx-int8 --sample 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+from app.services.embedding_codec import decode_embedding
+from app.services.encoder_backends import ENCODER_BACKENDS, load_query_encoder
+from app.services.query_embeddings import questionnaire_query_texts
+
+# --- Configuration ---
+MONGODB_CONNECTION_STRING = settings.MONGODB_CONNECTION_STRING
+DATABASE_NAME = settings.DATABASE_NAME
+# Backend is deemed interchangeable with the stored embeddings above this mean cosine
+PARITY_THRESHOLD = 0.99
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def fetch_reference_sample(sample_size: int) -> Dict[str, Any]:
+    """Random movies with a description and a stored fp32 embedding."""
+    client = AsyncIOMotorClient(MONGODB_CONNECTION_STRING)
+    try:
+        collection = client[DATABASE_NAME]["movies"]
+        pipeline = [
+            {"$match": {"description": {"$nin": [None, ""]}, "description_embedding": {"$ne": None}}},
+            {"$sample": {"size": sample_size}},
+            {"$project": {"_id": 0, "description": 1, "description_embedding": 1}},
+        ]
+        docs = await collection.aggregate(pipeline).to_list(length=None)
+    finally:
+        client.close()
+    return {
+        "texts": [doc["description"] for doc in docs],
+        "embeddings": [decode_embedding(doc["description_embedding"]).tolist() for doc in docs],
+    }
+
+
+def run_worker(backend: str, sample_path: str, result_path: str, batch_size: int, latency_queries: int) -> None:
+    """Runs inside the per-backend subprocess; writes its measurements to `result_path`."""
+    with open(sample_path) as f:
+        sample = json.load(f)
+
+    started = time.perf_counter()
+    encoder = load_query_encoder(backend)
+    load_seconds = time.perf_counter() - started
+
+    reference = np.asarray(sample["embeddings"], dtype=np.float32)
+    encoded = np.asarray(encoder.encode(sample["texts"], batch_size=batch_size), dtype=np.float32)
+    reference /= np.clip(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12, None)
+    encoded /= np.clip(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12, None)
+    cosines = (reference * encoded).sum(axis=1)
+
+    queries = questionnaire_query_texts(settings.QUERY_EMBEDDING_WARMUP_MAX_GENRES)[:latency_queries]
+    encoder.encode(queries[:1], batch_size=1) # first call pays one-off graph/allocator setup
+    latencies = []
+    for text in queries:
+        started = time.perf_counter()
+        encoder.encode([text], batch_size=1)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    result = {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "compared": int(len(cosines)),
+        "cosine_mean": float(cosines.mean()) if len(cosines) else None,
+        "cosine_min": float(cosines.min()) if len(cosines) else None,
+        "cosine_p1": float(np.percentile(cosines, 1)) if len(cosines) else None,
+        "latency_p50_ms": statistics.median(latencies) if latencies else None,
+        "latency_p99_ms": percentile(latencies, 99),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print("\n------------------------------------")
+    print(f"{'backend':<10} {'cos mean':>9} {'cos p1':>8} {'cos min':>8} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'load s':>7}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<10} failed: {r['error']}")
+            continue
+        cos = lambda key: f"{r[key]:.4f}" if r[key] is not None else "n/a"
+        print(f"{r['backend']:<10} {cos('cosine_mean'):>9} {cos('cosine_p1'):>8} {cos('cosine_min'):>8} "
+              f"{r['latency_p50_ms']:>8.2f} {r['latency_p99_ms']:>8.2f} {r['peak_rss_mb']:>8.0f} {r['load_seconds']:>7.1f}")
+    for r in results:
+        if r.get("cosine_mean") is not None and r["cosine_mean"] < PARITY_THRESHOLD:
+            print(f"WARNING: {r['backend']} mean cosine {r['cosine_mean']:.4f} is below {PARITY_THRESHOLD}; "
+                  f"re-run generate_embeddings.py with this backend's model before serving it.")
+    print("------------------------------------")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parity, latency and RSS of the query encoder backends.")
+    parser.add_argument("--backends", nargs="+", default=list(ENCODER_BACKENDS), choices=ENCODER_BACKENDS)
+    parser.add_argument("--sample", type=int, default=500, help="Movies compared against their stored embedding")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--latency-queries", type=int, default=200)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--sample-path", help=argparse.SUPPRESS)
+    parser.add_argument("--result-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.sample_path, args.result_path, args.batch_size, args.latency_queries)
+        return
+
+    sample = asyncio.run(fetch_reference_sample(args.sample))
+    print(f"Fetched {len(sample['texts'])} movies with stored embeddings.")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        sample_path = os.path.join(tmp, "sample.json")
+        with open(sample_path, "w") as f:
+            json.dump(sample, f)
+        for backend in args.backends:
+            print(f"Measuring backend '{backend}'...")
+            result_path = os.path.join(tmp, f"{backend}.json")
+            completed = subprocess.run([
+                sys.executable, os.path.abspath(__file__), "--worker", backend,
+                "--sample-path", sample_path, "--result-path", result_path,
+                "--batch-size", str(args.batch_size), "--latency-queries", str(args.latency_queries),
+            ], capture_output=True, text=True)
+            if completed.returncode != 0 or not os.path.exists(result_path):
+                error = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+                results.append({"backend": backend, "error": error})
+                continue
+            with open(result_path) as f:
+                results.append(json.load(f))
+
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 # scripts/enrich_movie_data.py
+import argparse
 import asyncio
 import csv
-import requests # For making HTTP requests
-import time # For rate limiting
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+import httpx # Async HTTP client
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 import sys
 import os
 from tqdm import tqdm
@@ -15,6 +21,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 from app.core.config import settings # Import settings
 from app.models import Movie # Your Beanie Movie document
+from app.services.catalog_version import bump_catalog_version
 
 # Constants
 TMDB_API_KEY = settings.TMDB_API_KEY
@@ -23,9 +30,13 @@ TMDB_IMG_BASE_URL = "https://image.tmdb.org/t/p/" # Base URL for images
 POSTER_SIZE = "w500" # Example poster size
 BACKDROP_SIZE = "w1280" # Example backdrop size
 LINKS_CSV_PATH = os.path.join(project_root, 'data', 'ml-latest-small', 'links.csv')
-REQUEST_DELAY = 0.25 # Seconds between TMDB API calls (respect rate limits)
+CACHE_DIR = os.path.join(project_root, 'data', 'tmdb_cache') # Raw TMDB responses, one JSON file per TMDB ID
+REQUESTS_PER_SECOND = 40 # TMDB allows roughly 50 req/s per IP; stay under it
+CONCURRENCY = 20 # Max requests in flight
+MAX_RETRIES = 5
+WRITE_BATCH_SIZE = 200 # Updates per bulk_write
 
-# --- Helper Function ---
+# --- Helper Functions ---
 def get_tmdb_id_map(csv_path: str) -> dict[int, str]:
     """Reads links.csv and creates a mapping from movieId to tmdbId."""
     mapping = {}
@@ -48,8 +59,118 @@ def get_tmdb_id_map(csv_path: str) -> dict[int, str]:
         print(f"Error reading links.csv: {e}")
         return {}
 
+
+def build_update(details: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps a TMDB /movie/{id} response to the Movie fields we store."""
+    update_data = {}
+    if details.get('overview'):
+        update_data['description'] = details['overview']
+    if details.get('vote_average'):
+        # TMDB rating is out of 10
+        update_data['rating'] = round(details['vote_average'], 1)
+    if details.get('runtime'):
+        update_data['duration'] = details['runtime']
+    if details.get('original_language'):
+        # TMDB uses language codes (e.g., "en"), map if needed or store directly
+        update_data['language'] = details['original_language']
+    if details.get('poster_path'):
+        update_data['posterUrl'] = f"{TMDB_IMG_BASE_URL}{POSTER_SIZE}{details['poster_path']}"
+    if details.get('backdrop_path'):
+        update_data['backdropUrl'] = f"{TMDB_IMG_BASE_URL}{BACKDROP_SIZE}{details['backdrop_path']}"
+    # Could also fetch /credits for director/cast
+    # Could also fetch /watch/providers for streaming info (more complex parsing)
+    return update_data
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class TMDBResponseCache:
+    """Raw TMDB responses on disk so reruns never refetch. 404s are cached too."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, tmdb_id: str) -> str:
+        return os.path.join(self.directory, f"{tmdb_id}.json")
+
+    def get(self, tmdb_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(tmdb_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, tmdb_id: str, payload: Dict[str, Any]) -> None:
+        # Write to a temp file and rename so an interrupted run never leaves a truncated entry
+        tmp_path = self._path(tmdb_id) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self._path(tmdb_id))
+
+
+async def fetch_movie_details(
+    http: httpx.AsyncClient,
+    bucket: TokenBucket,
+    tmdb_id: str,
+    max_retries: int = MAX_RETRIES,
+) -> Dict[str, Any]:
+    """
+    GET /movie/{tmdb_id} with retry and exponential backoff on 429, 5xx and transport errors.
+    Returns the JSON body, or {"status_code": 404} when TMDB doesn't know the ID.
+    """
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        try:
+            response = await http.get(f"/movie/{tmdb_id}")
+        except httpx.TransportError:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt) + random.random() * 0.25)
+            continue
+
+        if response.status_code == 404:
+            return {"status_code": 404}
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == max_retries:
+                response.raise_for_status()
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else 0.5 * 2 ** attempt
+            await asyncio.sleep(min(30.0, delay) + random.random() * 0.25)
+            continue
+        response.raise_for_status()
+        return response.json()
+    raise RuntimeError("unreachable")
+
+
 # --- Main Enrichment Logic ---
-async def enrich_data():
+async def enrich_data(
+    base_url: str = TMDB_BASE_URL,
+    concurrency: int = CONCURRENCY,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    cache_dir: str = CACHE_DIR,
+    process_all: bool = False,
+):
     if not TMDB_API_KEY or TMDB_API_KEY == "YOUR_TMDB_API_KEY_DEFAULT":
         print("ERROR: TMDB_API_KEY is not configured in your .env file or config.py.")
         print("Please get an API key from themoviedb.org and set the VITE_TMDB_API_KEY environment variable.")
@@ -60,6 +181,7 @@ async def enrich_data():
     db_instance = client[settings.DATABASE_NAME]
     await init_beanie(database=db_instance, document_models=[Movie])
     print("Beanie initialized.")
+    collection = Movie.get_motor_collection()
 
     # Load movieId -> tmdbId map
     id_map = get_tmdb_id_map(LINKS_CSV_PATH)
@@ -68,85 +190,126 @@ async def enrich_data():
         client.close()
         return
 
-    # Find movies potentially missing details (e.g., description)
-    # Adjust filter as needed, or process all if running for the first time
-    movies_to_process = await Movie.find(Movie.description == None).to_list()
-    # Alternatively, process all: movies_to_process = await Movie.find_all().to_list()
-    print(f"Found {len(movies_to_process)} movies to potentially enrich.")
+    # Find movies potentially missing details (e.g., description), or all with --all
+    query = {} if process_all else {"description": None}
+    movie_ids = [doc["movie_id"] async for doc in collection.find(query, {"_id": 0, "movie_id": 1})]
+    jobs = [(movie_id, id_map[movie_id]) for movie_id in movie_ids if movie_id in id_map]
+    print(f"Found {len(movie_ids)} movies to potentially enrich, {len(jobs)} with a TMDB ID.")
 
-    if not movies_to_process:
+    if not jobs:
         print("No movies found needing enrichment based on current filter.")
         client.close()
         return
 
-    session = requests.Session() # Use a session for potentially better performance
-    session.params = {'api_key': TMDB_API_KEY, 'language': 'en-US'} # Set API key for all requests
+    cache = TMDBResponseCache(cache_dir)
+    bucket = TokenBucket(requests_per_second)
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
 
+    pending_writes: List[UpdateOne] = []
     updated_count = 0
     failed_count = 0
+    fetched_count = 0
+    cached_count = 0
+    progress = tqdm(total=len(jobs), desc="Enriching movies")
 
-    print("Fetching details from TMDB and updating database (this may take a while)...")
-    for movie in tqdm(movies_to_process, desc="Enriching movies"):
-        tmdb_id = id_map.get(movie.movie_id)
-        if not tmdb_id:
-            # print(f"Skipping movie_id {movie.movie_id}: No TMDB ID found in links.csv")
-            continue
+    async def flush_writes() -> None:
+        """Writes the pending updates. Failures are counted per update here, not blamed on the caller's movie."""
+        nonlocal updated_count, failed_count
+        if not pending_writes:
+            return
+        batch = pending_writes[:]
+        pending_writes.clear()
+        try:
+            await collection.bulk_write(batch, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: every update not listed in writeErrors was applied
+            write_errors = e.details.get("writeErrors", [])
+            updated_count += len(batch) - len(write_errors)
+            failed_count += len(write_errors)
+            first = write_errors[0].get("errmsg") if write_errors else e
+            print(f"\nBulk write: {len(write_errors)} of {len(batch)} updates failed (first error: {first})")
+        except PyMongoError as e:
+            failed_count += len(batch)
+            print(f"\nBulk write of {len(batch)} updates failed: {type(e).__name__}: {e}")
+        else:
+            updated_count += len(batch)
 
-        # --- Rate Limiting ---
-        time.sleep(REQUEST_DELAY) # Wait between requests
+    async def worker(http: httpx.AsyncClient) -> None:
+        nonlocal failed_count, fetched_count, cached_count
+        while True:
+            try:
+                movie_id, tmdb_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                details = cache.get(tmdb_id)
+                if details is None:
+                    details = await fetch_movie_details(http, bucket, tmdb_id)
+                    cache.put(tmdb_id, details)
+                    fetched_count += 1
+                else:
+                    cached_count += 1
 
-        try:
-            # Fetch details from TMDB API
-            url = f"{TMDB_BASE_URL}/movie/{tmdb_id}"
-            response = session.get(url)
-            response.raise_for_status() # Raise HTTPError for bad responses (4XX, 5XX)
-            details = response.json()
-
-            # --- Extract data ---
-            update_data = {}
-            if details.get('overview'):
-                update_data[Movie.description] = details['overview']
-            if details.get('vote_average'):
-                # TMDB rating is out of 10
-                update_data[Movie.rating] = round(details['vote_average'], 1)
-            if details.get('runtime'):
-                update_data[Movie.duration] = details['runtime']
-            if details.get('original_language'):
-                 # TMDB uses language codes (e.g., "en"), map if needed or store directly
-                 update_data[Movie.language] = details['original_language']
-            if details.get('poster_path'):
-                update_data[Movie.posterUrl] = f"{TMDB_IMG_BASE_URL}{POSTER_SIZE}{details['poster_path']}"
-            if details.get('backdrop_path'):
-                update_data[Movie.backdropUrl] = f"{TMDB_IMG_BASE_URL}{BACKDROP_SIZE}{details['backdrop_path']}"
-
-            # Could also fetch /credits for director/cast
-            # Could also fetch /watch/providers for streaming info (more complex parsing)
-
-            # Update MongoDB document if we got new data
-            if update_data:
-                await Movie.find_one(Movie.id == movie.id).update(
-                    {"$set": update_data}
-                )
-                updated_count += 1
-
-        except requests.exceptions.RequestException as e:
-            print(f"\nAPI Request failed for movie_id {movie.movie_id} (TMDB ID: {tmdb_id}): {e}")
-            failed_count += 1
-        except Exception as e:
-            print(f"\nError processing movie_id {movie.movie_id} (TMDB ID: {tmdb_id}): {e}")
-            failed_count += 1
+                update_data = build_update(details)
+                if update_data:
+                    pending_writes.append(UpdateOne({"movie_id": movie_id}, {"$set": update_data}))
+                    if len(pending_writes) >= WRITE_BATCH_SIZE:
+                        await flush_writes()
+            except httpx.HTTPError as e:
+                print(f"\nAPI Request failed for movie_id {movie_id} (TMDB ID: {tmdb_id}): {e}")
+                failed_count += 1
+            except Exception as e:
+                print(f"\nError processing movie_id {movie_id} (TMDB ID: {tmdb_id}): {e}")
+                failed_count += 1
+            finally:
+                progress.update(1)
+
+    print(f"Fetching details from {base_url} ({concurrency} concurrent, {requests_per_second} req/s) and updating database...")
+    started = time.perf_counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        params={'api_key': TMDB_API_KEY, 'language': 'en-US'}, # Set API key for all requests
+        limits=limits,
+        timeout=httpx.Timeout(10.0),
+    ) as http:
+        await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+    await flush_writes()
+    progress.close()
+    elapsed = time.perf_counter() - started
 
     print("\n------------------------------------")
     print("Data enrichment complete.")
     print(f"Successfully fetched details and updated {updated_count} movies.")
+    print(f"TMDB requests: {fetched_count}, served from cache: {cached_count}, elapsed: {elapsed:.1f}s")
     if failed_count > 0:
         print(f"Failed to fetch or process details for {failed_count} movies.")
     print("------------------------------------")
 
+    if updated_count:
+        version = await bump_catalog_version(db_instance)
+        print(f"Catalog data version bumped to {version}.")
+
     client.close()
     print("MongoDB connection closed.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrich movies with TMDB details.")
+    parser.add_argument("--base-url", default=TMDB_BASE_URL, help="TMDB API base URL (point at scripts/tmdb_stub_server.py for local runs).")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Max requests in flight.")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Max requests per second.")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Directory for cached raw TMDB responses.")
+    parser.add_argument("--all", action="store_true", help="Re-enrich every movie, not only those missing a description.")
+    args = parser.parse_args()
+
     if os.name == 'nt':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(enrich_data())
\ No newline at end of file
+    asyncio.run(enrich_data(
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        requests_per_second=args.rate,
+        cache_dir=args.cache_dir,
+        process_all=args.all,
+    ))
@@ -0,0 +1,97 @@
+# scripts/explain_queries.py
+import asyncio
+import sys
+import os
+from typing import Any, Dict, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from beanie.odm.utils.projection import get_projection
+
+# --- Configuration ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+from app.models import Movie, UserPreferences
+from app.crud import build_candidate_query, CandidateMovie, CANDIDATE_LIMIT
+
+# The projection fetch_candidates sends, so covered/FETCH verdicts describe the real query
+CANDIDATE_PROJECTION = get_projection(CandidateMovie)
+
+# Representative questionnaire submissions covering each filter shape
+SAMPLE_PREFERENCES = [
+    dict(genres=["Action"], language="English", duration=120, preferences=[]),
+    dict(genres=["Comedy", "Romance", "Drama"], language="English", duration=999, preferences=[]),
+    dict(genres=["Horror"], language="", duration=90, preferences=[]),
+    dict(genres=["Drama"], language="English", duration=150, preferences=["trending"]),
+    dict(genres=["Thriller", "Crime"], language="English", duration=999, preferences=["classic", "hidden_gems"]),
+]
+
+
+def plan_stages(plan: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Flattens a winningPlan tree into (stage, indexName) pairs."""
+    stages = [(plan.get("stage", "?"), plan.get("indexName", ""))]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+async def explain(label: str, filter_query: Dict[str, Any], projection: Dict[str, Any], limit: int) -> bool:
+    """Prints the plan summary for one query shape. Returns False if it falls back to COLLSCAN."""
+    cursor = Movie.get_motor_collection().find(filter_query, projection).limit(limit)
+    result = await cursor.explain()
+    stages = plan_stages(result["queryPlanner"]["winningPlan"])
+    stats = result.get("executionStats", {})
+    examined = stats.get("totalDocsExamined", 0)
+    keys = stats.get("totalKeysExamined", 0)
+    returned = stats.get("nReturned", 0)
+    ratio = f"{examined / returned:.1f}" if returned else "-"
+    collscan = any(stage == "COLLSCAN" for stage, _ in stages)
+    indexes = sorted({name for _, name in stages if name})
+
+    print(f"\n{label}")
+    print(f"  filter:   {filter_query}")
+    print(f"  project:  {projection or '-'}")
+    print(f"  plan:     {' <- '.join(stage for stage, _ in stages)}")
+    print(f"  indexes:  {', '.join(indexes) or '-'}")
+    print(f"  examined: {examined} docs / {keys} keys, returned: {returned} (docs examined per result: {ratio})")
+    if collscan:
+        print("  WARNING: COLLSCAN")
+    return not collscan
+
+
+async def explain_queries() -> int:
+    print(f"Connecting to MongoDB: {settings.MONGODB_CONNECTION_STRING}, Database: {settings.DATABASE_NAME}")
+    client = AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
+    db_instance = client[settings.DATABASE_NAME]
+    await init_beanie(database=db_instance, document_models=[Movie]) # Also creates declared indexes
+    print("Beanie initialized.")
+
+    ok = True
+    for sample in SAMPLE_PREFERENCES:
+        preferences = UserPreferences(mood="happy", watchingWith="alone", ageRange="all", **sample)
+        query = build_candidate_query(preferences)
+        label = f"Recommendation candidates: {sample}"
+        ok &= await explain(label, query.get_filter_query(), CANDIDATE_PROJECTION, CANDIDATE_LIMIT)
+        if preferences.preferences:
+            # Second tier, run when the flagged movies can't fill a page
+            backfill = build_candidate_query(preferences, backfill=True)
+            ok &= await explain(f"Backfill candidates: {sample}", backfill.get_filter_query(), CANDIDATE_PROJECTION, CANDIDATE_LIMIT)
+
+    sample_movie = await Movie.get_motor_collection().find_one({}, {"movie_id": 1})
+    if sample_movie:
+        ok &= await explain("Favorites lookup by movie_id", {"movie_id": sample_movie["movie_id"]}, {}, 1)
+
+    print("\n------------------------------------")
+    print("All query shapes use an index." if ok else "One or more query shapes fall back to COLLSCAN.")
+    print("------------------------------------")
+    client.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(asyncio.run(explain_queries()))
@@ -0,0 +1,79 @@
+# scripts/export_onnx_encoder.py
+import argparse
+import os
+import sys
+
+import torch
+from sentence_transformers import SentenceTransformer
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+
+# --- Configuration ---
+MODEL_NAME = settings.SENTENCE_MODEL_NAME
+OUTPUT_DIR = os.path.join(project_root, settings.ONNX_MODEL_DIR)
+
+
+class TokenEmbeddings(torch.nn.Module):
+    """Exports only the transformer; pooling and normalization run in numpy at serving time."""
+
+    def __init__(self, transformer: torch.nn.Module) -> None:
+        super().__init__()
+        self.transformer = transformer
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.transformer(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        ).last_hidden_state
+
+
+def export_onnx_encoder(model_name: str, output_dir: str, opset: int) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Loading Sentence Transformer model: {model_name}...")
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    # Fast tokenizer file used by the ONNX backend (no transformers/torch import at serving time)
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+
+    sample = tokenizer(["a sample sentence for tracing"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    print(f"Exporting fp32 ONNX graph to {fp32_path}...")
+    torch.onnx.export(
+        TokenEmbeddings(transformer),
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        fp32_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["token_embeddings"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "token_type_ids": {0: "batch", 1: "sequence"},
+            "token_embeddings": {0: "batch", 1: "sequence"},
+        },
+        opset_version=opset,
+    )
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+    print(f"Writing dynamically quantized int8 graph to {int8_path}...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    print("\n------------------------------------")
+    print("ONNX export complete.")
+    for name in ("model.onnx", "model.int8.onnx"):
+        path = os.path.join(output_dir, name)
+        print(f"{name}: {os.path.getsize(path) / 1e6:.1f} MB")
+    print("Set ENCODER_BACKEND=onnx or ENCODER_BACKEND=onnx-int8 to serve with it.")
+    print("------------------------------------")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the sentence encoder to ONNX (fp32 and dynamic int8).")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    export_onnx_encoder(args.model, args.output_dir, args.opset)
@@ -1,84 +1,251 @@
 # movie_reco_backend/scripts/generate_embeddings.py
+import argparse
 import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
-from sentence_transformers import SentenceTransformer
+from pymongo import UpdateOne
+import numpy as np
 import sys
 import os
 from tqdm import tqdm # For progress bar
 
-# --- Configuration ---
-MONGODB_CONNECTION_STRING = "mongodb://localhost:27017"  # !!! REPLACE WITH YOURS !!!
-DATABASE_NAME = "movie_db"
-# Choose a sentence transformer model (e.g., 'all-MiniLM-L6-v2' is efficient)
-MODEL_NAME = 'all-MiniLM-L6-v2'
-
 # Adjust path to import Movie model
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
+from app.core.config import settings
 from app.models import Movie
+from app.services.embedding_cache import EmbeddingDiskCache, embedding_content_hash
+from app.services.catalog_version import bump_catalog_version
+from app.services.embedding_codec import decode_embedding, encode_embedding
+from app.services.embedding_snapshot import current_version, write_snapshot
+from app.services.vector_index import write_vector_index
+
+# --- Configuration ---
+MONGODB_CONNECTION_STRING = settings.MONGODB_CONNECTION_STRING
+DATABASE_NAME = settings.DATABASE_NAME
+# Choose a sentence transformer model (e.g., 'all-MiniLM-L6-v2' is efficient)
+MODEL_NAME = settings.SENTENCE_MODEL_NAME
+DEFAULT_BATCH_SIZE = 256
+EMBEDDING_CACHE_PATH = os.path.join(project_root, settings.EMBEDDING_CACHE_PATH)
+EMBEDDING_SNAPSHOT_DIR = os.path.join(project_root, settings.EMBEDDING_SNAPSHOT_DIR)
+
+# --- Encoding (runs in a worker thread or worker process) ---
+_worker_model = None
+
+def _init_worker(model_name: str) -> None:
+    """Loads the model once per worker. Torch threads are pinned to 1 so processes don't oversubscribe cores."""
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    import torch
+    torch.set_num_threads(1)
+    _worker_model = SentenceTransformer(model_name, device='cpu')
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+
+def embedding_text(doc: Dict[str, Any]) -> Optional[str]:
+    """Text to embed for a movie document (description, falling back to title)."""
+    return doc.get("description") or doc.get("title") or None
+
+
+async def iter_movie_batches(collection: Any, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Streams movies from a cursor in batches, fetching only the fields needed to embed or skip them."""
+    pipeline = [{"$project": {
+        "_id": 0, "movie_id": 1, "title": 1, "description": 1, "embedding_hash": 1,
+        # Presence check only; the vector itself is never read back
+        "has_embedding": {"$ne": [{"$ifNull": ["$description_embedding", None]}, None]},
+    }}]
+    cursor = collection.aggregate(pipeline, batchSize=batch_size)
+    batch: List[Dict[str, Any]] = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stale_docs(batch: List[Dict[str, Any]], full: bool) -> List[Tuple[Dict[str, Any], str]]:
+    """Returns (doc, content_hash) for movies whose embedding is missing or was built from other text/model."""
+    stale = []
+    for doc in batch:
+        text = embedding_text(doc)
+        if not text:
+            continue
+        content_hash = embedding_content_hash(text, MODEL_NAME)
+        if full or not doc.get("has_embedding") or doc.get("embedding_hash") != content_hash:
+            stale.append((doc, content_hash))
+    return stale
+
+
+async def encode_and_write(
+    collection: Any,
+    executor: Executor,
+    disk_cache: EmbeddingDiskCache,
+    stale: List[Tuple[Dict[str, Any], str]],
+) -> Tuple[int, int, int]:
+    """
+    Resolves one batch of stale movies from the disk cache, encodes the rest in the executor,
+    and writes everything with an unordered bulk_write. Returns (restored, encoded, errors).
+    """
+    try:
+        vectors = disk_cache.get_many(content_hash for _, content_hash in stale)
+        restored = sum(1 for _, content_hash in stale if content_hash in vectors)
+        to_encode = [(doc, content_hash) for doc, content_hash in stale if content_hash not in vectors]
+        if to_encode:
+            texts = [embedding_text(doc) for doc, _ in to_encode]
+            embeddings = await asyncio.get_running_loop().run_in_executor(executor, _encode_batch, texts)
+            encoded = [(content_hash, embedding) for (_, content_hash), embedding in zip(to_encode, embeddings)]
+            disk_cache.put_many(encoded)
+            vectors.update(encoded)
 
-async def generate_and_store_embeddings():
+        operations = [
+            UpdateOne(
+                {"movie_id": doc["movie_id"]},
+                {"$set": {"description_embedding": encode_embedding(vectors[content_hash]), "embedding_hash": content_hash}},
+            )
+            for doc, content_hash in stale
+        ]
+        await collection.bulk_write(operations, ordered=False)
+        return restored, len(to_encode), 0
+    except Exception as e:
+        print(f"\nError processing batch starting at movie ID {stale[0][0]['movie_id']}: {e}")
+        return 0, 0, len(stale)
+
+
+async def publish_embedding_snapshot(collection: Any, batch_size: int) -> None:
+    """Writes every stored embedding to a new snapshot version that serving workers memory-map."""
+    cursor = collection.find(
+        {"description_embedding": {"$ne": None}},
+        {"_id": 0, "movie_id": 1, "description_embedding": 1},
+        batch_size=batch_size,
+    )
+    ids: List[int] = []
+    vectors: List[np.ndarray] = []
+    async for doc in cursor:
+        embedding = decode_embedding(doc.get("description_embedding"))
+        if embedding is not None:
+            ids.append(int(doc["movie_id"]))
+            vectors.append(embedding)
+    if not ids:
+        print("No embeddings stored; snapshot not written.")
+        return
+    # With VECTOR_INDEX_BACKEND=hnsw the graph is built here and shipped inside the snapshot
+    version = write_snapshot(
+        EMBEDDING_SNAPSHOT_DIR, np.asarray(ids), np.asarray(vectors, dtype=np.float32), MODEL_NAME,
+        write_extras=write_vector_index,
+    )
+    print(f"Published embedding snapshot {version} ({len(ids)} vectors, vector index: {settings.VECTOR_INDEX_BACKEND}) "
+          f"to {EMBEDDING_SNAPSHOT_DIR}")
+
+
+async def generate_and_store_embeddings(batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 0, full: bool = False, snapshot: bool = True, snapshot_only: bool = False):
     print(f"Connecting to MongoDB: {MONGODB_CONNECTION_STRING}, Database: {DATABASE_NAME}")
     client = AsyncIOMotorClient(MONGODB_CONNECTION_STRING)
     db_instance = client[DATABASE_NAME]
     await init_beanie(database=db_instance, document_models=[Movie])
     print("Beanie initialized.")
+    collection = Movie.get_motor_collection()
 
-    print(f"Loading Sentence Transformer model: {MODEL_NAME}...")
-    # This might take a moment the first time to download the model
-    # Specify device='cuda' if you have a compatible GPU and torch with CUDA installed
-    model = SentenceTransformer(MODEL_NAME, device='cpu')
-    print("Model loaded.")
-
-    # Fetch all movies that don't have an embedding yet or need updating
-    # Fetching all might be easier if the script is run infrequently
-    print("Fetching all movies from database...")
-    movies_to_process = await Movie.find_all().to_list()
-    print(f"Found {len(movies_to_process)} movies.")
+    if snapshot_only:
+        await publish_embedding_snapshot(collection, batch_size)
+        client.close()
+        return
 
-    if not movies_to_process:
+    total = await collection.count_documents({})
+    print(f"Found {total} movies.")
+    if not total:
         print("No movies found to process.")
         client.close()
         return
 
-    updates_count = 0
+    # workers == 0: one background thread encodes while the event loop streams reads and writes.
+    # workers > 0: batches fan out across a process pool, one model copy per process.
+    print(f"Loading Sentence Transformer model: {MODEL_NAME} ({'in-process' if workers == 0 else f'{workers} worker processes'})...")
+    if workers > 0:
+        executor: Executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(MODEL_NAME,))
+    else:
+        executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(MODEL_NAME,))
+    max_in_flight = max(1, workers) * 2
+    disk_cache = EmbeddingDiskCache(EMBEDDING_CACHE_PATH)
+    print(f"Embedding disk cache: {EMBEDDING_CACHE_PATH} ({len(disk_cache)} vectors)")
+
+    restored_count = 0
+    encoded_count = 0
+    unchanged_count = 0
     errors_count = 0
-    print("Generating embeddings and updating documents...")
-
-    # Process movies (consider batching for very large datasets)
-    for movie in tqdm(movies_to_process, desc="Processing movies"):
-        try:
-            # Create text to embed (handle missing description)
-            text_to_embed = movie.description if movie.description else movie.title
-            if not text_to_embed: # Skip if no text available
-                continue
+    started = time.perf_counter()
+    print(f"Generating embeddings in batches of {batch_size} and updating {'all' if full else 'stale'} documents...")
 
-            # Generate embedding
-            embedding = model.encode(text_to_embed, convert_to_numpy=True).tolist() # Convert to list for MongoDB
+    progress = tqdm(total=total, desc="Processing movies")
+    pending = set()
 
-            # Update the movie document
-            await Movie.find_one(Movie.movie_id == movie.movie_id).update(
-                {"$set": {Movie.description_embedding: embedding}}
-            )
-            updates_count += 1
+    def collect(done) -> None:
+        nonlocal restored_count, encoded_count, errors_count
+        for task in done:
+            restored, encoded, errors = task.result()
+            restored_count += restored
+            encoded_count += encoded
+            errors_count += errors
 
-        except Exception as e:
-            print(f"\nError processing movie '{movie.title}' (ID: {movie.movie_id}): {e}")
-            errors_count += 1
+    try:
+        async for batch in iter_movie_batches(collection, batch_size):
+            stale = stale_docs(batch, full)
+            unchanged_count += len(batch) - len(stale)
+            progress.update(len(batch))
+            if not stale:
+                continue
+            pending.add(asyncio.create_task(encode_and_write(collection, executor, disk_cache, stale)))
+            if len(pending) >= max_in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            collect(done)
+    finally:
+        progress.close()
+        executor.shutdown()
+        disk_cache.close()
 
+    elapsed = time.perf_counter() - started
     print("\n------------------------------------")
     print(f"Embedding generation complete.")
-    print(f"Successfully updated embeddings for {updates_count} movies.")
+    print(f"Up to date (skipped): {unchanged_count} movies.")
+    print(f"Restored from disk cache: {restored_count} movies.")
+    print(f"Encoded: {encoded_count} movies.")
     if errors_count > 0:
         print(f"Encountered errors for {errors_count} movies.")
+    print(f"Elapsed: {elapsed:.1f}s, encode throughput: {encoded_count / elapsed if elapsed else 0:.1f} movies/sec")
     print("------------------------------------")
 
+    if snapshot and (restored_count or encoded_count or current_version(EMBEDDING_SNAPSHOT_DIR) is None):
+        await publish_embedding_snapshot(collection, batch_size)
+    elif snapshot:
+        print("No embeddings changed; the current snapshot is up to date.")
+    if restored_count or encoded_count:
+        version = await bump_catalog_version(db_instance)
+        print(f"Catalog data version bumped to {version}.")
+
     client.close()
     print("MongoDB connection closed.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate description embeddings for all movies.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Movies per encode call and bulk write.")
+    parser.add_argument("--workers", type=int, default=0, help="Encoder processes (0 = single in-process encoder thread).")
+    parser.add_argument("--full", action="store_true", help="Re-embed every movie, ignoring stored content hashes.")
+    parser.add_argument("--no-snapshot", action="store_true", help="Skip publishing the memory-mapped serving snapshot.")
+    parser.add_argument("--snapshot-only", action="store_true", help="Only publish a snapshot of the embeddings already in MongoDB.")
+    args = parser.parse_args()
+
     if os.name == 'nt':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-    asyncio.run(generate_and_store_embeddings())
\ No newline at end of file
+    asyncio.run(generate_and_store_embeddings(
+        batch_size=args.batch_size, workers=args.workers, full=args.full,
+        snapshot=not args.no_snapshot, snapshot_only=args.snapshot_only,
+    ))
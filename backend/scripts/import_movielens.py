@@ -1,23 +1,40 @@
 # movie_reco_backend/scripts/import_movielens.py
+import argparse
 import asyncio
 import csv
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
 import sys
 import os
 from tqdm import tqdm
-from typing import Optional, List, Tuple # <-- Import Optional here
-
-# --- Configuration ---
-MONGODB_CONNECTION_STRING = "mongodb://localhost:27017"  # !!! REPLACE WITH YOURS !!!
-DATABASE_NAME = "movie_d"
-# Path to the MovieLens movies.csv file (inside data/ml-latest-small/)
-CSV_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ml-latest-small', 'mov.csv')
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple # <-- Import Optional here
 
 # Adjust path to import Movie model
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
+from app.core.config import settings
 from app.models import Movie # Your Beanie Movie document
+from app.services.catalog_version import bump_catalog_version
+
+# --- Configuration ---
+MONGODB_CONNECTION_STRING = settings.MONGODB_CONNECTION_STRING
+DATABASE_NAME = settings.DATABASE_NAME
+# Path to the MovieLens movies.csv file (inside data/ml-latest-small/)
+CSV_FILE_PATH = os.path.join(project_root, 'data', 'ml-latest-small', 'mov.csv')
+CHUNK_SIZE = 1000 # Rows validated and upserted per bulk_write
+
+# Fields owned by the CSV; overwritten on every import
+CSV_FIELDS = ("title", "year", "genres")
+# Defaults for everything else; only written when a movie is first inserted, so
+# enrichment data (description, ratings, artwork, embeddings) survives a re-import
+INSERT_DEFAULTS = {
+    "posterUrl": None, "backdropUrl": None, "rating": None,
+    "duration": None, "description": None, "language": None,
+    "streamingOn": None, "isClassic": False, "isHiddenGem": False,
+    "isTrending": False, "description_embedding": None, "embedding_hash": None,
+}
 
 def parse_genres(genres_str: str) -> list[str]:
     """Splits the pipe-separated genres string into a list."""
@@ -45,80 +62,125 @@ def parse_title_year(title_str: str) -> Tuple[str, Optional[int]]: # <-- Optiona
     return title, year
 
 
-async def import_movielens_data():
+class MovieLensRow(BaseModel):
+    """Validated subset of a movies.csv row."""
+    movie_id: int
+    title: str
+    year: Optional[int] = None
+    genres: List[str]
+
+
+def iter_rows(csv_path: str) -> Iterator[Dict[str, str]]:
+    """Lazily yields raw CSV rows; the file is never held in memory."""
+    with open(csv_path, mode='r', encoding='utf-8', newline='') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def iter_chunks(rows: Iterator[Dict[str, str]], size: int) -> Iterator[List[Dict[str, str]]]:
+    chunk: List[Dict[str, str]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_upserts(chunk: List[Dict[str, str]]) -> Tuple[List[UpdateOne], List[int], int]:
+    """Validates a chunk of rows. Returns (upsert ops, movie_ids, skipped count)."""
+    operations = []
+    movie_ids = []
+    skipped = 0
+    for row in chunk:
+        try:
+            title, year = parse_title_year(row['title'])
+            movie = MovieLensRow(
+                movie_id=int(row['movieId']),
+                title=title,
+                year=year, # Can be None
+                genres=parse_genres(row['genres']),
+            )
+        except (KeyError, ValueError, ValidationError) as e:
+            print(f"\nSkipping row due to processing error: {row}. Error: {e}")
+            skipped += 1
+            continue
+        operations.append(UpdateOne(
+            {"movie_id": movie.movie_id},
+            {"$set": movie.model_dump(include=set(CSV_FIELDS)), "$setOnInsert": INSERT_DEFAULTS},
+            upsert=True,
+        ))
+        movie_ids.append(movie.movie_id)
+    return operations, movie_ids, skipped
+
+
+async def import_movielens_data(csv_path: str = CSV_FILE_PATH, chunk_size: int = CHUNK_SIZE, prune: bool = False):
+    """
+    Streams movies.csv into MongoDB with unordered upserts keyed by movie_id.
+    The collection is never emptied, so the catalog stays servable during the import.
+    """
     print(f"Connecting to MongoDB: {MONGODB_CONNECTION_STRING}, Database: {DATABASE_NAME}")
     client = AsyncIOMotorClient(MONGODB_CONNECTION_STRING)
     db_instance = client[DATABASE_NAME]
     await init_beanie(database=db_instance, document_models=[Movie])
     print("Beanie initialized.")
+    collection = Movie.get_motor_collection()
 
-    print(f"Attempting to clear existing movies from the '{Movie.Settings.name}' collection...")
-    delete_result = await Movie.get_motor_collection().delete_many({})
-    print(f"Existing movies cleared. {delete_result.deleted_count} documents deleted.")
-
-    print(f"Loading movies from CSV file: {CSV_FILE_PATH}")
-    movies_to_insert = []
+    print(f"Streaming movies from CSV file: {csv_path}")
+    inserted_count = 0
+    updated_count = 0
     skipped_count = 0
+    seen_ids: Set[int] = set() # Only needed for --prune; ints are small even for ML-32M
 
     try:
-        with open(CSV_FILE_PATH, mode='r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in tqdm(reader, desc="Reading CSV"):
-                try:
-                    movie_id_int = int(row['movieId'])
-                    title, year = parse_title_year(row['title'])
-                    genres = parse_genres(row['genres'])
-
-                    movie_data = {
-                        "movie_id": movie_id_int,
-                        "title": title,
-                        "year": year, # Can be None
-                        "genres": genres,
-                        "posterUrl": None, "backdropUrl": None, "rating": None,
-                        "duration": None, "description": None, "language": None,
-                        "streamingOn": None, "isClassic": False, "isHiddenGem": False,
-                        "isTrending": False, "description_embedding": None
-                    }
-                    movie_obj = Movie(**movie_data)
-                    movies_to_insert.append(movie_obj)
-
-                except Exception as e:
-                    print(f"\nSkipping row due to processing error: {row}. Error: {e}")
-                    skipped_count += 1
-
+        for chunk in tqdm(iter_chunks(iter_rows(csv_path), chunk_size), desc="Upserting chunks"):
+            operations, movie_ids, skipped = build_upserts(chunk)
+            skipped_count += skipped
+            if prune:
+                seen_ids.update(movie_ids)
+            if not operations:
+                continue
+            try:
+                result = await collection.bulk_write(operations, ordered=False)
+                inserted_count += result.upserted_count
+                updated_count += result.modified_count
+            except Exception as e:
+                print(f"\nError during bulk upsert (chunk starting at movie ID {movie_ids[0]}): {e}")
     except FileNotFoundError:
-        print(f"Error: CSV file not found at {CSV_FILE_PATH}")
-        client.close()
-        return
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
+        print(f"Error: CSV file not found at {csv_path}")
         client.close()
         return
 
-    batch_size = 500
-    print(f"\nAttempting to insert {len(movies_to_insert)} movies into MongoDB in batches of {batch_size}...")
-    inserted_count = 0
-    for i in tqdm(range(0, len(movies_to_insert), batch_size), desc="Inserting batches"):
-        batch = movies_to_insert[i:i + batch_size]
-        try:
-            await Movie.insert_many(batch)
-            inserted_count += len(batch)
-        except Exception as e:
-            print(f"\nError during batch insert (starting index {i}): {e}")
+    removed_count = 0
+    if prune and seen_ids:
+        delete_result = await collection.delete_many({"movie_id": {"$nin": list(seen_ids)}})
+        removed_count = delete_result.deleted_count
 
     print("\n------------------------------------")
     print(f"Data import complete.")
-    print(f"Successfully inserted {inserted_count} movies.")
+    print(f"Inserted {inserted_count} new movies, updated {updated_count} existing movies.")
+    if prune:
+        print(f"Removed {removed_count} movies no longer present in the CSV.")
     if skipped_count > 0:
         print(f"Skipped {skipped_count} rows due to errors during processing.")
     print("------------------------------------")
 
+    if inserted_count or updated_count or removed_count:
+        version = await bump_catalog_version(db_instance)
+        print(f"Catalog data version bumped to {version}.")
+
     client.close()
     print("MongoDB connection closed.")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import (upsert) a MovieLens movies.csv into MongoDB.")
+    parser.add_argument("--csv", default=CSV_FILE_PATH, help="Path to a MovieLens movies.csv file.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per validated chunk and bulk write.")
+    parser.add_argument("--prune", action="store_true", help="Delete movies that are not in the CSV after importing.")
+    args = parser.parse_args()
+
     if os.name == 'nt':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-    asyncio.run(import_movielens_data())
\ No newline at end of file
+    asyncio.run(import_movielens_data(csv_path=args.csv, chunk_size=args.chunk_size, prune=args.prune))
@@ -0,0 +1,100 @@
+# scripts/migrate_embeddings.py
+"""
+Converts stored `description_embedding` values in place between the two storage
+formats (see app/services/embedding_codec.py):
+
+- list:   BSON array of doubles (the original format, ~9 bytes per value)
+- binary: packed little-endian float32 BSON vector (subtype 9, 4 bytes per value)
+
+Documents are rewritten in batches ordered by _id, and only documents still in the
+old format are selected, so the migration can be interrupted and re-run. Readers
+accept both formats throughout. Set EMBEDDING_STORAGE to the target format as well,
+so generate_embeddings.py keeps writing it.
+
+    python scripts/migrate_embeddings.py --to binary
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+from app.core.config import settings
+from app.services.embedding_codec import EMBEDDING_STORAGE_FORMATS, decode_embedding, encode_embedding
+
+# --- Configuration ---
+MONGODB_CONNECTION_STRING = settings.MONGODB_CONNECTION_STRING
+DATABASE_NAME = settings.DATABASE_NAME
+DEFAULT_BATCH_SIZE = 500
+# BSON type of documents still to convert, per target format
+SOURCE_TYPES = {"binary": "array", "list": "binData"}
+
+
+async def collection_size(db: Any) -> Optional[Dict[str, int]]:
+    """Data size of the movies collection (uncompressed BSON) and its on-disk storage size."""
+    try:
+        stats = await db.command("collStats", "movies")
+    except Exception:
+        return None
+    return {"size": int(stats.get("size", 0)), "storage": int(stats.get("storageSize", 0))}
+
+
+async def migrate_embeddings(target: str, batch_size: int) -> None:
+    print(f"Connecting to MongoDB: {MONGODB_CONNECTION_STRING}, Database: {DATABASE_NAME}")
+    client = AsyncIOMotorClient(MONGODB_CONNECTION_STRING)
+    db = client[DATABASE_NAME]
+    collection = db["movies"]
+
+    query = {"description_embedding": {"$type": SOURCE_TYPES[target]}}
+    remaining = await collection.count_documents(query)
+    print(f"{remaining} movies store their embedding as {SOURCE_TYPES[target]}; converting to '{target}'.")
+    before = await collection_size(db)
+
+    started = time.perf_counter()
+    converted = 0
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        docs = await collection.find(batch_query, {"description_embedding": 1}).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not docs:
+            break
+        operations = []
+        for doc in docs:
+            vector = decode_embedding(doc["description_embedding"])
+            value = encode_embedding(vector, storage=target) if vector is not None else None
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"description_embedding": value}}))
+        await collection.bulk_write(operations, ordered=False)
+        converted += len(docs)
+        last_id = docs[-1]["_id"]
+        print(f"  converted {converted}/{remaining}", end="\r")
+    print()
+
+    after = await collection_size(db)
+    print("\n------------------------------------")
+    print("Embedding migration complete.")
+    print(f"Converted: {converted} documents to '{target}' in {time.perf_counter() - started:.1f}s")
+    if before and after:
+        print(f"Collection data size: {before['size'] / 1e6:.1f} MB -> {after['size'] / 1e6:.1f} MB "
+              f"(on disk: {before['storage'] / 1e6:.1f} MB -> {after['storage'] / 1e6:.1f} MB; "
+              "storage shrinks as WiredTiger reuses the freed space, or after compact)")
+    if settings.EMBEDDING_STORAGE != target:
+        print(f"Note: EMBEDDING_STORAGE is '{settings.EMBEDDING_STORAGE}'; set it to '{target}' so new embeddings use the same format.")
+    print("------------------------------------")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert stored description embeddings between list and packed float32 storage.")
+    parser.add_argument("--to", choices=EMBEDDING_STORAGE_FORMATS, default="binary", help="Target storage format.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Documents per bulk write.")
+    args = parser.parse_args()
+
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(migrate_embeddings(args.to, args.batch_size))
@@ -0,0 +1,104 @@
+# scripts/tmdb_stub_server.py
+"""
+Local stand-in for the TMDB API, for exercising enrich_movie_data.py without a key or network.
+
+Serves GET /3/movie/{id} with deterministic fake details. Optionally injects 429/500
+responses and enforces a per-second rate limit so retry and backoff paths get exercised:
+
+    python scripts/tmdb_stub_server.py --port 8765 --error-rate 0.05 --rate-limit 40
+    python scripts/enrich_movie_data.py --base-url http://127.0.0.1:8765/3
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOVIE_PATH = re.compile(r"^/3/movie/(\d+)(?:\?.*)?$")
+
+
+def fake_details(tmdb_id: int) -> dict:
+    rng = random.Random(tmdb_id)
+    return {
+        "id": tmdb_id,
+        "overview": f"Stand-in overview for TMDB movie {tmdb_id}.",
+        "vote_average": round(rng.uniform(4.0, 9.0), 3),
+        "runtime": rng.randint(80, 180),
+        "original_language": rng.choice(["en", "en", "en", "fr", "hi", "ta"]),
+        "poster_path": f"/poster{tmdb_id}.jpg",
+        "backdrop_path": f"/backdrop{tmdb_id}.jpg",
+    }
+
+
+class StubState:
+    def __init__(self, error_rate: float, rate_limit: int, missing_every: int) -> None:
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.missing_every = missing_every
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.requests = 0
+
+    def over_limit(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            return bool(self.rate_limit) and self.window_count > self.rate_limit
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict, headers: dict = None) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            match = MOVIE_PATH.match(self.path)
+            if not match:
+                return self._send(404, {"status_code": 34, "status_message": "Not found."})
+            if state.over_limit():
+                return self._send(429, {"status_code": 25}, {"Retry-After": "1"})
+            if random.random() < state.error_rate:
+                return self._send(500, {"status_code": 11})
+            tmdb_id = int(match.group(1))
+            if state.missing_every and tmdb_id % state.missing_every == 0:
+                return self._send(404, {"status_code": 34, "status_message": "Not found."})
+            return self._send(200, fake_details(tmdb_id))
+
+        def log_message(self, format, *args):
+            pass # Keep output quiet; counts are printed on shutdown
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local TMDB stand-in serving /3/movie/{id}.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before answering 429 (0 = unlimited).")
+    parser.add_argument("--missing-every", type=int, default=0, help="Answer 404 for TMDB IDs divisible by N (0 = never).")
+    args = parser.parse_args()
+
+    state = StubState(args.error_rate, args.rate_limit, args.missing_every)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"TMDB stub listening on http://{args.host}:{args.port}/3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {state.requests} requests.")
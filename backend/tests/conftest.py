@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+import sys
+
+# Same import setup as scripts/: make `app` importable when running pytest from backend/
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
@@ -0,0 +1,42 @@
+# tests/test_auth_cache.py
+import asyncio
+
+import pytest
+from jose import jwt
+
+from app.api import deps
+from app.core.config import settings
+from app.models import User
+
+
+@pytest.fixture
+def stored_user(monkeypatch):
+    user = User.model_construct(email="a@example.com", hashed_password="x", is_active=True, favorite_movie_ids=[1])
+    lookups = []
+
+    async def find_one(*args, **kwargs):
+        lookups.append(args)
+        return user
+
+    monkeypatch.setattr(User, "email", "email", raising=False)
+    monkeypatch.setattr(User, "find_one", find_one)
+    deps.user_cache.clear()
+    yield user, lookups
+    deps.user_cache.clear()
+
+
+def test_cached_user_is_a_private_copy_per_request(stored_user):
+    _, lookups = stored_user
+    token = jwt.encode({"sub": "a@example.com"}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    first = asyncio.run(deps.get_current_user(token))
+    first.favorite_movie_ids.append(2)
+    first.is_active = False
+
+    second = asyncio.run(deps.get_current_user(token))
+    third = asyncio.run(deps.get_current_user(token))
+    assert len(lookups) == 1
+    assert second.favorite_movie_ids == [1] and second.is_active
+    assert second is not third
+    second.favorite_movie_ids.append(3)
+    assert third.favorite_movie_ids == [1]
@@ -0,0 +1,67 @@
+# tests/test_cache.py
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import LRUCache, TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used():
+    cache: LRUCache[int] = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1 # "b" is now least recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_with_zero_size_stores_nothing():
+    cache: LRUCache[int] = LRUCache(0)
+    cache.set("a", 1)
+    assert len(cache) == 0 and cache.get("a") is None
+
+
+def test_ttl_entries_expire(clock):
+    cache: TTLCache[int] = TTLCache(10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=5)
+    clock.now += 5
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    clock.now += 55
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 2
+    assert len(cache) == 0
+
+
+def test_ttl_non_positive_ttl_is_not_stored(clock):
+    cache: TTLCache[int] = TTLCache(10, ttl_seconds=60)
+    cache.set("expired", 1, ttl_seconds=-1)
+    assert "expired" not in cache
+
+
+def test_ttl_eviction_drops_expiry_bookkeeping(clock):
+    cache: TTLCache[int] = TTLCache(1, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert "a" not in cache and set(cache._expires) == {"b"}
+    cache.pop("b")
+    assert not cache._expires
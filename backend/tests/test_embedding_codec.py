@@ -0,0 +1,36 @@
+# tests/test_embedding_codec.py
+import numpy as np
+import pytest
+from bson import BSON
+from bson.binary import Binary, BinaryVectorDtype
+
+from app.services.embedding_codec import decode_embedding, encode_embedding
+
+
+def test_packed_float32_round_trip_is_exact():
+    vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+    stored = encode_embedding(vector, storage="binary")
+    assert isinstance(stored, Binary) and len(stored) == 2 + 4 * 384
+    # Survives a BSON round trip as a subtype 9 float32 vector
+    decoded_bson = BSON.encode({"v": stored}).decode()["v"]
+    assert decoded_bson.as_vector().dtype == BinaryVectorDtype.FLOAT32
+    np.testing.assert_array_equal(decode_embedding(decoded_bson), vector)
+
+
+def test_list_storage_round_trip_and_mixed_reads():
+    vector = [0.25, -1.5, 3.0]
+    stored = encode_embedding(vector, storage="list")
+    assert stored == vector
+    np.testing.assert_array_equal(decode_embedding(stored), np.float32(vector))
+    np.testing.assert_array_equal(decode_embedding(encode_embedding(vector, storage="binary")), np.float32(vector))
+
+
+def test_missing_or_empty_embeddings_decode_to_none():
+    assert decode_embedding(None) is None
+    assert decode_embedding([]) is None
+    assert decode_embedding(encode_embedding([], storage="binary")) is None
+
+
+def test_unknown_storage_is_rejected():
+    with pytest.raises(ValueError):
+        encode_embedding([1.0], storage="float16")
@@ -0,0 +1,35 @@
+# tests/test_embedding_snapshot.py
+import os
+
+import numpy as np
+
+from app.services.embedding_snapshot import current_version, open_snapshot, write_snapshot
+
+
+def test_identical_content_keeps_its_version(tmp_path):
+    root = str(tmp_path)
+    movie_ids = np.array([3, 1, 2])
+    matrix = np.random.default_rng(0).standard_normal((3, 4))
+    first = write_snapshot(root, movie_ids, matrix, "model")
+    assert write_snapshot(root, movie_ids[[1, 2, 0]], matrix[[1, 2, 0]], "model") == first
+    assert current_version(root) == first
+
+    ids, rows, meta = open_snapshot(root)
+    assert ids.tolist() == [1, 2, 3] and meta["version"] == first
+    np.testing.assert_allclose(np.linalg.norm(rows, axis=1), 1, rtol=1e-6)
+
+
+def test_prune_keeps_the_most_recently_published(tmp_path):
+    root = str(tmp_path)
+    rng = np.random.default_rng(1)
+    matrices = [rng.standard_normal((2, 4)) for _ in range(4)]
+    versions = []
+    for published_at in range(3):
+        versions.append(write_snapshot(root, np.arange(2), matrices[published_at], "model", keep=2))
+        os.utime(os.path.join(root, versions[-1]), (published_at, published_at))
+    # Republishing the oldest content makes it the newest again
+    versions.append(write_snapshot(root, np.arange(2), matrices[1], "model", keep=2))
+    assert versions[3] == versions[1]
+    write_snapshot(root, np.arange(2), matrices[3], "model", keep=2)
+    remaining = {name for name in os.listdir(root) if not name.startswith(".") and name != "CURRENT"}
+    assert versions[1] in remaining and len(remaining) == 2
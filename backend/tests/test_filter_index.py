@@ -0,0 +1,84 @@
+# tests/test_filter_index.py
+import asyncio
+from itertools import product
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from app import crud
+from app.core.config import settings
+from app.models import Movie, User, UserPreferences
+from app.services.filter_index import ANY_DURATION, FILTER_FIELDS, CatalogFilterIndex
+
+GENRES = ["Action", "Comedy", "Drama", "Horror"]
+LANGUAGES = ["English", "French", None]
+FLAGS = ["isTrending", "isClassic", "isHiddenGem"]
+
+
+def fixture_movies():
+    """Every combination of the filterable fields, including missing and null values."""
+    genre_sets = [None, [], ["Action"], ["Comedy", "Drama"], ["Horror", "Action"]]
+    durations = [None, 85, 120, 150]
+    flag_values = [None, False, True] # None: field absent
+    movies = []
+    for movie_id, (genres, language, duration, flags) in enumerate(
+        product(genre_sets, LANGUAGES, durations, product(flag_values, repeat=len(FLAGS)))
+    ):
+        doc = {"movie_id": movie_id, "title": f"Movie {movie_id}", "rating": None if movie_id % 5 == 0 else movie_id % 10}
+        if genres is not None:
+            doc["genres"] = genres
+        if language is not None:
+            doc["language"] = language
+        if duration is not None:
+            doc["duration"] = duration
+        for field, value in zip(FLAGS, flags):
+            if value is not None:
+                doc[field] = value
+        movies.append(doc)
+    return movies
+
+
+def preference_cases():
+    for language, duration, genres, flags in product(
+        ["English", "French", "German", ""],
+        [90, 120, ANY_DURATION],
+        [[], ["Action"], ["Comedy", "Horror"], ["Western"]],
+        [[], ["trending"], ["classic", "hidden_gems"], ["trending", "classic", "hidden_gems"]],
+    ):
+        yield UserPreferences(mood="happy", watchingWith="alone", ageRange="adult", genres=genres,
+                              language=language, duration=duration, preferences=flags)
+
+
+@pytest.fixture
+def movie_db(monkeypatch):
+    docs = fixture_movies()
+
+    async def setup():
+        database = AsyncMongoMockClient()["test"]
+        await init_beanie(database=database, document_models=[Movie, User])
+        await Movie.get_motor_collection().insert_many([dict(doc) for doc in docs])
+
+    asyncio.run(setup())
+    index = CatalogFilterIndex()
+    index.build([{key: doc[key] for key in FILTER_FIELDS if key in doc} for doc in docs])
+    monkeypatch.setattr(crud, "catalog_filter_index", index)
+    return docs
+
+
+def test_memory_backend_matches_mongo_filter(movie_db, monkeypatch):
+    async def candidate_ids(backend, preferences, backfill):
+        monkeypatch.setattr(settings, "CANDIDATE_FILTER_BACKEND", backend)
+        candidates = await crud.fetch_candidates(preferences, backfill, limit=len(movie_db))
+        return {candidate.movie_id: candidate.rating for candidate in candidates}
+
+    async def run():
+        checked = 0
+        for preferences in preference_cases():
+            for backfill in (False, True):
+                expected = await candidate_ids("mongo", preferences, backfill)
+                assert await candidate_ids("memory", preferences, backfill) == expected, (preferences, backfill)
+                checked += bool(expected)
+        return checked
+
+    assert asyncio.run(run()) > 100
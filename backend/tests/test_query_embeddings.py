@@ -0,0 +1,64 @@
+# tests/test_query_embeddings.py
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.services.encoder import BatchingEncoder
+from app.services.query_embeddings import QueryEmbeddingCache
+
+
+class RecordingModel:
+    """Fake encoder that records which thread each batch runs on and how many run at once."""
+
+    def __init__(self) -> None:
+        self.threads = set()
+        self.batches = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, batch_size, convert_to_numpy):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.threads.add(threading.get_ident())
+        self.batches.append(list(texts))
+        time.sleep(0.001)
+        with self._lock:
+            self.running -= 1
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_warm_up_shares_the_encoder_thread_and_writes_on_the_loop():
+    cache = QueryEmbeddingCache(maxsize=100)
+    model = RecordingModel()
+    writers = set()
+    original_set = cache._cache.set
+
+    def recording_set(key, value):
+        writers.add(threading.get_ident())
+        original_set(key, value)
+
+    cache._cache.set = recording_set
+    texts = [f"query {i}" for i in range(10)] + ["query 0"]
+
+    async def run():
+        encoder = BatchingEncoder(model, max_batch_size=4, max_wait_ms=0)
+        encoder.start()
+        # Live queries arrive while warm-up is running
+        warmed, *_ = await asyncio.gather(
+            cache.warm_up(encoder, texts, batch_size=4),
+            *(encoder.encode(f"live {i}") for i in range(6)),
+        )
+        await encoder.stop()
+        return threading.get_ident(), warmed
+
+    loop_thread, warmed = asyncio.run(run())
+    assert warmed == 10
+    assert sorted(len(batch) for batch in model.batches if batch[0].startswith("query")) == [2, 4, 4]
+    assert len(model.threads) == 1 and loop_thread not in model.threads
+    assert model.max_running == 1
+    assert writers == {loop_thread}
+    assert cache.stats()["size"] == 10
@@ -0,0 +1,108 @@
+# tests/test_ranked_sessions.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_active_user
+from app.core import cache as cache_module
+from app.models import User
+from app.services.ranked_sessions import CursorError, RankedResultSessions, decode_cursor, encode_cursor
+
+RANKED = list(range(100, 125))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("abc_-123", 24)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("abc_-123", 24)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor("abc", -1), encode_cursor("", 3),
+                                    "bm8tb2Zmc2V0"]) # "no-offset"
+def test_malformed_cursors_are_400(cursor):
+    with pytest.raises(CursorError) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_pages_resume_until_the_last_page():
+    sessions = RankedResultSessions(maxsize=10, ttl_seconds=60)
+    page, cursor = sessions.page(RANKED, 0, 10, owner=None)
+    assert page == RANKED[:10] and cursor is not None
+    seen = list(page)
+    while cursor is not None:
+        session_id, ranked_ids, offset = sessions.resume(cursor, owner=None)
+        page, cursor = sessions.page(ranked_ids, offset, 10, None, session_id)
+        seen += page
+    assert seen == RANKED
+    assert sessions.stats()["size"] == 1 # Later pages reuse the first page's session
+
+
+def test_single_page_creates_no_session():
+    sessions = RankedResultSessions(maxsize=10, ttl_seconds=60)
+    assert sessions.page(RANKED, 0, len(RANKED), owner="a@example.com") == (RANKED, None)
+    assert sessions.stats()["size"] == 0
+
+
+def test_cursor_is_bound_to_its_owner():
+    sessions = RankedResultSessions(maxsize=10, ttl_seconds=60)
+    _, cursor = sessions.page(RANKED, 0, 10, owner="a@example.com")
+    for other in ("b@example.com", None):
+        with pytest.raises(CursorError) as raised:
+            sessions.resume(cursor, owner=other)
+        assert raised.value.status_code == 410
+    assert sessions.resume(cursor, owner="a@example.com")[2] == 10
+
+
+def test_expired_and_evicted_sessions_are_410(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    sessions = RankedResultSessions(maxsize=1, ttl_seconds=60)
+    _, first = sessions.page(RANKED, 0, 10, owner=None)
+    now[0] += 59
+    sessions.resume(first, owner=None) # Resuming slides the expiry
+    now[0] += 59
+    sessions.resume(first, owner=None)
+    now[0] += 61
+    with pytest.raises(CursorError) as expired:
+        sessions.resume(first, owner=None)
+    assert expired.value.status_code == 410
+
+    _, second = sessions.page(RANKED, 0, 10, owner=None)
+    sessions.page(RANKED, 0, 10, owner=None) # Evicts the second session
+    with pytest.raises(CursorError) as evicted:
+        sessions.resume(second, owner=None)
+    assert evicted.value.status_code == 410
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from main import app
+    sessions = RankedResultSessions(maxsize=10, ttl_seconds=60)
+    monkeypatch.setattr("app.api.endpoints.recommendations.ranked_result_sessions", sessions)
+
+    async def render_list(page_ids, extra):
+        return json.dumps({"movies": page_ids, **extra}).encode()
+
+    monkeypatch.setattr("app.api.endpoints.recommendations.movie_card_cache.render_list", render_list)
+    user = User.model_construct(email="a@example.com", is_active=True, favorite_movie_ids=[])
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    yield TestClient(app), sessions
+    app.dependency_overrides.clear()
+
+
+def test_cursor_errors_map_to_http_status(client):
+    http, sessions = client
+    _, anonymous = sessions.page(RANKED, 0, 10, owner=None)
+    _, personal = sessions.page(RANKED, 0, 10, owner="a@example.com")
+
+    response = http.post("/api/v1/recommendations", params={"cursor": anonymous, "limit": 20})
+    assert response.status_code == 200
+    assert response.json() == {"movies": RANKED[10:], "next_cursor": None}
+    assert http.post("/api/v1/recommendations", params={"cursor": "%%%"}).status_code == 400
+    # A personalized cursor can't be used anonymously, and vice versa
+    assert http.post("/api/v1/recommendations", params={"cursor": personal}).status_code == 410
+    assert http.post("/api/v1/recommendations/personalized", params={"cursor": anonymous}).status_code == 410
+    response = http.post("/api/v1/recommendations/personalized", params={"cursor": personal, "limit": 5})
+    assert response.status_code == 200 and response.json()["movies"] == RANKED[10:15]
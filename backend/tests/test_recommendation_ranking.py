@@ -0,0 +1,66 @@
+# tests/test_recommendation_ranking.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import crud
+from app.core.config import settings
+from app.models import UserPreferences
+from app.services.catalog_index import CatalogIndex
+from app.services.filter_index import CatalogFilterIndex
+from app.services.vector_index import CatalogVectorIndex
+
+DIMENSION = 8
+
+
+class FixedEncoder:
+    def __init__(self, vector: np.ndarray) -> None:
+        self.vector = vector
+
+    async def encode(self, text: str) -> np.ndarray:
+        return self.vector
+
+
+@pytest.fixture
+def memory_pipeline(monkeypatch):
+    rng = np.random.default_rng(0)
+    movie_ids = list(range(100, 160))
+    catalog = CatalogIndex()
+    catalog.build(movie_ids, rng.standard_normal((len(movie_ids), DIMENSION)))
+    catalog.version = "test"
+    vector_index = CatalogVectorIndex()
+    vector_index.load(catalog, "exact", "unused")
+    filter_index = CatalogFilterIndex()
+    filter_index.build([
+        {"movie_id": movie_id, "genres": ["Action" if movie_id % 2 else "Comedy"], "language": "English",
+         "duration": 100, "rating": 7.0, "isTrending": movie_id % 3 == 0}
+        for movie_id in movie_ids
+    ])
+    monkeypatch.setattr(crud, "catalog_index", catalog)
+    monkeypatch.setattr(crud, "catalog_vector_index", vector_index)
+    monkeypatch.setattr(crud, "catalog_filter_index", filter_index)
+    monkeypatch.setattr(crud, "query_embedding_cache", crud.query_embedding_cache.__class__(0))
+    monkeypatch.setattr(settings, "CANDIDATE_FILTER_BACKEND", "memory")
+    monkeypatch.setattr(settings, "CF_BLEND_WEIGHT", 0.0)
+    return catalog, rng.standard_normal(DIMENSION).astype(np.float32)
+
+
+def test_vector_search_scores_are_reused_for_ranking(memory_pipeline, monkeypatch):
+    catalog, query = memory_pipeline
+    preferences = UserPreferences(mood="happy", watchingWith="alone", ageRange="adult", genres=["Action"],
+                                  language="English", duration=999, preferences=["trending"])
+    candidate_ids = [m for m in catalog.movie_ids.tolist() if m % 2 and m % 3 == 0]
+    unflagged_ids = [m for m in catalog.movie_ids.tolist() if m % 2 and m % 3 != 0]
+    expected_ids, expected_scores = catalog.score(query, candidate_ids)
+    expected_backfill_ids, expected_backfill_scores = catalog.score(query, unflagged_ids)
+
+    def no_rescoring(*args, **kwargs):
+        raise AssertionError("candidates from the vector index must not be scored again")
+
+    monkeypatch.setattr(catalog, "score", no_rescoring)
+    ranked = asyncio.run(crud.get_ai_recommendations_from_db(preferences, FixedEncoder(query)))
+
+    flagged = expected_ids[np.argsort(-expected_scores, kind="stable")].tolist()
+    backfill = expected_backfill_ids[np.argsort(-expected_backfill_scores, kind="stable")].tolist()
+    assert ranked == flagged + backfill
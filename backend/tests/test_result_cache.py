@@ -0,0 +1,34 @@
+# tests/test_result_cache.py
+from app.models import UserPreferences
+from app.services.result_cache import RecommendationResultCache, preferences_cache_key
+
+
+def preferences(**overrides) -> UserPreferences:
+    fields = dict(mood="happy", watchingWith="friends", ageRange="adult", genres=["Comedy", "Action"],
+                  language="English", duration=120, preferences=["trending", "classic"])
+    fields.update(overrides)
+    return UserPreferences(**fields)
+
+
+def test_key_ignores_order_duplicates_and_unused_fields():
+    key = preferences_cache_key(preferences())
+    assert preferences_cache_key(preferences(genres=["Action", "Comedy", "Action"], preferences=["classic", "trending"],
+                                             watchingWith="alone", ageRange="teen")) == key
+    assert preferences_cache_key(preferences(genres=["action", "Comedy"])) != key
+    assert preferences_cache_key(preferences(duration=90)) != key
+
+
+def test_invalidate_drops_entries_and_rejects_stale_writes():
+    cache = RecommendationResultCache(maxsize=10, ttl_seconds=60)
+    started = cache.generation
+    cache.set("a", [3, 1, 2], started)
+    assert cache.get("a") == [3, 1, 2]
+
+    in_flight = cache.generation # A request starts ranking...
+    cache.invalidate()           # ...the catalog changes meanwhile...
+    cache.set("b", [4], in_flight) # ...and its stale result is not stored
+    assert cache.get("a") is None and cache.get("b") is None
+
+    cache.set("b", [5], cache.generation)
+    assert cache.get("b") == [5]
+    assert cache.stats()["invalidations"] == 1
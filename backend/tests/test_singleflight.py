@@ -0,0 +1,74 @@
+# tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        flights: SingleFlight[int] = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return 42
+
+        waiters = [asyncio.create_task(flights.run("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        return flights, calls, results
+
+    flights, calls, results = asyncio.run(run())
+    assert results == [42] * 5 and len(calls) == 1
+    assert flights.stats()["collapsed"] == 4 and flights.stats()["in_flight"] == 0
+
+
+def test_waiters_see_the_leaders_exception_and_the_key_is_released():
+    async def run():
+        flights: SingleFlight[int] = SingleFlight()
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise ValueError("boom")
+
+        waiters = [asyncio.create_task(flights.run("key", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+
+        async def succeeding():
+            return 7
+
+        return outcomes, await flights.run("key", succeeding)
+
+    outcomes, retried = asyncio.run(run())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert retried == 7
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_work():
+    async def run():
+        flights: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flights.run("key", work))
+        second = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
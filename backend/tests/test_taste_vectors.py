@@ -0,0 +1,96 @@
+# tests/test_taste_vectors.py
+import asyncio
+
+import numpy as np
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models import User
+from app.services import taste_vectors
+from app.services.catalog_index import CatalogIndex
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = AsyncMongoMockClient()["test"]["users"]
+    monkeypatch.setattr(User, "get_motor_collection", classmethod(lambda cls: collection))
+    return collection
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalog = CatalogIndex()
+    monkeypatch.setattr(taste_vectors, "catalog_index", catalog)
+    return catalog
+
+
+def load(catalog: CatalogIndex, vectors: dict, version: str) -> None:
+    catalog.build(list(vectors), list(vectors.values()))
+    catalog.version = version
+
+
+def stored_mean(doc: dict) -> np.ndarray:
+    return np.asarray(doc["taste_vector_sum"], dtype=np.float32) / doc["taste_vector_count"]
+
+
+def test_running_sum_follows_embedding_changes(users, catalog):
+    async def run():
+        user_id = (await users.insert_one({"email": "a@example.com", "favorite_movie_ids": []})).inserted_id
+        user = User.model_construct(id=user_id)
+
+        load(catalog, {1: [1, 0, 0], 2: [0, 1, 0]}, "v1")
+        assert await taste_vectors.add_favorite(user, 1)
+        assert await taste_vectors.add_favorite(user, 2)
+        assert await taste_vectors.add_favorite(user, 3) # No embedding yet
+        assert not await taste_vectors.add_favorite(user, 1)
+        doc = await users.find_one({"_id": user_id})
+        assert doc["taste_vector_count"] == 2
+        np.testing.assert_allclose(stored_mean(doc), [0.5, 0.5, 0])
+
+        # Embeddings regenerated: movie 1 moved and movie 3 got one
+        load(catalog, {1: [0, 0, 1], 2: [0, 1, 0], 3: [1, 0, 0]}, "v2")
+        assert await taste_vectors.remove_favorite(user, 2)
+        doc = await users.find_one({"_id": user_id})
+        assert doc["favorite_movie_ids"] == [1, 3]
+        assert doc["taste_vector_version"] == "v2"
+        assert doc["taste_vector_count"] == 2
+        np.testing.assert_allclose(stored_mean(doc), [0.5, 0, 0.5])
+
+        assert await taste_vectors.remove_favorite(user, 1)
+        assert await taste_vectors.remove_favorite(user, 3)
+        doc = await users.find_one({"_id": user_id})
+        assert doc["taste_vector_count"] == 0
+        assert doc["taste_vector_sum"] == [0.0, 0.0, 0.0]
+        assert not await taste_vectors.remove_favorite(user, 3)
+
+    asyncio.run(run())
+
+
+def test_taste_vector_recomputes_when_built_from_other_embeddings(catalog):
+    load(catalog, {1: [1, 0], 2: [0, 1]}, "v2")
+    stale = User.model_construct(favorite_movie_ids=[2], taste_vector_sum=[5.0, 5.0], taste_vector_count=1,
+                                 taste_vector_version="v1")
+    np.testing.assert_allclose(taste_vectors.taste_vector(stale), [0, 1])
+    current = User.model_construct(favorite_movie_ids=[1, 2], taste_vector_sum=[1.0, 1.0], taste_vector_count=2,
+                                   taste_vector_version="v2")
+    np.testing.assert_allclose(taste_vectors.taste_vector(current), [0.5, 0.5])
+
+
+def test_refresh_persists_a_stale_sum_once(users, catalog):
+    async def run():
+        load(catalog, {1: [1, 0], 2: [0, 1]}, "v1")
+        user_id = (await users.insert_one({"email": "b@example.com", "favorite_movie_ids": [1, 2],
+                                           "taste_vector_sum": [9.0, 9.0], "taste_vector_count": 1,
+                                           "taste_vector_version": "v0"})).inserted_id
+        user = User.model_construct(id=user_id, favorite_movie_ids=[1, 2], taste_vector_version="v0")
+        assert taste_vectors.taste_vector_stale(user)
+        await asyncio.gather(*(taste_vectors.refresh_taste_vector(user) for _ in range(3)))
+        return await users.find_one({"_id": user_id})
+
+    doc = asyncio.run(run())
+    assert doc["taste_vector_version"] == "v1" and doc["taste_vector_count"] == 2
+    np.testing.assert_allclose(doc["taste_vector_sum"], [1, 1])
+    assert taste_vectors.taste_vector_rebuilds.stats()["collapsed"] >= 2
+    refreshed = User.model_construct(**{key: doc[key] for key in ("favorite_movie_ids", "taste_vector_sum",
+                                                                  "taste_vector_count", "taste_vector_version")})
+    assert not taste_vectors.taste_vector_stale(refreshed)
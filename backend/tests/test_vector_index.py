@@ -0,0 +1,50 @@
+# tests/test_vector_index.py
+import numpy as np
+import pytest
+
+from app.services.vector_index import ExactVectorIndex, HnswVectorIndex
+
+
+def unit_rows(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    matrix = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class FailingFilteredGraph:
+    """Stands in for an hnswlib graph whose filtered walk reaches fewer than k allowed nodes."""
+
+    M = 16
+
+    def set_ef(self, ef: int) -> None:
+        pass
+
+    def knn_query(self, query, k, num_threads=-1, filter=None):
+        if filter is not None:
+            raise RuntimeError("Cannot return the results in a contiguous 2D array. Probably ef or M is too small")
+        raise AssertionError("unfiltered search not expected")
+
+
+def test_filtered_search_falls_back_to_exact_when_walk_runs_short():
+    movie_ids = np.arange(10, 2010, dtype=np.int64)
+    matrix = unit_rows(movie_ids.size, 16)
+    index = HnswVectorIndex(movie_ids, matrix, FailingFilteredGraph(), ef_search=16, exact_fraction=0.01)
+    # Every 7th movie: above the exact cutoff (20 rows), and fragmented across the graph
+    allowed_ids = movie_ids[::7]
+    query = matrix[3] + matrix[500]
+
+    found, scores = index.search(query, 40, allowed_ids)
+    expected, expected_scores = ExactVectorIndex(movie_ids, matrix).search(query, 40, allowed_ids)
+    assert found.tolist() == expected.tolist()
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+def test_filtered_hnsw_search_returns_only_allowed_movies():
+    pytest.importorskip("hnswlib")
+    movie_ids = np.arange(2000, dtype=np.int64) * 3
+    matrix = unit_rows(movie_ids.size, 16, seed=1)
+    index = HnswVectorIndex.build(movie_ids, matrix, m=4, ef_construction=16, ef_search=4, exact_fraction=0.01)
+    allowed_ids = movie_ids[::37]
+    for row in range(0, 2000, 250):
+        found, scores = index.search(matrix[row], len(allowed_ids), allowed_ids)
+        assert set(found.tolist()) <= set(allowed_ids.tolist())
+        assert np.all(np.diff(scores) <= 1e-6)
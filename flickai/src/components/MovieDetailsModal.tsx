@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } from "@/components/ui/dialog";
 import { Badge } from "@/components/ui/badge";
 import { Star, Clock, Heart } from "lucide-react";
@@ -6,6 +6,7 @@ import { Movie } from "@/types/movie";
 import { cn } from "@/lib/utils";
 import { useAuth } from '@/context/AuthContext';
 import { Button } from '@/components/ui/button'; // Keep Button import
+import { getSimilarMovies } from '@/data/mockData';
 
 interface MovieDetailsModalProps {
     movie: Movie | null;
@@ -16,6 +17,20 @@ interface MovieDetailsModalProps {
 const MovieDetailsModal = ({ movie, isOpen, onClose }: MovieDetailsModalProps) => {
     const { isAuthenticated, isFavorite, addFavoriteMovie, removeFavoriteMovie } = useAuth();
     const [isFavoriteLoading, setIsFavoriteLoading] = useState(false);
+    const [similarMovies, setSimilarMovies] = useState<Movie[]>([]);
+
+    // Load "More like this" when the modal opens
+    useEffect(() => {
+        if (!isOpen || !movie?.movie_id) {
+            return;
+        }
+        let cancelled = false;
+        setSimilarMovies([]);
+        getSimilarMovies(movie.movie_id).then((movies) => {
+            if (!cancelled) setSimilarMovies(movies);
+        });
+        return () => { cancelled = true; };
+    }, [isOpen, movie?.movie_id]);
 
     if (!movie) {
         return null;
@@ -137,6 +152,21 @@ const MovieDetailsModal = ({ movie, isOpen, onClose }: MovieDetailsModalProps) =
 
                             </div> {/* End Details Column */}
                         </div> {/* End Main Content Grid */}
+
+                        {/* More like this */}
+                        {similarMovies.length > 0 && (
+                            <div className="mt-6">
+                                <h4 className="text-sm font-medium mb-3">More like this:</h4>
+                                <div className="grid grid-cols-3 sm:grid-cols-4 gap-3">
+                                    {similarMovies.map((similar) => (
+                                        <div key={similar.movie_id} className="space-y-1">
+                                            <img src={similar.posterUrl || '/placeholder-poster.png'} alt={similar.title} className="w-full aspect-[2/3] object-cover rounded-md" onError={(e) => { const target = e.target as HTMLImageElement; target.onerror = null; target.src='/placeholder-poster.png';}} loading="lazy" />
+                                            <p className="text-xs text-cinema-muted truncate" title={similar.title}>{similar.title}</p>
+                                        </div>
+                                    ))}
+                                </div>
+                            </div>
+                        )}
                     </div> {/* End Scrollable Area */}
                 </DialogContent>
             )}
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import { Movie, UserPreferences } from '../types/movie';
-import { getMovieRecommendations } from '../data/mockData';
+import { getMovieRecommendationsPage } from '../data/mockData';
 import MovieCard from './MovieCard';
 import { Button } from './ui/button';
 import { Loader2 } from 'lucide-react';
@@ -15,6 +15,8 @@ const RecommendationPage = () => {
     const preferences = (location.state as { preferences: UserPreferences })?.preferences;
     const [movies, setMovies] = useState<Movie[]>([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const { isAuthenticated, isLoading: isAuthLoading } = useAuth();
 
     useEffect(() => {
@@ -23,12 +25,14 @@ const RecommendationPage = () => {
             if (preferences) {
                 setLoading(true);
                 try {
-                    const recommendedMovies = await getMovieRecommendations(preferences);
-                    console.log("Data received from getMovieRecommendations:", recommendedMovies);
-                    setMovies(Array.isArray(recommendedMovies) ? recommendedMovies : []);
+                    const page = await getMovieRecommendationsPage(preferences);
+                    console.log("Data received from getMovieRecommendationsPage:", page);
+                    setMovies(Array.isArray(page.movies) ? page.movies : []);
+                    setNextCursor(page.nextCursor);
                 } catch (error) {
                     console.error("Error fetching recommendations in useEffect:", error);
                     setMovies([]);
+                    setNextCursor(null);
                 } finally {
                     setLoading(false);
                 }
@@ -46,6 +50,29 @@ const RecommendationPage = () => {
         }
     }, [preferences]);
 
+    // Next page of the same server-side ranking; no re-ranking per page
+    const loadMore = async () => {
+        if (!preferences || !nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const page = await getMovieRecommendationsPage(preferences, nextCursor);
+            setMovies((current) => [...current, ...page.movies]);
+            setNextCursor(page.nextCursor);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    const showMoreButton = nextCursor ? (
+        <Button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="button-glow text-lg px-8 py-4 hover:bg-cinema-purple/20"
+        >
+            {loadingMore ? <Loader2 className="h-5 w-5 animate-spin" /> : "Show More"}
+        </Button>
+    ) : null;
+
     // Render loading state for auth check OR recommendation fetch
     if (isAuthLoading || loading) {
         return (
@@ -104,7 +131,8 @@ const RecommendationPage = () => {
                                     })}
                                 </div>
                                 {/* Recommend Again Button Centered Below Grid/Flex */}
-                                <div className="mt-8 flex justify-center">
+                                <div className="mt-8 flex justify-center gap-4">
+                                    {showMoreButton}
                                     <Button
                                         onClick={() => navigate('/', { state: { resetQuestionnaire: true } })}
                                         className="button-glow text-lg px-8 py-4 neon-border hover:bg-cinema-purple/20" // Refined hover
@@ -146,7 +174,8 @@ const RecommendationPage = () => {
                                             return <MovieCard key={movie.movie_id ?? index} movie={movie} priority={index} />;
                                         })}
                                     </div>
-                                    <div className="mt-8 flex justify-center">
+                                    <div className="mt-8 flex justify-center gap-4">
+                                        {showMoreButton}
                                         <Button
                                             onClick={() => navigate('/', { state: { resetQuestionnaire: true } })}
                                             className="button-glow text-lg px-8 py-4 neon-border hover:bg-cinema-purple/20"
@@ -55,10 +55,21 @@ export const preferencesOptions = [
 // e.g., VITE_API_BASE_URL=http://127.0.0.1:8000/api
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api'; // Default for same-origin deployment
 
-export const getMovieRecommendations = async (preferences: UserPreferences): Promise<Movie[]> => {
+export interface RecommendationResultPage {
+  movies: Movie[];
+  nextCursor: string | null; // Opaque; pass back to fetch the next page of the same ranking
+}
+
+// First page ranks everything server-side; later pages (cursor set) just slice that ranking.
+export const getMovieRecommendationsPage = async (
+  preferences: UserPreferences,
+  cursor: string | null = null,
+): Promise<RecommendationResultPage> => {
   try {
     console.log('Sending preferences to backend:', preferences);
-    const fullApiUrl = `${API_BASE_URL}/recommendations`;
+    const fullApiUrl = cursor
+      ? `${API_BASE_URL}/recommendations?cursor=${encodeURIComponent(cursor)}`
+      : `${API_BASE_URL}/recommendations`;
     console.log('Requesting URL:', fullApiUrl);
 
     const response = await fetch(fullApiUrl, {
@@ -75,13 +86,16 @@ export const getMovieRecommendations = async (preferences: UserPreferences): Pro
       throw new Error(`Failed to fetch recommendations: ${response.status} ${errorText}`);
     }
 
-    // The backend returns an object like { "movies": [...] }
+    // The backend returns an object like { "movies": [...], "next_cursor": "..." | null }
     // We need to extract the 'movies' array.
     const responseData = await response.json(); 
     console.log('Received data from backend:', responseData);
 
     if (responseData && Array.isArray(responseData.movies)) {
-      return responseData.movies as Movie[]; // Cast to Movie[] for type safety
+      return {
+        movies: responseData.movies as Movie[], // Cast to Movie[] for type safety
+        nextCursor: responseData.next_cursor ?? null,
+      };
     } else {
       console.error("Backend response did not contain a 'movies' array:", responseData);
       toast({ // Use your toast component for user feedback
@@ -89,7 +103,7 @@ export const getMovieRecommendations = async (preferences: UserPreferences): Pro
         description: "Received an unexpected format from the server.",
         variant: "destructive",
       });
-      return []; // Return an empty array or throw an error, depending on desired behavior
+      return { movies: [], nextCursor: null }; // Return an empty page or throw an error, depending on desired behavior
     }
 
   } catch (error) {
@@ -103,6 +117,24 @@ export const getMovieRecommendations = async (preferences: UserPreferences): Pro
       description: errorMessage,
       variant: "destructive",
     });
-    return []; // Return empty array on error
+    return { movies: [], nextCursor: null }; // Return empty page on error
+  }
+};
+
+// "More like this" for the details modal; neighbors are precomputed server-side, so this is a cheap lookup.
+export const getSimilarMovies = async (movieId: number, limit: number = 8): Promise<Movie[]> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/movies/${movieId}/similar?limit=${limit}`);
+    if (response.status === 404) {
+      return []; // No neighbors computed for this movie
+    }
+    if (!response.ok) {
+      throw new Error(`Failed to fetch similar movies: ${response.status}`);
+    }
+    const responseData = await response.json();
+    return Array.isArray(responseData?.movies) ? (responseData.movies as Movie[]) : [];
+  } catch (error) {
+    console.error('Error fetching similar movies:', error);
+    return []; // The section is optional; don't bother the user with a toast
   }
 };
\ No newline at end of file